@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare AsyncLogger throughput with one write+flush per message."""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import aiofiles
+import msgpack
+
+from mpacklog import AsyncLogger
+from mpacklog.serialize import serialize
+
+NB_MESSAGES = 20_000
+
+
+def make_message(i: int) -> dict:
+    return {
+        "time": i * 1e-3,
+        "observation": {"servo": {"position": 0.1 * i, "velocity": -1.0}},
+        "action": [0.0, 1.0, 2.0],
+    }
+
+
+async def write_per_message(path: str) -> None:
+    """Reference implementation: one write and one flush per message."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(NB_MESSAGES):
+        queue.put_nowait(make_message(i))
+    async with aiofiles.open(path, "wb") as file:
+        packer = msgpack.Packer(default=serialize, use_bin_type=True)
+        while not queue.empty():
+            message = queue.get_nowait()
+            await file.write(packer.pack(message))
+            await file.flush()
+
+
+async def write_batched(path: str, **kwargs) -> None:
+    """Fill the queue of an AsyncLogger and let it write in batches."""
+    logger = AsyncLogger(path, **kwargs)
+    for i in range(NB_MESSAGES):
+        await logger.put(make_message(i))
+    await logger.flush()
+
+
+async def producer_consumer(path: str, **kwargs) -> None:
+    """Producer logging at full speed while the writer runs concurrently."""
+    logger = AsyncLogger(path, **kwargs)
+    writer = asyncio.create_task(logger.write())
+    for i in range(NB_MESSAGES):
+        await logger.put(make_message(i))
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    await logger.stop()
+    await writer
+
+
+def bench(label: str, coroutine, *args, **kwargs) -> None:
+    path = tempfile.mktemp(suffix=".mpack")
+    start = time.perf_counter()
+    asyncio.run(coroutine(path, *args, **kwargs))
+    duration = time.perf_counter() - start
+    os.unlink(path)
+    print(f"{label:<40} {NB_MESSAGES / duration:>12,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    bench("write + flush per message", write_per_message)
+    bench("batched, flush per batch", write_batched)
+    bench("batched, flush every 64 KiB", write_batched, flush_bytes=65536)
+    bench("concurrent, flush per batch", producer_consumer)
+    bench(
+        "concurrent, flush every 10 ms",
+        producer_consumer,
+        flush_bytes=1 << 20,
+        flush_interval=0.01,
+    )
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare compression ratio, write and read throughput of compressed logs."""
+
+import os
+import tempfile
+import time
+
+from mpacklog import SyncLogger, decode
+from mpacklog.compression import get_codec_module
+
+NB_MESSAGES = 50_000
+
+
+def make_message(i: int) -> dict:
+    return {
+        "time": i * 1e-3,
+        "observation": {
+            "servo": {
+                f"joint{j}": {"position": 0.1 * i, "velocity": -1.0}
+                for j in range(6)
+            },
+            "imu": {"pitch": 0.01, "roll": -0.02, "yaw": 0.5},
+            "contact": True,
+        },
+        "action": {f"joint{j}": 0.2 * j for j in range(6)},
+    }
+
+
+def is_available(codec: str) -> bool:
+    try:
+        get_codec_module(codec)
+    except ImportError:
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    messages = [make_message(i) for i in range(NB_MESSAGES)]
+    configs = [(None, None), ("zlib", 1), ("zlib", None), ("zlib", 9)]
+    configs += [
+        (codec, None) for codec in ("zstd", "lz4") if is_available(codec)
+    ]
+    plain_size = None
+    print(
+        f"{'codec':<12} {'size (MiB)':>10} {'ratio':>6} "
+        f"{'write (msg/s)':>14} {'read (msg/s)':>14}"
+    )
+    for codec, level in configs:
+        path = tempfile.mktemp(suffix=".mpack")
+        start = time.perf_counter()
+        with SyncLogger(
+            path, compression=codec, compression_level=level
+        ) as logger:
+            for message in messages:
+                logger.put(message)
+        write_duration = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in decode(path):
+            pass
+        read_duration = time.perf_counter() - start
+        size = os.path.getsize(path)
+        plain_size = plain_size or size
+        label = f"{codec}" + (f" ({level})" if level is not None else "")
+        print(
+            f"{label:<12} {size / (1 << 20):>10.1f} {plain_size / size:>6.1f} "
+            f"{NB_MESSAGES / write_duration:>14,.0f} "
+            f"{NB_MESSAGES / read_duration:>14,.0f}"
+        )
+        os.unlink(path)
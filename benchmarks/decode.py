@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare decoding throughput and memory of chunked reads and mmap."""
+
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from mpacklog import SyncLogger, decode
+
+NB_MESSAGES = 1_000_000
+
+
+def make_message(i: int) -> dict:
+    return {
+        "time": i * 1e-3,
+        "observation": {"servo": {"position": 0.1 * i, "velocity": -1.0}},
+        "action": [0.0, 1.0, 2.0],
+    }
+
+
+def run_decode(path: str, use_mmap: bool, queue) -> None:
+    """Decode a log file in a fresh process and report its peak memory."""
+    start = time.perf_counter()
+    nb_messages = sum(1 for _ in decode(path, use_mmap=use_mmap))
+    duration = time.perf_counter() - start
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((nb_messages, duration, max_rss))
+
+
+def bench(label: str, path: str, use_mmap: bool) -> None:
+    queue: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=run_decode, args=(path, use_mmap, queue)
+    )
+    process.start()
+    nb_messages, duration, max_rss = queue.get()
+    process.join()
+    rss_mib = max_rss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+    print(
+        f"{label:<20} {nb_messages / duration:>12,.0f} messages/s"
+        f" {rss_mib:>10.1f} MiB max RSS"
+    )
+
+
+if __name__ == "__main__":
+    path = tempfile.mktemp(suffix=".mpack")
+    with SyncLogger(path) as logger:
+        for i in range(NB_MESSAGES):
+            logger.put(make_message(i))
+    print(f"Log file: {os.path.getsize(path) / (1 << 20):.1f} MiB")
+    bench("chunked reads", path, use_mmap=False)
+    bench("memory map", path, use_mmap=True)
+    os.unlink(path)
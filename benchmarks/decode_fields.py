@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare full and field-projected decoding of a wide-schema log."""
+
+import os
+import tempfile
+import time
+
+from mpacklog import SyncLogger, decode
+
+NB_MESSAGES = 10_000
+NB_GROUPS = 20
+NB_FIELDS_PER_GROUP = 100
+
+
+def make_message(i: int) -> dict:
+    message = {"time": i * 1e-3}
+    for group in range(NB_GROUPS):
+        message[f"group{group}"] = {
+            f"field{field}": 0.1 * i + field
+            for field in range(NB_FIELDS_PER_GROUP)
+        }
+    return message
+
+
+def bench(label: str, path: str, **kwargs) -> None:
+    start = time.perf_counter()
+    for _ in decode(path, **kwargs):
+        pass
+    duration = time.perf_counter() - start
+    print(f"{label:<30} {NB_MESSAGES / duration:>12,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    path = tempfile.mktemp(suffix=".mpack")
+    with SyncLogger(path) as logger:
+        for i in range(NB_MESSAGES):
+            logger.put(make_message(i))
+    print(f"Log file: {os.path.getsize(path) / (1 << 20):.1f} MiB")
+    fields = ["time", "group3/field7", "group19/field99"]
+    bench("full decode", path)
+    bench("3 fields", path, fields=fields)
+    bench("1 top-level field", path, fields=["time"])
+    os.unlink(path)
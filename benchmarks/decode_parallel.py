@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Measure how a whole-log reduction scales with decode_parallel."""
+
+import os
+import tempfile
+import time
+
+from mpacklog import SyncLogger, decode, decode_parallel
+
+NB_MESSAGES = 1_000_000
+
+
+def make_message(i: int) -> dict:
+    return {
+        "time": i * 1e-3,
+        "observation": {"servo": {"position": 0.1 * i, "velocity": -1.0}},
+        "action": [0.0, 1.0, 2.0],
+    }
+
+
+def get_position(message: dict) -> float:
+    return message["observation"]["servo"]["position"]
+
+
+if __name__ == "__main__":
+    path = tempfile.mktemp(suffix=".mpack")
+    with SyncLogger(path) as logger:
+        for i in range(NB_MESSAGES):
+            logger.put(make_message(i))
+    start = time.perf_counter()
+    total = sum(get_position(message) for message in decode(path))
+    reference = time.perf_counter() - start
+    print(f"{'decode':<20} {reference:>8.2f} s")
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        result = sum(decode_parallel(path, get_position, workers=workers))
+        duration = time.perf_counter() - start
+        assert abs(result - total) < 1e-6 * abs(total)
+        print(
+            f"{f'{workers} workers':<20} {duration:>8.2f} s"
+            f" {reference / duration:>8.1f}x"
+        )
+        workers *= 2
+    os.unlink(path)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Measure `mpacklog dump --format csv` throughput with 200 fields."""
+
+import contextlib
+import os
+import tempfile
+import time
+
+from mpacklog import SyncLogger, decode
+from mpacklog.cli.fields import FieldPath, get_from_field
+from mpacklog.cli.main import main
+
+NB_MESSAGES = 10_000
+NB_GROUPS = 20
+NB_FIELDS_PER_GROUP = 10
+
+
+def make_message(i: int) -> dict:
+    message: dict = {"time": i * 1e-3}
+    for group in range(NB_GROUPS):
+        message[f"group{group}"] = {
+            f"field{field}": 0.1 * i + field
+            for field in range(NB_FIELDS_PER_GROUP)
+        }
+    message["servos"] = [{"position": 0.1 * j} for j in range(4)]
+    return message
+
+
+if __name__ == "__main__":
+    path = tempfile.mktemp(suffix=".mpack")
+    with SyncLogger(path) as logger:
+        for i in range(NB_MESSAGES):
+            logger.put(make_message(i))
+    fields = [
+        f"group{group}/field{field}"
+        for group in range(NB_GROUPS)
+        for field in range(NB_FIELDS_PER_GROUP)
+    ]
+    fields[-4:] = [f"servos/{j}/position" for j in range(4)]
+    messages = list(decode(path))
+
+    start = time.perf_counter()
+    for message in messages:
+        [get_from_field(message, field, default="0") for field in fields]
+    duration = time.perf_counter() - start
+    print(f"{'get_from_field':<24} {NB_MESSAGES / duration:>12,.0f} msg/s")
+
+    paths = [FieldPath(field) for field in fields]
+    start = time.perf_counter()
+    for message in messages:
+        [path.lookup(message) for path in paths]
+    duration = time.perf_counter() - start
+    print(f"{'FieldPath.lookup':<24} {NB_MESSAGES / duration:>12,.0f} msg/s")
+
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            main(["dump", path, *fields, "--format", "csv"])
+            duration = time.perf_counter() - start
+    print(f"{'dump --format csv':<24} {NB_MESSAGES / duration:>12,.0f} msg/s")
+    os.unlink(path)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Measure `mpacklog dump` output throughput with and without buffering."""
+
+import contextlib
+import importlib
+import os
+import tempfile
+import time
+
+from mpacklog import SyncLogger
+
+cli_main = importlib.import_module("mpacklog.cli.main")  # not cli.main()
+
+NB_MESSAGES = 100_000
+CSV_FIELDS = [f"servo/joint{joint}/position" for joint in range(6)]
+
+
+def make_message(i: int, roll: float = -0.02) -> dict:
+    return {
+        "time": i * 1e-3,
+        "servo": {
+            f"joint{joint}": {"position": 0.1 * i, "velocity": -1.0}
+            for joint in range(6)
+        },
+        "imu": {"pitch": 0.01, "roll": roll},
+    }
+
+
+def write_log(roll: float) -> str:
+    path = tempfile.mktemp(suffix=".mpack")
+    with SyncLogger(path) as logger:
+        for i in range(NB_MESSAGES):
+            logger.put(make_message(i, roll))
+    return path
+
+
+def bench(label: str, argv: list) -> None:
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            cli_main.main(argv)
+            duration = time.perf_counter() - start
+    print(f"{label:<32} {NB_MESSAGES / duration:>12,.0f} lines/s")
+
+
+if __name__ == "__main__":
+    buffer_size = cli_main.OUTPUT_BUFFER_SIZE
+    for roll, log in ((-0.02, "finite"), (float("nan"), "NaN")):
+        path = write_log(roll)
+        for size, suffix in ((0, "unbuffered"), (buffer_size, "buffered")):
+            cli_main.OUTPUT_BUFFER_SIZE = size
+            bench(f"json, {log} ({suffix})", ["dump", path])
+            bench(
+                f"csv, {log} ({suffix})",
+                ["dump", path, *CSV_FIELDS, "--format", "csv"],
+            )
+        os.unlink(path)
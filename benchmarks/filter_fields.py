@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare per-field lookups and single-pass extraction of 200 fields."""
+
+import time
+
+from mpacklog.cli.fields import FieldPath, FieldTree
+
+NB_MESSAGES = 10_000
+NB_SERVOS = 20
+SERVO_KEYS = [f"key{key}" for key in range(10)]
+
+
+def make_message(i: int) -> dict:
+    return {
+        "time": i * 1e-3,
+        "observation": {
+            "servo": {
+                f"joint{joint}": {key: 0.1 * i for key in SERVO_KEYS}
+                for joint in range(NB_SERVOS)
+            },
+        },
+    }
+
+
+def filter_per_field(message: dict, paths: list) -> dict:
+    output: dict = {}
+    for path in paths:  # walk from the root for each field
+        node = output
+        for key in path.keys[:-1]:
+            node = node.setdefault(key, {})
+        node[path.keys[-1]] = path.lookup(message)
+    return output
+
+
+def bench(label: str, function) -> None:
+    start = time.perf_counter()
+    for message in messages:
+        function(message)
+    duration = time.perf_counter() - start
+    print(f"{label:<28} {NB_MESSAGES / duration:>12,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    messages = [make_message(i) for i in range(NB_MESSAGES)]
+    fields = [
+        f"observation/servo/joint{joint}/{key}"
+        for joint in range(NB_SERVOS)
+        for key in SERVO_KEYS
+    ]
+    paths = [FieldPath(field) for field in fields]
+    tree = FieldTree(fields)
+    wildcard_tree = FieldTree(
+        [f"observation/servo/*/{key}" for key in SERVO_KEYS]
+    )
+    bench("per-field lookups", lambda m: filter_per_field(m, paths))
+    bench("field tree", tree.extract)
+    bench("field tree with wildcard", wildcard_tree.extract)
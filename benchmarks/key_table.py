@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare size and decoding speed of logs with and without interned keys."""
+
+import os
+import tempfile
+import time
+
+from mpacklog import SyncLogger, decode
+
+NB_MESSAGES = 50_000
+
+
+def make_message(i: int) -> dict:
+    return {
+        "time": i * 1e-3,
+        "observation": {
+            "servo": {
+                f"joint{j}": {"position": 0.1 * i, "velocity": -1.0}
+                for j in range(6)
+            },
+            "imu": {"pitch": 0.01, "roll": -0.02, "yaw": 0.5},
+            "contact": True,
+        },
+        "action": {f"joint{j}": 0.2 * j for j in range(6)},
+    }
+
+
+def bench(label: str, path: str, **kwargs) -> None:
+    start = time.perf_counter()
+    for _ in decode(path, **kwargs):
+        pass
+    duration = time.perf_counter() - start
+    print(f"{label:<30} {NB_MESSAGES / duration:>12,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    fields = ["time", "observation/servo/joint3/position"]
+    for intern_keys in (False, True):
+        path = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(path, intern_keys=intern_keys) as logger:
+            for i in range(NB_MESSAGES):
+                logger.put(make_message(i))
+        print(f"{intern_keys=}")
+        print(f"Log file: {os.path.getsize(path) / (1 << 20):.1f} MiB")
+        bench("full decode", path)
+        bench("2 fields", path, fields=fields)
+        os.unlink(path)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Measure `mpacklog list` on a full log, its index or a sample."""
+
+import contextlib
+import os
+import tempfile
+import time
+
+from mpacklog import SyncLogger
+from mpacklog.cli.main import main
+
+NB_MESSAGES = 50_000
+
+
+def make_message(i: int) -> dict:
+    return {
+        "time": i * 1e-3,
+        "observation": {
+            "servo": {
+                f"joint{joint}": {"position": 0.1 * i, "velocity": -1.0}
+                for joint in range(12)
+            },
+            "imu": {"pitch": 0.01, "roll": -0.02, "yaw": 0.5},
+        },
+        "action": {f"joint{joint}": 0.2 * joint for joint in range(12)},
+    }
+
+
+def bench(label: str, argv: list) -> None:
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            main(argv)
+            duration = time.perf_counter() - start
+    print(f"{label:<24} {duration:>8.3f} s")
+
+
+if __name__ == "__main__":
+    path = tempfile.mktemp(suffix=".mpack")
+    with SyncLogger(path, index_stride=1000) as logger:
+        for i in range(NB_MESSAGES):
+            logger.put(make_message(i))
+    print(f"Log file: {os.path.getsize(path) / (1 << 20):.1f} MiB")
+    bench("list", ["list", path])
+    bench("list --index", ["list", path, "--index"])
+    bench("list --sample 10", ["list", path, "--sample", "10"])
+    os.unlink(f"{path}.idx")
+    bench("list --sample 10 (resync)", ["list", path, "--sample", "10"])
+    os.unlink(path)
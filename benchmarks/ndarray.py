@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare packing NumPy arrays as lists or as extension types."""
+
+import time
+
+import msgpack
+import numpy as np
+
+from mpacklog.ext_types import ext_hook, serialize_ndarray
+from mpacklog.serialize import serialize
+
+NB_MESSAGES = 10_000
+
+
+def bench(label: str, message: dict) -> None:
+    for name, default, hook in (
+        ("lists", serialize, None),
+        ("ext type", serialize_ndarray, ext_hook),
+    ):
+        packer = msgpack.Packer(default=default, use_bin_type=True)
+        start = time.perf_counter()
+        for _ in range(NB_MESSAGES):
+            data = packer.pack(message)
+        pack_duration = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(NB_MESSAGES):
+            msgpack.unpackb(data, ext_hook=hook or msgpack.ExtType)
+        unpack_duration = time.perf_counter() - start
+        print(
+            f"{label:<22} {name:<10}"
+            f" {1e6 * pack_duration / NB_MESSAGES:>8.2f} us/pack"
+            f" {1e6 * unpack_duration / NB_MESSAGES:>8.2f} us/unpack"
+            f" {len(data):>8} bytes"
+        )
+
+
+if __name__ == "__main__":
+    bench("6x6 matrix", {"time": 0.0, "matrix": np.random.random((6, 6))})
+    bench("1000 samples", {"time": 0.0, "samples": np.random.random(1000)})
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare pack times of a regular packer and a compiled schema."""
+
+import time
+
+import msgpack
+import numpy as np
+
+from mpacklog import Schema
+from mpacklog.serialize import serialize
+
+NB_MESSAGES = 20_000
+
+NB_REPEATS = 5
+
+
+def make_scalar_message(i: int) -> dict:
+    return {
+        "time": i * 1e-3,
+        "observation": {
+            "servo": {
+                f"joint{j}": {"position": 0.1 * i, "velocity": -1.0}
+                for j in range(6)
+            },
+            "imu": {"pitch": 0.01, "roll": -0.02, "yaw": 0.5},
+            "contact": True,
+        },
+        "action": {f"joint{j}": 0.2 * j for j in range(6)},
+    }
+
+
+def make_array_message(i: int) -> dict:
+    return {
+        "time": i * 1e-3,
+        "observation": {
+            "servo": {
+                "position": np.full(6, 0.1 * i),
+                "velocity": np.full(6, -1.0),
+            },
+            "imu": {"orientation": np.eye(3), "pitch": 0.01},
+            "contact": True,
+        },
+        "action": np.full(6, 0.2 * i),
+    }
+
+
+def make_large_array_message(i: int) -> dict:
+    return {"time": i * 1e-3, "scan": np.full(1000, 0.1 * i)}
+
+
+def bench(label: str, make_message, packer) -> None:
+    messages = [make_message(i) for i in range(100)]
+    duration = float("inf")
+    for _ in range(NB_REPEATS):
+        start = time.perf_counter()
+        for i in range(NB_MESSAGES):
+            packer.pack(messages[i % 100])
+        duration = min(duration, time.perf_counter() - start)
+    print(f"{label:<20} {1e6 * duration / NB_MESSAGES:>8.2f} us/message")
+
+
+if __name__ == "__main__":
+    for make_message in (
+        make_scalar_message,
+        make_array_message,
+        make_large_array_message,
+    ):
+        print(f"{make_message.__name__}:")
+        packer = msgpack.Packer(default=serialize, use_bin_type=True)
+        bench("msgpack.Packer", make_message, packer)
+        bench("Schema", make_message, Schema(make_message(0)))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compare type-dispatched serialization with a chain of attribute checks."""
+
+import dataclasses
+import time
+
+import msgpack
+import numpy as np
+
+from mpacklog.serialize import register_encoder, serialize
+
+NB_MESSAGES = 100_000
+
+
+class SE3:
+    """Stand-in for pinocchio.SE3, exposing its matrix as ``np``."""
+
+    def __init__(self):
+        self.np = np.eye(4)
+
+
+class Custom:
+    """Object with its own serialization method."""
+
+    def serialize(self):
+        return {"foo": "bar"}
+
+
+@dataclasses.dataclass
+class Point:
+    """Dataclass converted by a registered encoder."""
+
+    x: float
+    y: float
+
+
+def serialize_hasattr(obj):
+    """Reference implementation: attribute checks on every object."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "np"):
+        return obj.np.tolist()
+    if hasattr(obj, "serialize"):
+        return obj.serialize()
+    if isinstance(obj, Point):
+        return [obj.x, obj.y]
+    return obj
+
+
+def encode_point(point: Point) -> list:
+    return [point.x, point.y]
+
+
+def bench(label: str, default) -> None:
+    objects = [np.zeros(6), np.float64(1.0), SE3(), Custom(), Point(1.0, 2.0)]
+    start = time.perf_counter()
+    for _ in range(NB_MESSAGES):
+        for obj in objects:
+            default(obj)
+    duration = time.perf_counter() - start
+    nb_objects = NB_MESSAGES * len(objects)
+    print(f"{label:<30} {1e9 * duration / nb_objects:>8.0f} ns/object")
+
+    message = dict(zip("abcde", objects))
+    packer = msgpack.Packer(default=default, use_bin_type=True)
+    start = time.perf_counter()
+    for _ in range(NB_MESSAGES):
+        packer.pack(message)
+    duration = time.perf_counter() - start
+    print(
+        f"{label + ' (pack)':<30} {1e6 * duration / NB_MESSAGES:>8.2f} us/message"
+    )
+
+
+if __name__ == "__main__":
+    register_encoder(Point, encode_point)
+    bench("attribute checks", serialize_hasattr)
+    bench("type dispatch", serialize)
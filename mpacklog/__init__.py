@@ -10,15 +10,32 @@
 __version__ = "4.0.1"
 
 from .async_logger import AsyncLogger
+from .dataset import open_dataset
 from .decode import decode
+from .decode_parallel import decode_parallel
+from .decode_rotated import decode_rotated
+from .decode_tail import decode_tail
 from .delta_decode import delta_decode
+from .delta_logger import AsyncDeltaLogger, DeltaLogger
+from .load_columns import load_columns
 from .log_server import LogServer
+from .schema import Schema
+from .serialize import register_encoder
 from .sync_logger import SyncLogger
 
 __all__ = [
+    "AsyncDeltaLogger",
     "AsyncLogger",
+    "DeltaLogger",
     "LogServer",
+    "Schema",
     "SyncLogger",
     "decode",
+    "decode_parallel",
+    "decode_rotated",
+    "decode_tail",
     "delta_decode",
+    "load_columns",
+    "open_dataset",
+    "register_encoder",
 ]
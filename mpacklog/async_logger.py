@@ -7,24 +7,140 @@
 """Logger with Asynchronous I/O."""
 
 import asyncio
+import time
+from typing import Any, List, Optional
 
 import aiofiles
 import msgpack
 
+from .compression import BlockCompressor
+from .ext_types import serialize_ndarray
+from .index import IndexWriter
+from .key_table import KeyInterningPacker
+from .rotation import Rotation
+from .schema import Schema
 from .serialize import serialize
 
 
 class AsyncLogger:
-    """Logger with Asynchronous I/O."""
+    """Logger with Asynchronous I/O.
 
-    def __init__(self, path):
+    The writing coroutine takes all messages available in the queue at once,
+    packs them into a single reusable buffer and issues one file write per
+    batch. The file is flushed when unflushed data reaches ``flush_bytes``,
+    when ``flush_interval`` has elapsed since the last flush, and in any case
+    when the logger stops. Packers other than the regular one, e.g. with
+    compression, interned keys or delta encoding, return packed messages
+    that are joined into one buffer per batch instead.
+
+    The logger can also rotate its output file after a size or duration
+    threshold, writing a rotated log as described in
+    :mod:`mpacklog.rotation`. Rotation happens between two messages, once
+    all previous messages are written and the previous file is closed.
+
+    Attributes:
+        path: Path to the output log file, which is the current file of the
+            rotated log when rotating.
+        queue: Queue of messages waiting to be written.
+    """
+
+    path: str
+    queue: asyncio.Queue
+
+    def __init__(
+        self,
+        path,
+        flush_bytes: int = 0,
+        flush_interval: Optional[float] = None,
+        index_stride: Optional[int] = None,
+        time_field: Optional[str] = "time",
+        ndarray_ext: bool = False,
+        schema: Optional[Schema] = None,
+        intern_keys: bool = False,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        block_size: int = 1 << 20,
+        rotate_bytes: Optional[int] = None,
+        rotate_interval: Optional[float] = None,
+    ):
         """Initialize logger.
 
         Args:
             path: Path to the output log file.
+            flush_bytes: Flush the file once at least this many bytes have
+                been written since the last flush. The default value of zero
+                flushes after every batch of messages.
+            flush_interval: If set, also flush the file when this duration in
+                seconds has elapsed since the last flush, even if fewer than
+                ``flush_bytes`` bytes are pending.
+            index_stride: If set, record the byte offset of every this many
+                messages in the sidecar index file of the log.
+            time_field: Timestamp field recorded in index entries, if any.
+            ndarray_ext: If set, pack NumPy arrays into the compact
+                extension type of :func:`mpacklog.ext_types.pack_ndarray`
+                rather than into lists.
+            schema: If set, pack messages with this compiled packer, which is
+                faster for messages with float arrays and the same structure
+                as its sample.
+            intern_keys: If set, replace the string keys of dictionaries by
+                integer ids in the log file, as described in
+                :mod:`mpacklog.key_table`. Not compatible with ``schema``.
+            compression: If set, write messages in blocks compressed by this
+                codec, "zlib", "zstd" or "lz4", as described in
+                :mod:`mpacklog.compression`. Not compatible with
+                ``intern_keys``.
+            compression_level: Compression level, or None for the default
+                level of the codec.
+            block_size: Uncompressed size in bytes of compressed blocks.
+                Messages of the current block are only written once it is
+                complete, or when the logger stops.
+            rotate_bytes: If set, rotate to a new output file once the
+                current one has at least this many bytes. Output files are
+                then named after ``path`` with a sequence number, see
+                :func:`mpacklog.rotation.get_rotated_path`.
+            rotate_interval: If set, rotate to a new output file once the
+                current one has been written to for this duration in seconds.
+
+        Raises:
+            ValueError: If ``intern_keys`` is set along with ``schema`` or
+                ``compression``.
         """
+        self.__rotation: Optional[Rotation] = None
+        if rotate_bytes is not None or rotate_interval is not None:
+            self.__rotation = Rotation(path, rotate_bytes, rotate_interval)
+            path = self.__rotation.current_path
+        self.__flush_bytes = flush_bytes
+        self.__flush_interval = flush_interval
         self.__writing = False
         self.__keep_going = True
+        self._index = (
+            IndexWriter(path, index_stride, time_field)
+            if index_stride is not None
+            else None
+        )
+        default = serialize_ndarray if ndarray_ext else serialize
+        self._packer: Any
+        if intern_keys:
+            if schema is not None:
+                raise ValueError("Schemas and interned keys are exclusive")
+            self._packer = KeyInterningPacker(default)
+        else:  # regular log file
+            self._packer = schema or msgpack.Packer(
+                default=default,
+                use_bin_type=True,
+                autoreset=compression is not None,  # else pack into buffer
+            )
+        self._compressor: Optional[BlockCompressor] = None
+        if compression is not None:
+            if intern_keys:
+                raise ValueError("Compression and interned keys are exclusive")
+            self._compressor = BlockCompressor(
+                compression, block_size, compression_level
+            )
+        self.__batch_messages: List[dict] = []
+        self.__batch_size = 0
+        self.__chunks: List[bytes] = []
+        self.__reuse_buffer = False
         self.path = path
         self.queue = asyncio.Queue()
 
@@ -43,23 +159,215 @@ class AsyncLogger:
             await self.put({"exit": True})
             await asyncio.sleep(0.01)
 
+    def _start_file(self) -> None:
+        """Start packing a new output file, truncated or after a rotation."""
+        if self._index is not None:
+            self._index.reset(self.path)
+        if isinstance(self._packer, KeyInterningPacker):
+            self._packer.reset()  # each file has its own key table
+        if self._compressor is not None:
+            self._compressor.reset()
+
+    async def __close_file(self, file) -> None:
+        """Write the pending compressed block, if any, and close the file.
+
+        Args:
+            file: Output file.
+        """
+        if self._compressor is not None:
+            await file.write(self._compressor.flush(self._index))
+        await file.close()
+        if self._index is not None:
+            self._index.close()
+
+    async def __rotate(self, file):
+        """Close the current output file and open the next one.
+
+        Args:
+            file: Current output file.
+
+        Returns:
+            Next output file.
+        """
+        await self.__close_file(file)
+        self.path = self.__rotation.next()
+        self._start_file()
+        return await aiofiles.open(self.path, "wb")
+
+    def _pack(self, message: dict) -> bytes:
+        """Pack a message and account for it in the index, if any.
+
+        Args:
+            message: Message to pack.
+
+        Returns:
+            Bytes to write to the log file.
+        """
+        return self._add(message, self._packer.pack(message))
+
+    def _add(self, message: dict, data: bytes, keyframe: bool = True) -> bytes:
+        """Account for a packed message in the index and compressor, if any.
+
+        Args:
+            message: Message before packing.
+            data: Packed message.
+            keyframe: If False, the message cannot be indexed, nor start a
+                compressed block.
+
+        Returns:
+            Bytes to write to the log file: the packed message, or with
+            compression a completed block if there is one.
+        """
+        if self._compressor is not None:
+            return self._compressor.add(message, data, keyframe, self._index)
+        if self._index is not None:
+            self._index.add(message, len(data), keyframe)
+        return data
+
+    def __pack_into_batch(self, message: dict) -> None:
+        """Pack a message at the end of the current batch.
+
+        The message is accounted for in the index and rotation, if any.
+
+        Args:
+            message: Message to pack.
+        """
+        if self.__reuse_buffer:
+            try:
+                self._packer.pack(message)  # into its reusable buffer
+            except Exception:  # the packer has dropped its whole buffer
+                for packed in self.__batch_messages:
+                    self._packer.pack(packed)
+                raise
+            self.__batch_messages.append(message)
+            if self._index is None and self.__rotation is None:
+                return  # no need for the size of the message
+            with self._packer.getbuffer() as buffer:
+                size = buffer.nbytes - self.__batch_size
+            if self._index is not None:
+                self._index.add(message, size)
+        else:  # packed message returned as bytes
+            data = self._pack(message)
+            self.__chunks.append(data)
+            size = len(data)
+        self.__batch_size += size
+        if self.__rotation is not None:
+            self.__rotation.add(size)
+
+    async def __write_batch(self, file) -> int:
+        """Write the current batch to file and start a new one.
+
+        Args:
+            file: Output file.
+
+        Returns:
+            Number of bytes written.
+        """
+        if self.__reuse_buffer:
+            buffer = self._packer.getbuffer()
+            size = buffer.nbytes
+            if size > 0:
+                await file.write(buffer)
+            buffer.release()
+            self._packer.reset()
+            self.__batch_messages.clear()
+        else:  # join packed messages
+            data = b"".join(self.__chunks)
+            self.__chunks.clear()
+            size = len(data)
+            if size > 0:
+                await file.write(data)
+        self.__batch_size = 0
+        return size
+
+    async def __get_message(self, timeout: Optional[float]):
+        """Wait for the next message in the queue.
+
+        Args:
+            timeout: If set, maximum duration to wait for, in seconds.
+
+        Returns:
+            Next message, or None if the timeout expired.
+        """
+        if timeout is None:
+            return await self.queue.get()
+        try:
+            return await asyncio.wait_for(self.queue.get(), max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            return None
+
     async def write(self, flush: bool = False):
-        """Continuously write messages from the logging queue to file."""
+        """Continuously write messages from the logging queue to file.
+
+        Args:
+            flush: If set, only write messages currently in the queue, then
+                return.
+        """
         assert not self.__writing
         self.__writing = True
-        async with aiofiles.open(self.path, "wb") as file:
-            packer = msgpack.Packer(default=serialize, use_bin_type=True)
+        self._start_file()  # the output file is truncated
+        if self.__rotation is not None:
+            self.__rotation.reset()
+        self.__reuse_buffer = (
+            type(self._packer) is msgpack.Packer and self._compressor is None
+        )
+        if self.__reuse_buffer:
+            self._packer.reset()
+        self.__batch_messages.clear()
+        self.__batch_size = 0
+        self.__chunks.clear()
+        file = await aiofiles.open(self.path, "wb")
+        try:
+            last_flush = time.monotonic()
+            unflushed = 0
             keep_going = not self.queue.empty() if flush else self.__keep_going
             while keep_going:
-                message = await self.queue.get()
-                if message == {"exit": True}:
+                timeout = None
+                if unflushed > 0 and self.__flush_interval is not None:
+                    elapsed = time.monotonic() - last_flush
+                    timeout = self.__flush_interval - elapsed
+                message = await self.__get_message(timeout)
+                exit_requested = False
+                while message is not None:
+                    if message == {"exit": True}:
+                        exit_requested = True
+                        break
+                    if (
+                        self.__rotation is not None
+                        and self.__rotation.is_due()
+                    ):
+                        await self.__write_batch(file)
+                        file = await self.__rotate(file)
+                        last_flush = time.monotonic()
+                        unflushed = 0
+                    self.__pack_into_batch(message)
+                    if self.queue.empty():
+                        break
+                    message = self.queue.get_nowait()
+                unflushed += await self.__write_batch(file)
+                now = time.monotonic()
+                if unflushed > 0 and (
+                    exit_requested
+                    or unflushed >= self.__flush_bytes
+                    or (
+                        self.__flush_interval is not None
+                        and now - last_flush >= self.__flush_interval
+                    )
+                ):
+                    await file.flush()
+                    last_flush = now
+                    unflushed = 0
+                if exit_requested:
                     break
-                await file.write(packer.pack(message))
-                await file.flush()
                 keep_going = (
                     not self.queue.empty() if flush else self.__keep_going
                 )
-        self.__writing = False
+        finally:
+            try:  # messages packed before an exception, if any
+                await self.__write_batch(file)
+                await self.__close_file(file)
+            finally:
+                self.__writing = False
 
     async def flush(self):
         """Flush messages from the logging queue to file."""
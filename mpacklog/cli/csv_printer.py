@@ -6,27 +6,58 @@
 
 """Print fields from the input in CSV format."""
 
+import csv
 from typing import List
 
-from .fields import get_from_field
+from .fields import MISSING, FieldPath
 from .printer import Printer
 
 
+def str_from_value(value) -> str:
+    """Format a value for a CSV cell.
+
+    Args:
+        value: Value to format.
+
+    Returns:
+        Formatted value.
+    """
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if hasattr(value, "tolist"):  # numpy.ndarray
+        value = value.tolist()
+    return str(value)
+
+
+CSV_TYPES = frozenset([float, int, str])  # written as is by csv writers
+
+
 class CSVPrinter(Printer):
-    """Print fields from the input in CSV format."""
+    """Print fields from the input in CSV format.
+
+    Attributes:
+        fields: Fields to print, with nested keys in "key1/.../keyN" format.
+        paths: Precompiled paths to the fields to print.
+        writer: CSV writer formatting rows into the output buffer.
+    """
 
-    def __init__(self, fields: List[str]):
+    def __init__(self, fields: List[str], buffer_size: int = 0):
         """Initialize printer.
 
         Args:
             fields: List of fields to print.
+            buffer_size: Number of buffered characters above which output is
+                written to the standard output.
         """
         if len(fields) < 1:
             raise ValueError("A list of fields is required for the CSV format")
+        super().__init__(buffer_size)
         if fields[0] != "time":
             fields.insert(0, "time")
-        print(",".join(fields))
         self.fields = fields
+        self.paths = [FieldPath(field) for field in fields]
+        self.writer = csv.writer(self, lineterminator="\n")
+        self.writer.writerow(fields)
 
     def process(self, unpacked: dict):
         """Process a new unpacked dictionary.
@@ -34,14 +65,28 @@ class CSVPrinter(Printer):
         Args:
             unpacked: Unpacked dictionary.
         """
+        row = [path.lookup(unpacked) for path in self.paths]
+        if not CSV_TYPES.issuperset(map(type, row)):
+            for i, value in enumerate(row):
+                if type(value) not in CSV_TYPES:
+                    row[i] = "0" if value is MISSING else str_from_value(value)
+        self.writer.writerow(row)
+
+    def process_batch(self, messages: List[dict]):
+        """Process a batch of unpacked dictionaries.
 
-        def str_from_value(value):
-            if isinstance(value, bool):
-                return "1" if value else "0"
-            return str(value)
+        Fields are looked up column by column over the batch, and all rows
+        are formatted by a single call to the CSV writer.
 
-        values = [
-            str_from_value(get_from_field(unpacked, field, default="0"))
-            for field in self.fields
-        ]
-        print(",".join(values))
+        Args:
+            messages: Unpacked dictionaries, in log order.
+        """
+        columns = [list(map(path.lookup, messages)) for path in self.paths]
+        for column in columns:
+            if not CSV_TYPES.issuperset(map(type, column)):
+                for i, value in enumerate(column):
+                    if type(value) not in CSV_TYPES:
+                        column[i] = (
+                            "0" if value is MISSING else str_from_value(value)
+                        )
+        self.writer.writerows(zip(*columns))
@@ -6,17 +6,82 @@
 
 """Parse whole log and list all fields encountered."""
 
+from typing import List, Set
+
 from .fields import list_fields
 from .printer import Printer
 
+MAX_KEY_STRUCTURES = 4096
+
+
+def append_key_structure(dictionary: dict, structure: List) -> List:
+    """Append the key structure of a nested dictionary to a flat list.
+
+    Keys are appended in order, and the keys of each child dictionary are
+    enclosed between two ``None`` markers so that nesting is preserved.
+
+    Args:
+        dictionary: Nested dictionary.
+        structure: List to append the key structure to.
+
+    Returns:
+        The list the structure was appended to.
+    """
+    for key, value in dictionary.items():
+        structure.append(key)
+        if type(value) is dict:
+            structure.append(None)
+            append_key_structure(value, structure)
+            structure.append(None)
+    return structure
+
+
+def get_key_structure(dictionary: dict) -> tuple:
+    """Get the key structure of a nested dictionary, i.e. keys without values.
+
+    Args:
+        dictionary: Nested dictionary.
+
+    Returns:
+        Hashable key structure of the dictionary.
+    """
+    return tuple(append_key_structure(dictionary, []))
+
 
 class FieldPrinter(Printer):
-    """Parse whole log, then finally list all fields encountered."""
+    """Parse whole log, then finally list all fields encountered.
+
+    Fields of a message are only listed when its key structure has not been
+    seen before, so that messages with a known structure are skipped after a
+    cheap check. The set of seen structures is cleared once it holds
+    ``max_structures`` entries, so that it stays bounded on long follows.
+
+    Attributes:
+        fields: Fields encountered so far.
+        max_structures: Number of key structures above which the set of seen
+            structures is cleared.
+    """
 
-    def __init__(self):
-        """Initialize field printer."""
+    fields: Set[str]
+    max_structures: int
+
+    def __init__(
+        self,
+        buffer_size: int = 0,
+        max_structures: int = MAX_KEY_STRUCTURES,
+    ):
+        """Initialize field printer.
+
+        Args:
+            buffer_size: Number of buffered characters above which the buffer
+                is written to the standard output.
+            max_structures: Number of key structures above which the set of
+                seen structures is cleared.
+        """
+        super().__init__(buffer_size)
+        self.__structures: Set[tuple] = set()
         self.fields = set([])
-        self.observation = {}
+        self.max_structures = max_structures
 
     def process(self, unpacked: dict):
         """Process a new unpacked dictionary.
@@ -24,11 +89,15 @@ class FieldPrinter(Printer):
         Args:
             unpacked: Unpacked dictionary.
         """
-        unpacked_fields = set(list_fields(unpacked))
-        new_fields = unpacked_fields - self.fields
+        structure = get_key_structure(unpacked)
+        if structure in self.__structures:
+            return
+        if len(self.__structures) >= self.max_structures:
+            self.__structures.clear()
+        self.__structures.add(structure)
+        new_fields = set(list_fields(unpacked)) - self.fields
         if len(new_fields) > 0:
-            for field in sorted(list(new_fields)):
-                print(f"- {field}")
-            print("")
+            self.write(
+                "".join(f"- {field}\n" for field in sorted(new_fields)) + "\n"
+            )
         self.fields = set.union(self.fields, new_fields)
-        self.observation.update(unpacked)
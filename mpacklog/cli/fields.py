@@ -6,8 +6,9 @@
 
 """Manage fields, i.e. nested keys represented as `foo/bar/blah`."""
 
+import functools
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 
 @dataclass
@@ -33,6 +34,85 @@ class Field:
         return self.label.split("/")
 
 
+MISSING: Any = object()  # sentinel for values missing from a dictionary
+
+WILDCARD = "*"  # field key matching all keys of a dictionary or list
+
+
+class FieldPath:
+    """Precompiled key path to a value in nested dictionaries.
+
+    A field path parses its field once, including keys that may index lists
+    or NumPy arrays, so that looking it up in many dictionaries does not
+    split the field nor convert list indices again.
+
+    Attributes:
+        field: Field string, with nested keys in "key1/.../keyN" format.
+        keys: Keys to search field values from in input dictionaries.
+    """
+
+    field: str
+    keys: Tuple[str, ...]
+
+    def __init__(self, field: str):
+        """Parse a field.
+
+        Args:
+            field: Field string, with nested keys in "key1/.../keyN" format.
+        """
+        keys = tuple(field.split("/"))
+        self.__steps = tuple(
+            (key, int(key) if key.lstrip("-").isdigit() else None)
+            for key in keys
+        )
+        self.field = field
+        self.keys = keys
+
+    def __repr__(self) -> str:
+        """String representation of the field path."""
+        return f"FieldPath({self.field!r})"
+
+    def lookup(self, collection: Any) -> Any:
+        """Look up the value at this path in a nested dictionary.
+
+        Args:
+            collection: Dictionary or list to get value from.
+
+        Returns:
+            Value in the nested dictionary, or :data:`MISSING` if there is
+            nothing at this path.
+        """
+        value = collection
+        for key, index in self.__steps:
+            if isinstance(value, dict):
+                value = value.get(key, MISSING)
+                if value is MISSING:
+                    return MISSING
+            elif index is not None and (
+                isinstance(value, list) or hasattr(value, "ndim")
+            ):
+                try:
+                    value = value[index]  # list or numpy.ndarray
+                except (IndexError, TypeError):  # TypeError: 0-d array
+                    return MISSING
+            else:  # scalar value, or list with a non-integer key
+                return MISSING
+        return value
+
+
+@functools.lru_cache(maxsize=1024)
+def get_field_path(field: str) -> FieldPath:
+    """Get the precompiled path to a field, compiling it on first use.
+
+    Args:
+        field: Field string, with nested keys in "key1/.../keyN" format.
+
+    Returns:
+        Precompiled path to the field.
+    """
+    return FieldPath(field)
+
+
 def get_from_keys(
     collection: Union[dict, list], keys: list, default: Optional[Any] = None
 ):
@@ -50,8 +130,8 @@ def get_from_keys(
         Value from nested dictionary.
     """
     key = keys[0]
-    if isinstance(collection, list):
-        key = int(key)
+    if isinstance(collection, list) or hasattr(collection, "ndim"):
+        key = int(key)  # list or numpy.ndarray
     try:
         child = collection[key]
     except KeyError:
@@ -83,9 +163,14 @@ def get_from_field(
 
     Returns:
         Value in nested dictionary.
+
     """
-    keys = field.split("/")
-    return get_from_keys(collection, keys, default)
+    value = get_field_path(field).lookup(collection)
+    if value is not MISSING:
+        return value
+    if default is not None:
+        return default
+    return get_from_keys(collection, field.split("/"))  # raise error
 
 
 def list_fields(dictionary: dict, prefix: str = "") -> List[str]:
@@ -121,7 +206,7 @@ def print_fields(dictionary: dict, label: str = "") -> None:
     print(manucure.join([""] + sorted(fields)))
 
 
-def set_from_keys(dictionary: dict, keys: list, value) -> None:
+def set_from_keys(dictionary: dict, keys: Sequence[str], value) -> None:
     """Set the value `d[key1][key2][...][keyN]` into a dictionary `d`.
 
     Args:
@@ -137,25 +222,223 @@ def set_from_keys(dictionary: dict, keys: list, value) -> None:
     dictionary[key] = value
 
 
-def filter_fields(dictionary: Dict, fields: Optional[List] = None):
+def build_field_tree(fields: Sequence[str]) -> dict:
+    """Build the tree of nested keys of a list of fields.
+
+    Args:
+        fields: Fields, i.e. nested keys in "key1/.../keyN" format.
+
+    Returns:
+        Tree of nested dictionaries where leaves, i.e. fields to unpack
+        entirely, are None.
+    """
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        keys = Field(field).keys
+        for key in keys[:-1]:
+            child = node.setdefault(key, {})
+            if child is None:  # a parent field is already selected
+                break
+            node = child
+        else:
+            node[keys[-1]] = None
+    return tree
+
+
+def merge_field_trees(tree: Optional[dict], other: Optional[dict]):
+    """Merge two trees of nested keys.
+
+    Args:
+        tree: First tree, or None to select a whole value.
+        other: Second tree, or None to select a whole value.
+
+    Returns:
+        Tree selecting the union of both trees.
+    """
+    if tree is None or other is None:
+        return None
+    merged = dict(tree)
+    for key, child in other.items():
+        merged[key] = (
+            merge_field_trees(merged[key], child) if key in merged else child
+        )
+    return merged
+
+
+class FieldTree:
+    """Prefix tree of fields to extract from nested dictionaries.
+
+    A field tree extracts all its fields from a dictionary in a single
+    traversal, walking each dictionary shared by several fields only once,
+    and outputs a dictionary with the same nesting as the input. Field keys
+    may be the wildcard ``*``, which matches all keys of a dictionary or all
+    elements of a list, as in "servo/*/position".
+
+    Elements of lists and NumPy arrays are output in dictionaries, with their
+    index as key, so that the output nesting follows field keys.
+
+    Attributes:
+        fields: Fields to extract, with nested keys in "key1/.../keyN" format.
+    """
+
+    fields: List[str]
+
+    def __init__(self, fields: Sequence[str]):
+        """Compile the tree of a list of fields.
+
+        Args:
+            fields: Fields to extract, with nested keys in "key1/.../keyN"
+                format.
+        """
+        self.__root = self.__compile(build_field_tree(fields), "")
+        self.fields = list(fields)
+
+    def __compile(self, tree: dict, prefix: str) -> tuple:
+        """Compile a node of the tree of nested keys.
+
+        Args:
+            tree: Tree of nested keys under this node.
+            prefix: Field of this node followed by a slash, or an empty
+                string for the root node.
+
+        Returns:
+            Pair of a dictionary of children entries and a wildcard entry, or
+            None if there is no wildcard. An entry is a tuple with the
+            compiled child node (None to extract the whole value), the field
+            of the child, whether the field is required, i.e. has no
+            wildcard, and the list index of the key if it is an integer.
+        """
+        wildcard_tree = tree.get(WILDCARD, MISSING)
+        children: Dict[str, tuple] = {}
+        wildcard: Optional[tuple] = None
+        for key, subtree in tree.items():
+            if wildcard_tree is not MISSING and key != WILDCARD:
+                subtree = merge_field_trees(subtree, wildcard_tree)
+            field = f"{prefix}{key}"
+            entry = (
+                None
+                if subtree is None
+                else self.__compile(subtree, f"{field}/"),
+                field,
+                WILDCARD not in field.split("/"),
+                int(key) if key.lstrip("-").isdigit() else None,
+            )
+            if key == WILDCARD:
+                wildcard = entry
+            else:  # regular key
+                children[key] = entry
+        return children, wildcard
+
+    def extract(self, dictionary: dict) -> dict:
+        """Extract the fields of the tree from a dictionary.
+
+        Args:
+            dictionary: Dictionary to extract fields from.
+
+        Returns:
+            Dictionary with the extracted fields, nested as in the input.
+            Missing fields are reported on the standard output and left out.
+        """
+        output = self.__extract(self.__root, dictionary)
+        return {} if output is MISSING else output
+
+    def __extract(self, node: tuple, value: Any) -> Any:
+        """Extract fields under a node of the tree from a value.
+
+        Args:
+            node: Compiled node of the tree.
+            value: Value at this node in the input dictionary.
+
+        Returns:
+            Dictionary of fields extracted from the value, or
+            :data:`MISSING` if the value is not a collection.
+        """
+        children, wildcard = node
+        if isinstance(value, dict):
+            if wildcard is None:
+                items = [
+                    (key, value.get(key, MISSING), entry)
+                    for key, entry in children.items()
+                ]
+            else:  # expand wildcard against the dictionary
+                items = [
+                    (key, item, children.get(key, wildcard))
+                    for key, item in value.items()
+                ]
+                items.extend(
+                    (key, MISSING, entry)
+                    for key, entry in children.items()
+                    if key not in value
+                )
+        elif isinstance(value, list) or hasattr(value, "ndim"):
+            items = []
+            for key, entry in children.items():
+                index = entry[3]
+                if index is None or not -len(value) <= index < len(value):
+                    items.append((key, MISSING, entry))
+                else:  # list index or numpy.ndarray index
+                    items.append((key, value[index], entry))
+            if wildcard is not None:  # expand wildcard against the list
+                items.extend(
+                    (str(index), item, wildcard)
+                    for index, item in enumerate(value)
+                    if str(index) not in children
+                )
+        else:  # scalar value
+            for _, field, required, _ in children.values():
+                if required:
+                    print(f"Field '{field}' not found")
+            return MISSING
+        output = {}
+        for key, item, (child, field, required, _) in items:
+            if item is not MISSING and child is not None:
+                item = self.__extract(child, item)
+                if item is MISSING or not item:
+                    continue  # missing fields under this one already reported
+            if item is MISSING:
+                if required:
+                    print(f"Field '{field}' not found")
+                continue
+            output[key] = item
+        return output
+
+
+@functools.lru_cache(maxsize=64)
+def get_field_tree(fields: Tuple[str, ...]) -> FieldTree:
+    """Get the compiled tree of a list of fields, compiling it on first use.
+
+    Args:
+        fields: Fields, with nested keys in "key1/.../keyN" format.
+
+    Returns:
+        Compiled tree of the fields.
+    """
+    return FieldTree(fields)
+
+
+def filter_fields(
+    dictionary: Dict,
+    fields: Optional[Union[Sequence[Union[str, FieldPath]], FieldTree]] = None,
+):
     """Filter selected fields in a dictionary.
 
     Args:
         dictionary: Dictionary to filter.
         fields: If given, only print out these selected fields (nested keys in
-        "key1/.../keyN" format).
+            "key1/.../keyN" format, with "*" matching all keys at a level, or
+            precompiled field paths), or their compiled field tree.
 
     Returns:
-        Filtered dictionary.
+        Filtered dictionary, with the same nesting as the input one.
     """
     if not fields:
         return dictionary
-    output: dict = {}
-    for field in fields:
-        keys = field.split("/")
-        try:
-            value = get_from_field(dictionary, field)
-            set_from_keys(output, keys, value)
-        except KeyError as exn:
-            print(f"Field {str(exn)} not found when looking up '{field}'")
-    return output
+    if not isinstance(fields, FieldTree):
+        fields = get_field_tree(
+            tuple(
+                field.field if isinstance(field, FieldPath) else field
+                for field in fields
+            )
+        )
+    return fields.extract(dictionary)
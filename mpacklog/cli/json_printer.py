@@ -7,23 +7,112 @@
 """JSON Lines printer."""
 
 import json
-from typing import List, Optional
+import math
+from typing import List, Optional, Set
 
-from .fields import filter_fields
+from ..serialize import serialize
+from .fields import FieldTree, filter_fields
 from .printer import Printer
 
 
+def replace_non_finite(value):
+    """Replace NaN and infinite floats, which are not valid JSON, by None.
+
+    Args:
+        value: Value to encode in JSON, possibly nested.
+
+    Returns:
+        Same value with non-finite floats replaced by None. Objects that are
+        not JSON types, e.g. NumPy arrays, are serialized first.
+    """
+    if type(value) is dict:  # most frequent case in unpacked messages
+        return {key: replace_non_finite(item) for key, item in value.items()}
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, (list, tuple)):
+        return [replace_non_finite(item) for item in value]
+    if value is None or isinstance(value, (str, int, dict)):
+        return value
+    serialized = serialize(value)
+    return value if serialized is value else replace_non_finite(serialized)
+
+
+def serialize_json(obj):
+    """Serialize an object that is not a JSON type, e.g. a NumPy array.
+
+    Args:
+        obj: Object to serialize.
+
+    Returns:
+        Serialized object.
+
+    Raises:
+        TypeError: If the object is left as is by serialization, e.g. bytes,
+            as encoding it again would recurse forever.
+    """
+    serialized = serialize(obj)
+    if serialized is obj:
+        raise TypeError(
+            f"Object of type {type(obj).__name__} is not JSON serializable"
+        )
+    return serialized
+
+
 class JSONPrinter(Printer):
-    """Default printer: print everything in JSON Lines."""
+    """Default printer: print everything in JSON Lines.
+
+    NaN and infinite values are printed as null. Once a top-level key of a
+    message has such values, they are replaced under this key in all
+    subsequent messages before encoding, as they tend to recur in a log.
 
-    def __init__(self, fields: Optional[List] = None):
+    Attributes:
+        fields: Fields to print, or None to print everything.
+        tree: Field tree extracting the fields to print from messages.
+    """
+
+    def __init__(self, fields: Optional[List] = None, buffer_size: int = 0):
         """Configure printer options.
 
         Args:
             fields: If given, only print out these selected fields (nested keys
-                in "key1/.../keyN" format).
+                in "key1/.../keyN" format, with "*" matching all keys at a
+                level).
+            buffer_size: Number of buffered characters above which output is
+                written to the standard output.
         """
+        super().__init__(buffer_size)
+        self.__encoder = json.JSONEncoder(
+            allow_nan=False,
+            check_circular=False,  # unpacked messages have no cycles
+            default=serialize_json,  # e.g. NumPy arrays
+        )
+        self.__non_finite_keys: Set[str] = set()
         self.fields = fields
+        self.tree = FieldTree(fields) if fields else None
+
+    def __replace_non_finite(self, output: dict) -> dict:
+        return {
+            key: (
+                replace_non_finite(value)
+                if key in self.__non_finite_keys
+                else value
+            )
+            for key, value in output.items()
+        }
+
+    def __encode(self, unpacked: dict) -> str:
+        output = filter_fields(unpacked, self.tree)
+        if self.__non_finite_keys:
+            output = self.__replace_non_finite(output)
+        try:
+            return self.__encoder.encode(output)
+        except ValueError:  # NaN or infinite values under new keys
+            for key, value in output.items():
+                try:
+                    self.__encoder.encode(value)
+                except ValueError:
+                    self.__non_finite_keys.add(key)
+            return self.__encoder.encode(self.__replace_non_finite(output))
 
     def process(self, unpacked: dict) -> None:
         """Process a new unpacked dictionary.
@@ -31,7 +120,16 @@ class JSONPrinter(Printer):
         Args:
             unpacked: Unpacked dictionary.
         """
-        output_with_nan = json.dumps(
-            filter_fields(unpacked, self.fields), allow_nan=True
-        )
-        print(output_with_nan.replace(" NaN", " null"))  # kroOOOOoooonn!!!
+        self.write(self.__encode(unpacked) + "\n")
+
+    def process_batch(self, messages: List[dict]) -> None:
+        """Process a batch of unpacked dictionaries.
+
+        Lines of the batch are joined and written to the buffer at once.
+
+        Args:
+            messages: Unpacked dictionaries, in log order.
+        """
+        lines = list(map(self.__encode, messages))
+        lines.append("")  # final newline
+        self.write("\n".join(lines))
@@ -8,18 +8,37 @@
 
 import argparse
 import logging
-import time
+import os
+from itertools import islice
+from typing import List, Optional, Tuple
 
 import msgpack
 
+from mpacklog.compression import get_log_unpacker
+from mpacklog.decode_tail import read_tail
 from mpacklog.delta_decode import delta_decode
+from mpacklog.ext_types import serialize_ndarray
+from mpacklog.follow import FileFollower
+from mpacklog.index import Index, build_index, get_time
+from mpacklog.key_table import get_key_table
 from mpacklog.log_server import LogServer
+from mpacklog.seek import (
+    find_boundary,
+    find_time_offset,
+    read_messages_at,
+)
 
 from .csv_printer import CSVPrinter
 from .field_printer import FieldPrinter
 from .json_printer import JSONPrinter
 from .printer import Printer
 
+OUTPUT_BUFFER_SIZE = 1 << 16  # characters of output written at once
+
+READ_SIZE = 1 << 16  # bytes read at once, unpacked into a batch of messages
+
+MERGE_BATCH_SIZE = 1000  # merged messages processed at once
+
 
 def get_argument_parser() -> argparse.ArgumentParser:
     """Parser for command-line arguments.
@@ -38,9 +57,24 @@ def get_argument_parser() -> argparse.ArgumentParser:
         help="Dump log file as JSON Lines to the standard output",
     )
     dump_parser.add_argument(
-        "logfile", metavar="logfile", help="log file to open"
+        "logfile",
+        metavar="logfile",
+        help="log file to open, or directory of log files to merge by "
+        "timestamp",
+    )
+    dump_parser.add_argument(
+        "fields",
+        nargs="*",
+        help="fields to plot, after other log files to merge by timestamp",
+    )
+    dump_parser.add_argument(
+        "-m",
+        "--merge",
+        metavar="logfile",
+        action="append",
+        default=[],
+        help="other log file to merge by timestamp, may be repeated",
     )
-    dump_parser.add_argument("fields", nargs="*", help="fields to plot")
     dump_parser.add_argument(
         "--format",
         choices=["csv", "json", "python"],
@@ -53,12 +87,65 @@ def get_argument_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="keep file open and follow, as in `tail -f`",
     )
+    dump_parser.add_argument(
+        "--since",
+        metavar="time",
+        help="only dump messages with a timestamp greater than or equal to "
+        "this value",
+        type=float,
+    )
+    dump_parser.add_argument(
+        "--until",
+        metavar="time",
+        help="only dump messages with a timestamp strictly lower than this "
+        "value",
+        type=float,
+    )
+    dump_parser.add_argument(
+        "-n",
+        "--tail",
+        metavar="N",
+        help="only dump the last N messages, as in `tail -n`",
+        type=int,
+    )
+    dump_parser.add_argument(
+        "--time-field",
+        metavar="time_field",
+        help="timestamp field used by --since and --until",
+        default="time",
+    )
     dump_parser.add_argument(
         "--output-dir",
         metavar="output_dir",
         help="Output directory to write data and Python script to",
     )
 
+    # mpacklog index ----------------------------------------------------------
+    index_parser = subparsers.add_parser(
+        "index",
+        help="Build the sidecar index of a log file",
+    )
+    index_parser.add_argument(
+        "logfile", metavar="logfile", help="log file to index"
+    )
+    index_parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="log file is delta-encoded, only index keyframes",
+    )
+    index_parser.add_argument(
+        "--stride",
+        help="number of messages between two index entries",
+        type=int,
+        default=1000,
+    )
+    index_parser.add_argument(
+        "--time-field",
+        metavar="time_field",
+        help="timestamp field recorded in index entries",
+        default="time",
+    )
+
     # mpacklog list -----------------------------------------------------------
     list_parser = subparsers.add_parser(
         "list",
@@ -67,6 +154,17 @@ def get_argument_parser() -> argparse.ArgumentParser:
     list_parser.add_argument(
         "logfile", metavar="logfile", help="log file to open"
     )
+    list_parser.add_argument(
+        "--sample",
+        metavar="N",
+        help="only read N messages spread evenly over the log file",
+        type=int,
+    )
+    list_parser.add_argument(
+        "--index",
+        action="store_true",
+        help="only read the messages at entries of the log index",
+    )
 
     # mpacklog serve ----------------------------------------------------------
     serve_parser = subparsers.add_parser(
@@ -113,35 +211,230 @@ def decode_delta_log(input_file: str, output_file: str) -> None:
         output_file: Path to output file for decoded log.
     """
     with open(output_file, "wb") as out_file:
-        packer = msgpack.Packer()
+        packer = msgpack.Packer(default=serialize_ndarray)
         for cumulative_dict in delta_decode(input_file):
             packed_data = packer.pack(cumulative_dict)
             out_file.write(packed_data)
 
 
-def dump_log(logfile: str, printer: Printer, follow: bool = False) -> None:
+def dump_log(
+    logfile: str,
+    printer: Printer,
+    follow: bool = False,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    time_field: str = "time",
+    tail: Optional[int] = None,
+) -> None:
     """Dump log file.
 
     Args:
         logfile: Path to input log file.
         printer: Printer class to process unpacked messages.
-        follow (optional): Keep file open and wait for updates?
+        follow (optional): Keep file open and wait for updates? The file is
+            followed through truncations and rotations, see
+            :class:`mpacklog.follow.FileFollower`.
+        since (optional): Only dump messages with a timestamp greater than or
+            equal to this value. Reading starts close to the first such
+            message, using the log index if there is one.
+        until (optional): Only dump messages with a timestamp strictly lower
+            than this value, and stop at the first message past it.
+        time_field (optional): Timestamp field used by `since` and `until`.
+        tail (optional): Only dump the last messages of the log file, reading
+            it backwards from its end rather than from its beginning. With
+            `follow`, new messages are dumped after these ones.
     """
+    by_time = since is not None or until is not None
+
+    def dump_messages(messages: List[dict]) -> bool:
+        if not by_time:
+            printer.process_batch(messages)
+            return True
+        batch: List[dict] = []
+        for unpacked in messages:
+            timestamp = get_time(unpacked, time_field)
+            if timestamp is None:
+                continue
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp >= until:
+                printer.process_batch(batch)
+                return False
+            batch.append(unpacked)
+        printer.process_batch(batch)
+        return True
+
     with open(logfile, "rb") as filehandle:
-        unpacker = msgpack.Unpacker(raw=False)
+        last_messages: List[dict] = []
+        if tail is not None:
+            last_messages, end = read_tail(
+                filehandle, max(tail, 0), index=Index.read(logfile)
+            )
+            filehandle.seek(end)
+        elif since is not None:
+            index = Index.read(logfile)
+            filehandle.seek(
+                find_time_offset(filehandle, since, time_field, index)
+            )
+        try:
+            if not dump_messages(last_messages):
+                return
+            if tail is not None and not follow:
+                return
+        except BrokenPipeError:  # handle e.g. piping to `head`
+            return
+        offset = filehandle.tell()
+        table = get_key_table(filehandle, offset)
+        filehandle.seek(0)
+        header = filehandle.read(8)
+        filehandle.seek(offset)
+        unpacker = get_log_unpacker(header, table)
+        if unpacker is None and not follow:  # too short to hold a message
+            return
+        # Bytes of a followed file whose format is not known yet, which can
+        # only be its beginning as there is no complete message before them
+        pending = header[:offset] if unpacker is None else b""
+        follower = FileFollower(logfile, offset) if follow else None
+        try:
+            while True:
+                if follower is None:
+                    data = filehandle.read(READ_SIZE)
+                    if not data:  # end of file
+                        break
+                else:  # wait for new data
+                    data = follower.read()
+                    if follower.reopened:  # file truncated or rotated
+                        unpacker, pending = None, b""
+                if unpacker is None:  # detect format from the file header
+                    pending += data
+                    unpacker = get_log_unpacker(pending)
+                    if unpacker is None:
+                        continue
+                    data, pending = pending, b""
+                unpacker.feed(data)
+                try:
+                    if not dump_messages(list(unpacker)):
+                        return
+                    if follower is not None:  # print new messages right away
+                        printer.flush()
+                except BrokenPipeError:  # handle e.g. piping to `head`
+                    break
+        finally:
+            if follower is not None:
+                follower.close()
+
+
+def sample_log(
+    logfile: str, printer: Printer, nb_samples: Optional[int] = None
+) -> None:
+    """Process a sample of the messages of a log file.
+
+    Messages are read at message boundaries, found from the log index if
+    there is one, so that the rest of the log file is skipped. In compressed
+    log files, all messages of the block at each boundary are processed.
+
+    Args:
+        logfile: Path to input log file.
+        printer: Printer class to process unpacked messages.
+        nb_samples (optional): Number of boundaries to read messages at,
+            spread evenly over the log file. If unset, read messages at all
+            entries of the log index.
+
+    Raises:
+        FileNotFoundError: If there is no log index to read all entries of.
+    """
+    index = Index.read(logfile)
+    with open(logfile, "rb") as filehandle:
+        if nb_samples is None:
+            if index is None:
+                raise FileNotFoundError(
+                    f"No index for {logfile}, build one with `mpacklog index`"
+                )
+            offsets = index.offsets
+        elif index is not None:
+            nb_offsets = len(index.offsets)
+            nb_samples = min(nb_samples, nb_offsets)
+            offsets = [
+                index.offsets[i * nb_offsets // nb_samples]
+                for i in range(nb_samples)
+            ]
+        else:  # find boundaries at evenly spaced offsets
+            file_size = os.fstat(filehandle.fileno()).st_size
+            offsets = []
+            for i in range(nb_samples):
+                boundary = find_boundary(
+                    filehandle,
+                    file_size * i // nb_samples,
+                    start=offsets[-1] if offsets else 0,
+                )
+                if boundary is None:
+                    break
+                if not offsets or boundary > offsets[-1]:
+                    offsets.append(boundary)
+        for offset in offsets:
+            printer.process_batch(read_messages_at(filehandle, offset))
+
+
+def dump_dataset(
+    paths: List[str],
+    printer: Printer,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    time_field: str = "time",
+) -> None:
+    """Dump several log files merged by timestamp.
+
+    Each dumped message gets a "source" field with the path to the log file
+    it was read from.
+
+    Args:
+        paths: Paths to log files, base paths of rotated logs, or directories
+            of log files.
+        printer: Printer class to process unpacked messages.
+        since (optional): Only dump messages with a timestamp greater than or
+            equal to this value.
+        until (optional): Only dump messages with a timestamp strictly lower
+            than this value.
+        time_field (optional): Timestamp field used to merge log files.
+    """
+    # Imported here as decoders depend on the CLI module for field paths
+    from mpacklog.dataset import open_dataset
+
+    messages = (
+        {"source": source, **unpacked}
+        for source, unpacked in open_dataset(
+            paths, start_time=since, end_time=until, time_field=time_field
+        )
+    )
+    try:
         while True:
-            data = filehandle.read(4096)
-            if not data:  # end of file
-                if follow:
-                    time.sleep(0.001)
-                    continue
-                break
-            unpacker.feed(data)
-            try:
-                for unpacked in unpacker:
-                    printer.process(unpacked)
-            except BrokenPipeError:  # handle e.g. piping to `head`
+            batch = list(islice(messages, MERGE_BATCH_SIZE))
+            if not batch:
                 break
+            printer.process_batch(batch)
+    except BrokenPipeError:  # handle e.g. piping to `head`
+        return
+
+
+def split_log_files(
+    logfile: str, arguments: List[str]
+) -> Tuple[List[str], List[str]]:
+    """Split positional arguments of the dump command into files and fields.
+
+    Arguments following the log file that are paths to existing files are
+    other log files to merge, and the remaining ones are fields.
+
+    Args:
+        logfile: First positional argument, the log file to open.
+        arguments: Positional arguments following the log file.
+
+    Returns:
+        Pair of the list of log files and the list of fields.
+    """
+    nb_files = 0
+    while nb_files < len(arguments) and os.path.isfile(arguments[nb_files]):
+        nb_files += 1
+    return [logfile, *arguments[:nb_files]], arguments[nb_files:]
 
 
 def main(argv=None) -> None:
@@ -153,14 +446,53 @@ def main(argv=None) -> None:
     parser = get_argument_parser()
     args = parser.parse_args(argv)
     if args.subcmd == "list":
-        printer: Printer = FieldPrinter()
-        dump_log(args.logfile, printer)
+        printer: Printer = FieldPrinter(OUTPUT_BUFFER_SIZE)
+        if args.index or args.sample is not None:
+            sample_log(args.logfile, printer, args.sample)
+        else:  # read the whole log file
+            dump_log(args.logfile, printer)
+        try:
+            printer.flush()
+        except BrokenPipeError:  # handle e.g. piping to `head`
+            pass
     elif args.subcmd == "dump":
+        logfiles, fields = split_log_files(args.logfile, args.fields)
+        logfiles.extend(args.merge)
         if args.format == "csv":
-            printer = CSVPrinter(args.fields)
+            printer = CSVPrinter(fields, OUTPUT_BUFFER_SIZE)
         elif args.format == "json":
-            printer = JSONPrinter(args.fields)
-        dump_log(args.logfile, printer, follow=args.follow)
+            printer = JSONPrinter(fields, OUTPUT_BUFFER_SIZE)
+        if len(logfiles) > 1 or os.path.isdir(args.logfile):
+            if args.follow or args.tail is not None:
+                parser.error("--follow and --tail only apply to one log file")
+            dump_dataset(
+                logfiles,
+                printer,
+                since=args.since,
+                until=args.until,
+                time_field=args.time_field,
+            )
+        else:  # single log file
+            dump_log(
+                args.logfile,
+                printer,
+                follow=args.follow,
+                since=args.since,
+                until=args.until,
+                time_field=args.time_field,
+                tail=args.tail,
+            )
+        try:
+            printer.flush()
+        except BrokenPipeError:  # handle e.g. piping to `head`
+            pass
+    elif args.subcmd == "index":
+        build_index(
+            args.logfile,
+            stride=args.stride,
+            time_field=args.time_field,
+            delta=args.delta,
+        )
     elif args.subcmd == "serve":
         logging.getLogger().setLevel(logging.INFO)
         server = LogServer(args.log_path, args.port)
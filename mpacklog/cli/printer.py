@@ -6,17 +6,74 @@
 
 """Output printers."""
 
+import io
+import sys
+from typing import List
+
 
 class Printer:
     """Base class for printers.
 
-    A printer processes unpacked dictionaries one by one, and wraps up this
-    data once the whole log has been parsed.
+    A printer processes unpacked dictionaries one by one, or in batches, and
+    wraps up this data once the whole log has been parsed. Its output is
+    written to a buffer, which is written to the standard output once it
+    holds at least ``buffer_size`` characters, or when :func:`Printer.flush`
+    is called.
+
+    Attributes:
+        buffer: Output not written to the standard output yet.
+        buffer_size: Number of buffered characters above which the buffer is
+            written to the standard output.
     """
 
+    buffer: io.StringIO
+    buffer_size: int
+
+    def __init__(self, buffer_size: int = 0):
+        """Initialize output buffer.
+
+        Args:
+            buffer_size: Number of buffered characters above which the buffer
+                is written to the standard output. By default, output is
+                written after each processed dictionary.
+        """
+        self.buffer = io.StringIO()
+        self.buffer_size = buffer_size
+
     def process(self, unpacked: dict):
         """Process a new unpacked dictionary.
 
         Args:
             unpacked: Unpacked dictionary.
         """
+
+    def process_batch(self, messages: List[dict]):
+        """Process a batch of unpacked dictionaries.
+
+        Printers can override this function to share work among messages. By
+        default, messages are processed one by one.
+
+        Args:
+            messages: Unpacked dictionaries, in log order.
+        """
+        for unpacked in messages:
+            self.process(unpacked)
+
+    def write(self, output: str) -> None:
+        """Write output to the buffer, flushing it if it is full.
+
+        Args:
+            output: Output to write.
+        """
+        self.buffer.write(output)
+        if self.buffer.tell() >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered output to the standard output."""
+        output = self.buffer.getvalue()
+        if not output:
+            return
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        sys.stdout.write(output)
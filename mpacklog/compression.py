@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Log files made of compressed blocks of messages.
+
+In compressed log files, consecutive packed messages are grouped into blocks
+that are compressed independently of each other. Each block is stored as an
+extension type of code :data:`mpacklog.ext_types.BLOCK_EXT_CODE`, so that
+compressed log files are still valid MessagePack streams. The payload of a
+block starts with a small header, packed by :data:`BLOCK_HEADER`, made of
+the codec id, the number of messages in the block and their uncompressed
+size in bytes, followed by the compressed messages.
+
+Blocks are the unit of random access in compressed log files: index entries,
+parallel decoding and seeking all start from block boundaries.
+
+Codecs are "zlib", from the standard library, and "zstd" and "lz4", which
+require the optional ``zstandard`` and ``lz4`` packages respectively.
+"""
+
+import os
+import re
+import struct
+import zlib
+from typing import Any, BinaryIO, Callable, List, Optional, Tuple
+
+import msgpack
+
+from .ext_types import BLOCK_EXT_CODE, ext_hook
+from .key_table import (
+    EXT_CODE_POSITIONS,
+    KeyTable,
+    KeyTableUnpacker,
+    is_key_record,
+)
+
+try:
+    import zstandard
+except ImportError:  # zstandard is an optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # lz4 is an optional dependency
+    lz4_frame = None
+
+BLOCK_HEADER = struct.Struct("<BII")  # codec id, messages, uncompressed size
+
+BLOCK_PATTERN = re.compile(
+    rb"(?=(?:[\xd4-\xd8]|\xc7.|\xc8..|\xc9....)"
+    + re.escape(bytes([BLOCK_EXT_CODE]))
+    + rb")",
+    re.DOTALL,
+)
+
+CODEC_IDS = {"zlib": 1, "zstd": 2, "lz4": 3}
+
+CODEC_NAMES = {codec_id: name for name, codec_id in CODEC_IDS.items()}
+
+CODEC_PACKAGES = {"zstd": "zstandard", "lz4": "lz4"}
+
+EXT_PAYLOAD_SIZES = {  # fixext types have a fixed payload size
+    0xD4: 1,
+    0xD5: 2,
+    0xD6: 4,
+    0xD7: 8,
+    0xD8: 16,
+}
+
+
+def get_codec_module(codec: str) -> Any:
+    """Get the module implementing a compression codec.
+
+    Args:
+        codec: Name of the codec, one of "zlib", "zstd" or "lz4".
+
+    Returns:
+        Module of the codec.
+
+    Raises:
+        ImportError: If the package of the codec is not installed.
+        ValueError: If the codec is unknown.
+    """
+    if codec not in CODEC_IDS:
+        raise ValueError(
+            f"Unknown compression codec '{codec}', "
+            f"should be one of {tuple(CODEC_IDS)}"
+        )
+    module = {"zlib": zlib, "zstd": zstandard, "lz4": lz4_frame}[codec]
+    if module is None:
+        raise ImportError(
+            f"{codec} compression requires {CODEC_PACKAGES[codec]}, which "
+            f"can be installed by `pip install {CODEC_PACKAGES[codec]}`"
+        )
+    return module
+
+
+def get_compress(codec: str, level: Optional[int] = None) -> Callable:
+    """Get the compression function of a codec.
+
+    Args:
+        codec: Name of the codec, one of "zlib", "zstd" or "lz4".
+        level: Compression level, or None for the default level of the codec.
+
+    Returns:
+        Function compressing bytes.
+    """
+    module = get_codec_module(codec)
+    if codec == "zstd":
+        compressor = module.ZstdCompressor(
+            level=level if level is not None else 3
+        )
+        return compressor.compress
+    if codec == "lz4":
+        return lambda data: module.compress(data, compression_level=level or 0)
+    return lambda data: module.compress(data, -1 if level is None else level)
+
+
+def decompress_block(payload: bytes) -> bytes:
+    """Decompress the messages of a block.
+
+    Args:
+        payload: Payload of the extension type of the block.
+
+    Returns:
+        Packed messages of the block.
+
+    Raises:
+        ValueError: If the payload is not a valid block.
+    """
+    if len(payload) < BLOCK_HEADER.size:
+        raise ValueError("Block payload is shorter than its header")
+    codec_id, _, size = BLOCK_HEADER.unpack_from(payload)
+    codec = CODEC_NAMES.get(codec_id)
+    if codec is None:
+        raise ValueError(f"Unknown compression codec id {codec_id}")
+    module = get_codec_module(codec)
+    compressed = memoryview(payload)[BLOCK_HEADER.size :]
+    if codec == "zstd":
+        data = module.ZstdDecompressor().decompress(
+            compressed, max_output_size=size
+        )
+    else:  # zlib and lz4 frames have the same decompression function
+        data = module.decompress(compressed)
+    if len(data) != size:
+        raise ValueError(
+            f"Block decompressed to {len(data)} bytes, expected {size}"
+        )
+    return data
+
+
+class BlockCompressor:
+    """Group packed messages into compressed blocks.
+
+    A block is complete once its uncompressed size reaches ``block_size``,
+    and is then packed before the next message that can start a block. When
+    an index writer is given, an index entry is considered for the first
+    message of each packed block, as decoding can only start from blocks.
+
+    Attributes:
+        block_size: Uncompressed size in bytes from which a block is complete.
+        codec: Name of the compression codec.
+    """
+
+    block_size: int
+    codec: str
+
+    def __init__(
+        self,
+        codec: str = "zlib",
+        block_size: int = 1 << 20,
+        level: Optional[int] = None,
+    ):
+        """Initialize compressor.
+
+        Args:
+            codec: Name of the codec, one of "zlib", "zstd" or "lz4".
+            block_size: Uncompressed size in bytes from which a block is
+                complete.
+            level: Compression level, or None for the default level of the
+                codec.
+        """
+        self.__compress = get_compress(codec, level)
+        self.__chunks: List[bytes] = []
+        self.__codec_id = CODEC_IDS[codec]
+        self.__first_message: Any = None
+        self.__packer = msgpack.Packer(use_bin_type=True)
+        self.__size = 0
+        self.block_size = block_size
+        self.codec = codec
+
+    def reset(self) -> None:
+        """Start compressing a new log file, dropping pending messages."""
+        self.__chunks = []
+        self.__first_message = None
+        self.__size = 0
+
+    def add(
+        self,
+        message: Any,
+        data: bytes,
+        boundary: bool = True,
+        index: Any = None,
+    ) -> bytes:
+        """Add a packed message to the current block.
+
+        Args:
+            message: Message before packing, for the index.
+            data: Packed message.
+            boundary: If False, the message cannot start a block, for
+                instance if it is the delta of a delta-encoded log.
+            index: Index writer of the log file, if any.
+
+        Returns:
+            Packed block completed before this message, or empty bytes if the
+            current block is not complete.
+        """
+        block = b""
+        if boundary and self.__size >= self.block_size:
+            block = self.flush(index)
+        if not self.__chunks:
+            self.__first_message = message
+        self.__chunks.append(data)
+        self.__size += len(data)
+        return block
+
+    def flush(self, index: Any = None) -> bytes:
+        """Pack the current block, even if it is not complete.
+
+        Args:
+            index: Index writer of the log file, if any.
+
+        Returns:
+            Packed block, or empty bytes if there is no pending message.
+        """
+        if not self.__chunks:
+            return b""
+        nb_messages = len(self.__chunks)
+        data = b"".join(self.__chunks)
+        header = BLOCK_HEADER.pack(self.__codec_id, nb_messages, len(data))
+        block = self.__packer.pack(
+            msgpack.ExtType(BLOCK_EXT_CODE, header + self.__compress(data))
+        )
+        if index is not None:
+            index.add(self.__first_message, len(block), True, nb_messages)
+        self.reset()
+        return block
+
+
+class BlockUnpacker:
+    """Unpack messages from a stream of compressed blocks.
+
+    Blocks are decompressed as they are unpacked from the stream, and their
+    messages fed to an inner unpacker. Objects of the stream that are not
+    blocks are unpacked as they are, so that this unpacker also reads regular
+    log files. It has the same streaming interface as ``msgpack.Unpacker``.
+    """
+
+    def __init__(self, unpacker: Any = None, stream: Any = None):
+        """Initialize unpacker.
+
+        Args:
+            unpacker: Unpacker of the messages in blocks, for instance to only
+                unpack some fields. Defaults to a regular unpacker.
+            stream: Unpacker of the stream itself, for instance to also read
+                log files with interned keys. Defaults to a regular unpacker.
+        """
+        self.__stream = stream or msgpack.Unpacker(
+            raw=False, ext_hook=ext_hook
+        )
+        self.__unpacker = unpacker or msgpack.Unpacker(
+            raw=False, ext_hook=ext_hook
+        )
+
+    def __iter__(self):
+        """Iterate over messages available in the stream."""
+        return self
+
+    def __next__(self) -> Any:
+        """Unpack the next message.
+
+        Returns:
+            Next message.
+
+        Raises:
+            StopIteration: If there is no complete message left in the
+                buffer.
+        """
+        while True:
+            try:
+                return next(self.__unpacker)
+            except StopIteration:
+                pass
+            obj = next(self.__stream)
+            if not self.__feed_block(obj):
+                return obj
+
+    def __feed_block(self, obj: Any) -> bool:
+        """Feed the messages of a block to the inner unpacker.
+
+        Args:
+            obj: Object unpacked from the stream.
+
+        Returns:
+            True if the object is a block, False otherwise.
+        """
+        if not isinstance(obj, msgpack.ExtType) or obj.code != BLOCK_EXT_CODE:
+            return False
+        self.__unpacker.feed(decompress_block(obj.data))
+        return True
+
+    def feed(self, data) -> None:
+        """Feed bytes to the unpacker.
+
+        Args:
+            data: Bytes or buffer to append to the stream.
+        """
+        self.__stream.feed(data)
+
+    def skip(self) -> None:
+        """Skip the next message.
+
+        Raises:
+            OutOfData: If there is no complete message left in the buffer.
+        """
+        while True:
+            try:
+                return self.__unpacker.skip()
+            except msgpack.OutOfData:
+                pass
+            obj = self.__stream.unpack()
+            if not self.__feed_block(obj):
+                return None
+
+    def unpack(self) -> Any:
+        """Unpack the next message.
+
+        Returns:
+            Next message.
+
+        Raises:
+            OutOfData: If there is no complete message left in the buffer.
+        """
+        while True:
+            try:
+                return self.__unpacker.unpack()
+            except msgpack.OutOfData:
+                pass
+            obj = self.__stream.unpack()
+            if not self.__feed_block(obj):
+                return obj
+
+
+def is_block_header(data: bytes) -> bool:
+    """Check whether a buffer starts with the header of a block.
+
+    Args:
+        data: Buffer to check.
+
+    Returns:
+        True if the buffer starts with the extension header of a block.
+    """
+    if not data:
+        return False
+    position = EXT_CODE_POSITIONS.get(data[0])
+    return (
+        position is not None
+        and position < len(data)
+        and data[position] == BLOCK_EXT_CODE
+    )
+
+
+def is_compressed(file: BinaryIO) -> bool:
+    """Check whether a log file is made of compressed blocks.
+
+    Args:
+        file: Log file opened in binary mode.
+
+    Returns:
+        True if the log file starts with a block.
+    """
+    position = file.tell()
+    file.seek(0)
+    data = file.read(8)
+    file.seek(position)
+    return is_block_header(data)
+
+
+def get_log_unpacker(
+    header: bytes, table: Optional[KeyTable] = None
+) -> Optional[Any]:
+    """Get an unpacker matching the format of a log file.
+
+    Args:
+        header: First bytes of the log file, at least 8 if it has as many.
+        table: Key table in effect where unpacking starts, if the log file
+            has interned keys.
+
+    Returns:
+        Unpacker expanding interned keys if the log file starts with a key
+        table record, reading compressed blocks if it starts with a block,
+        regular unpacker otherwise. None if the header is too short to tell,
+        for instance when following a log file that is still being created.
+    """
+    position = EXT_CODE_POSITIONS.get(header[0]) if header else None
+    if not header or (position is not None and position >= len(header)):
+        return None
+    if is_key_record(header):
+        return KeyTableUnpacker(table)
+    unpacker = msgpack.Unpacker(raw=False, ext_hook=ext_hook)
+    if is_block_header(header):
+        return BlockUnpacker(stream=unpacker)
+    return unpacker
+
+
+def get_block_span(header: bytes) -> Optional[Tuple[int, int]]:
+    """Get the span of a block from its extension header.
+
+    Args:
+        header: Buffer starting with the extension header of a block,
+            followed by at least the block header.
+
+    Returns:
+        Offset of the block header and total size of the block, relative to
+        the start of the buffer, or None if the header is not valid.
+    """
+    if not is_block_header(header):
+        return None
+    first = header[0]
+    if first in EXT_PAYLOAD_SIZES:
+        start, size = 2, EXT_PAYLOAD_SIZES[first]
+    else:  # ext 8, ext 16 or ext 32
+        length_size = {0xC7: 1, 0xC8: 2, 0xC9: 4}[first]
+        start = 2 + length_size
+        size = int.from_bytes(header[1 : 1 + length_size], "big")
+    if size < BLOCK_HEADER.size or len(header) < start + BLOCK_HEADER.size:
+        return None
+    codec_id, nb_messages, _ = BLOCK_HEADER.unpack_from(header, start)
+    if codec_id not in CODEC_NAMES or nb_messages < 1:
+        return None
+    return start, start + size
+
+
+def check_block(file: BinaryIO, offset: int, file_size: int) -> bool:
+    """Check whether a complete block starts at a given byte offset.
+
+    A block is valid when its header is, and when it is followed by the
+    header of another block or by the end of the file.
+
+    Args:
+        file: Log file opened in binary mode.
+        offset: Byte offset to check.
+        file_size: Size of the log file in bytes.
+
+    Returns:
+        True if a complete block starts at this offset.
+    """
+    file.seek(offset)
+    span = get_block_span(file.read(6 + BLOCK_HEADER.size))
+    if span is None:
+        return False
+    end = offset + span[1]
+    if end == file_size:
+        return True
+    file.seek(end)
+    return end < file_size and is_block_header(file.read(8))
+
+
+def find_block(
+    file: BinaryIO,
+    offset: int,
+    end: Optional[int] = None,
+    window: int = 65536,
+) -> Optional[int]:
+    """Find the first block boundary at or after a given byte offset.
+
+    Args:
+        file: Compressed log file opened in binary mode.
+        offset: Byte offset to search from.
+        end: Optional byte offset to stop searching at. Defaults to the end of
+            the file.
+        window: Number of bytes to read at once.
+
+    Returns:
+        Byte offset of the first complete block found, or None if there is
+        none before ``end``.
+    """
+    file_size = os.fstat(file.fileno()).st_size
+    end = file_size if end is None else min(end, file_size)
+    while offset < end:
+        file.seek(offset)
+        data = file.read(window + 8)  # extension headers may straddle windows
+        for match in BLOCK_PATTERN.finditer(data):
+            position = offset + match.start()
+            if position >= min(end, offset + window):
+                break
+            if check_block(file, position, file_size):
+                return position
+        offset += window
+    return None
+
+
+def read_blocks(
+    file: BinaryIO, offset: int, unpacker: Any = None
+) -> Tuple[List[Any], int]:
+    """Read the messages of all complete blocks from a block boundary.
+
+    Args:
+        file: Compressed log file opened in binary mode.
+        offset: Byte offset of a block boundary.
+        unpacker: Unpacker of the messages in blocks. Defaults to a regular
+            unpacker.
+
+    Returns:
+        List of messages, and byte offset right after the last complete
+        block.
+    """
+    file.seek(offset)
+    stream = msgpack.Unpacker(file, raw=False, ext_hook=ext_hook)
+    unpacker = unpacker or msgpack.Unpacker(raw=False, ext_hook=ext_hook)
+    messages: List[Any] = []
+    end = offset
+    while True:
+        try:
+            block = stream.unpack()
+        except (msgpack.OutOfData, StopIteration):  # incomplete last block
+            break
+        if not isinstance(block, msgpack.ExtType):
+            raise ValueError(f"Unexpected object {block!r} between blocks")
+        unpacker.feed(decompress_block(block.data))
+        messages.extend(unpacker)
+        end = offset + stream.tell()
+    return messages, end
+
+
+def read_tail_blocks(
+    file: BinaryIO, nb_messages: int, window: int = 65536
+) -> Tuple[List[Any], int]:
+    """Read the last messages of a compressed log file.
+
+    The file is read backwards from its end, by chunks of doubling size,
+    until the blocks from the first boundary in the chunk contain enough
+    messages.
+
+    Args:
+        file: Compressed log file opened in binary mode.
+        nb_messages: Number of messages to read.
+        window: Number of bytes to read initially.
+
+    Returns:
+        List of the last messages in the file, and byte offset right after
+        the last complete block.
+    """
+    file_size = os.fstat(file.fileno()).st_size
+    while True:
+        offset = max(0, file_size - window)
+        boundary = find_block(file, offset) if offset > 0 else 0
+        if boundary is not None:
+            messages, end = read_blocks(file, boundary)
+            if len(messages) >= nb_messages or offset == 0:
+                start = max(0, len(messages) - nb_messages)
+                return messages[start:], end
+        if offset == 0:
+            return [], 0
+        window *= 2
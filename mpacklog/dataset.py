@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Read dictionaries from several log files merged by timestamp."""
+
+import glob
+import heapq
+import math
+import os
+from typing import Generator, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .decode import decode
+from .decode_rotated import decode_rotated
+from .index import get_time
+from .rotation import get_base_path, list_rotated_files
+
+
+def list_sources(paths: Union[str, Sequence[str]]) -> List[str]:
+    """List the sources of a dataset.
+
+    A source is a log file, or the base path of a rotated log, see
+    :mod:`mpacklog.rotation`. Directories are expanded to all the log files
+    they contain, with the files of a rotated log grouped into one source.
+
+    Args:
+        paths: Path, or list of paths, to log files, base paths of rotated
+            logs, or directories of log files.
+
+    Returns:
+        Sources of the dataset, in the order they were found.
+
+    Raises:
+        FileNotFoundError: If a path is neither of the above.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    sources: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            file_paths = sorted(glob.glob(os.path.join(path, "*.mpack")))
+            if not file_paths:
+                raise FileNotFoundError(f"No log file found in {path}")
+            for file_path in file_paths:
+                source = get_base_path(file_path) or file_path
+                if source not in sources:
+                    sources.append(source)
+        elif os.path.isfile(path) or list_rotated_files(path):
+            sources.append(path)
+        else:  # not a log file nor a rotated log
+            raise FileNotFoundError(f"No log file found at {path}")
+    return sources
+
+
+def read_source(
+    source: str,
+    chunk_size: int,
+    start_time: Optional[float],
+    end_time: Optional[float],
+    time_field: str,
+    use_mmap: bool,
+    fields: Optional[List[str]],
+) -> Iterator[Tuple[float, str, dict]]:
+    """Read timestamped dictionaries from a source of a dataset.
+
+    Messages without a timestamp are given that of the message before them,
+    so that they stay in place once merged with other sources.
+
+    Args:
+        source: Path to a log file, or base path of a rotated log.
+        chunk_size: Number of bytes to read per internal loop cycle.
+        start_time: If set, only read messages with a timestamp greater than
+            or equal to this value.
+        end_time: If set, only read messages with a timestamp strictly lower
+            than this value.
+        time_field: Timestamp field of messages.
+        use_mmap: If set, map log files in memory rather than reading them.
+        fields: If set, only unpack these fields.
+
+    Returns:
+        Iterator to (timestamp, source, dictionary) tuples.
+    """
+    reader = decode if os.path.isfile(source) else decode_rotated
+    timestamp = -math.inf
+    for message in reader(
+        source,
+        chunk_size,
+        start_time=start_time,
+        end_time=end_time,
+        time_field=time_field,
+        use_mmap=use_mmap,
+        fields=fields,
+    ):
+        message_time = get_time(message, time_field)
+        if message_time is not None:
+            timestamp = message_time
+        yield timestamp, source, message
+
+
+def open_dataset(
+    paths: Union[str, Sequence[str]],
+    chunk_size: int = 100_000,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    time_field: str = "time",
+    use_mmap: bool = False,
+    fields: Optional[List[str]] = None,
+) -> Generator[Tuple[str, dict], None, None]:
+    """Read dictionaries from several log files merged by timestamp.
+
+    Sources are decoded side by side and merged with a heap of their next
+    messages, so that only a chunk of each source is held in memory at a
+    time. Timestamps are assumed to be non-decreasing within each source.
+    Messages with equal timestamps are yielded in the order of their sources.
+
+    Args:
+        paths: Path, or list of paths, to log files, base paths of rotated
+            logs, or directories of log files.
+        chunk_size: Optional, number of bytes to read from each source per
+            internal loop cycle.
+        start_time: Optional, only yield messages with a timestamp greater
+            than or equal to this value.
+        end_time: Optional, only yield messages with a timestamp strictly
+            lower than this value.
+        time_field: Optional, timestamp field of messages, with nested keys in
+            "key1/.../keyN" format.
+        use_mmap: Optional, if set, map log files in memory rather than
+            reading them.
+        fields: Optional, only unpack these fields, i.e. nested keys in
+            "key1/.../keyN" format. The timestamp field is always unpacked.
+
+    Returns:
+        Generator to (source, dictionary) pairs in timestamp order, where the
+        source is the path to the log file, or the base path of the rotated
+        log, the dictionary was read from.
+
+    Raises:
+        FileNotFoundError: If a path is not a log file, a rotated log or a
+            directory of log files.
+    """
+    if fields is not None and time_field not in fields:
+        fields = [*fields, time_field]
+    readers = [
+        read_source(
+            source,
+            chunk_size,
+            start_time,
+            end_time,
+            time_field,
+            use_mmap,
+            fields,
+        )
+        for source in list_sources(paths)
+    ]
+    for _, source, message in heapq.merge(*readers, key=lambda item: item[0]):
+        yield source, message
@@ -6,29 +6,161 @@
 
 """Read dictionaries in series from a log file."""
 
-from typing import Generator
+from typing import Any, Generator, List, Optional
 
 import msgpack
 
+from .cli.fields import Field
+from .compression import BlockUnpacker, is_compressed
+from .ext_types import ext_hook
+from .index import Index, get_time
+from .key_table import KeyTable, KeyTableUnpacker, get_key_table
+from .projection import ProjectedUnpacker, remove_field
+from .read_chunks import read_chunks
+from .seek import find_time_offset
+
+
+def get_unpacker(
+    fields: Optional[List[str]] = None,
+    table: Optional[KeyTable] = None,
+    compressed: bool = False,
+):
+    """Get an unpacker for log messages.
+
+    Args:
+        fields: If set, only unpack these fields from messages.
+        table: Key table in effect where unpacking starts, if the log file
+            has interned keys.
+        compressed: If set, the log file is made of compressed blocks.
+
+    Returns:
+        Projected unpacker if fields are set, unpacker expanding interned
+        keys if a key table is set, regular unpacker otherwise. With
+        compression, this unpacker reads messages from decompressed blocks.
+    """
+    unpacker: Any
+    if fields is not None:
+        unpacker = ProjectedUnpacker(fields, table)
+    elif table is not None:
+        unpacker = KeyTableUnpacker(table)
+    else:  # regular log file
+        unpacker = msgpack.Unpacker(raw=False, ext_hook=ext_hook)
+    return BlockUnpacker(unpacker) if compressed else unpacker
+
 
 def decode(
     path: str,
     chunk_size: int = 100_000,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    start_index: Optional[int] = None,
+    stop_index: Optional[int] = None,
+    time_field: str = "time",
+    use_mmap: bool = False,
+    fields: Optional[List[str]] = None,
 ) -> Generator[dict, None, None]:
     """Read dictionaries in series from a log file.
 
+    Reading can be restricted to a range of messages, by message number or by
+    timestamp. Reading then starts from the nearest preceding entry of the
+    sidecar index of the log file, if there is one. Otherwise, time ranges
+    are found by bisecting the log file, assuming timestamps are
+    non-decreasing, while message ranges are skipped over without unpacking
+    messages into Python objects. Log files with interned keys, see
+    :mod:`mpacklog.key_table`, and compressed log files, see
+    :mod:`mpacklog.compression`, are read transparently.
+
     Args:
         path: Path to the log file to read.
         chunk_size: Optional, number of bytes to read per internal loop cycle.
+        start_time: Optional, only yield messages with a timestamp greater
+            than or equal to this value.
+        end_time: Optional, only yield messages with a timestamp strictly
+            lower than this value.
+        start_index: Optional, number of the first message to yield.
+        stop_index: Optional, number of the message to stop at (excluded).
+        time_field: Optional, timestamp field of messages, with nested keys in
+            "key1/.../keyN" format. Messages without timestamp are skipped
+            when a time range is given.
+        use_mmap: Optional, if set, map the log file in memory rather than
+            reading it, which saves a copy of the data and keeps resident
+            memory bounded on large files.
+        fields: Optional, only unpack these fields, i.e. nested keys in
+            "key1/.../keyN" format, skipping over the bytes of other values
+            without building Python objects for them.
 
     Returns:
         Generator to each dictionary from the log file, in sequence.
     """
+    by_time = start_time is not None or end_time is not None
+    by_index = start_index is not None or stop_index is not None
+    if not by_time and not by_index:
+        with open(path, "rb") as file:
+            unpacker = get_unpacker(
+                fields, get_key_table(file, 0), is_compressed(file)
+            )
+            for data in read_chunks(file, chunk_size, use_mmap):
+                unpacker.feed(data)
+                yield from unpacker
+        return
+
+    index = Index.read(path)
+    start_index = start_index or 0
+    number: Optional[int] = 0
+    offset = 0
+    if start_index > 0 and index is not None:
+        number, offset = index.lookup(start_index)
     with open(path, "rb") as file:
-        unpacker = msgpack.Unpacker(raw=False)
-        while True:
-            data = file.read(chunk_size)
-            if not data:  # end of file
-                break
+        if start_time is not None:
+            time_number: Optional[int] = 0
+            time_offset = 0
+            if index is not None and index.time_field == time_field:
+                time_number, time_offset = index.lookup_time(start_time)
+            elif not by_index:  # message numbers are not needed
+                time_number = None
+                time_offset = find_time_offset(file, start_time, time_field)
+            if time_offset > offset:
+                number, offset = time_number, time_offset
+        table = get_key_table(file, offset)
+        file.seek(offset)
+        time_keys = Field(time_field).keys
+        projected_fields = fields
+        extra_time = False  # timestamps are projected only for filtering
+        if fields is not None and by_time:
+            extra_time = not any(
+                time_keys[: len(keys)] == keys
+                for keys in (Field(field).keys for field in fields)
+            )
+            if extra_time:
+                projected_fields = fields + [time_field]
+        unpacker = get_unpacker(projected_fields, table, is_compressed(file))
+        for data in read_chunks(file, chunk_size, use_mmap):
             unpacker.feed(data)
-            yield from unpacker
+            while True:
+                if number is not None:
+                    if stop_index is not None and number >= stop_index:
+                        return
+                    if number < start_index:
+                        try:
+                            unpacker.skip()
+                        except msgpack.OutOfData:
+                            break
+                        number += 1
+                        continue
+                try:
+                    message = unpacker.unpack()
+                except msgpack.OutOfData:
+                    break
+                if number is not None:
+                    number += 1
+                if by_time:
+                    time = get_time(message, time_field)
+                    if time is None:
+                        continue
+                    if start_time is not None and time < start_time:
+                        continue
+                    if end_time is not None and time >= end_time:
+                        return
+                    if extra_time:
+                        remove_field(message, time_keys)
+                yield message
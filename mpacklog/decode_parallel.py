@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Decode log files in parallel over several processes."""
+
+import bisect
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Collection,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import msgpack
+
+from .compression import is_compressed
+from .decode import get_unpacker
+from .ext_types import ext_hook
+from .index import Index
+from .key_table import get_key_table, is_interned
+from .seek import find_boundary
+
+RESYNC_CHECKS = 4  # dictionaries unpacked to accept a resync candidate
+
+
+class FailedResult:
+    """Exception raised by a function applied to a message by a worker.
+
+    Messages unpacked after a resync candidate may not be messages, so that
+    the exception is only raised if the message turns out to be one.
+
+    Attributes:
+        exception: Exception raised by the function.
+    """
+
+    exception: Exception
+
+    def __init__(self, exception: Exception):
+        """Wrap an exception.
+
+        Args:
+            exception: Exception raised by the function.
+        """
+        self.exception = exception
+
+
+def unwrap_results(results: List[Any]) -> Generator[Any, None, None]:
+    """Yield results of a worker, raising the exceptions they wrap.
+
+    Args:
+        results: Results of a worker.
+
+    Returns:
+        Generator to each result.
+    """
+    for result in results:
+        if isinstance(result, FailedResult):
+            raise result.exception
+        yield result
+
+
+def get_split_offsets(
+    path: str, nb_ranges: int, index: Optional[Index] = None
+) -> List[int]:
+    """Split a log file into byte ranges starting on message boundaries.
+
+    Boundaries are found by skipping messages forward from the previous
+    boundary, or from the closest preceding entry of the log index if there
+    is one. Without an index, splitting thus skips through the whole file in
+    the calling process. In compressed log files, boundaries are block
+    boundaries.
+
+    Args:
+        path: Path to the log file to split.
+        nb_ranges: Number of byte ranges, ideally of the same size.
+        index: Index of the log file, if it has one.
+
+    Returns:
+        Byte offsets where ranges start, followed by the size of the file.
+    """
+    with open(path, "rb") as file:
+        file_size = os.fstat(file.fileno()).st_size
+        offsets = [0]
+        for i in range(1, nb_ranges):
+            offset = file_size * i // nb_ranges
+            start = offsets[-1]
+            if index is not None:
+                j = bisect.bisect_right(index.offsets, offset) - 1
+                if j >= 0:
+                    start = max(start, index.offsets[j])
+            boundary = find_boundary(file, offset, start=start)
+            offsets.append(file_size if boundary is None else boundary)
+    offsets.append(file_size)
+    return offsets
+
+
+def decode_range(
+    path: str,
+    start: int,
+    end: int,
+    fn: Optional[Callable[[dict], Any]],
+    chunk_size: int,
+) -> List[Any]:
+    """Decode the messages of a byte range of a log file.
+
+    Args:
+        path: Path to the log file to read.
+        start: Byte offset of the message boundary where the range starts.
+        end: Byte offset of the message boundary where the range ends.
+        fn: Function applied to each message, if any.
+        chunk_size: Number of bytes to read per internal loop cycle.
+
+    Returns:
+        List of decoded messages, or of the values returned by ``fn``, in
+        sequence.
+    """
+    results = []
+    with open(path, "rb") as file:
+        table = get_key_table(file, start)
+        file.seek(start)
+        unpacker = get_unpacker(table=table, compressed=is_compressed(file))
+        remaining = end - start
+        while remaining > 0:
+            data = file.read(min(chunk_size, remaining))
+            if not data:  # end of file
+                break
+            remaining -= len(data)
+            unpacker.feed(data)
+            for unpacked in unpacker:
+                results.append(unpacked if fn is None else fn(unpacked))
+    return results
+
+
+def find_resync_candidate(
+    file: BinaryIO, offset: int, end: int, window: int = 65536
+) -> Optional[int]:
+    """Find a position that looks like a message boundary in a byte range.
+
+    The position is the first one from which dictionaries unpack, which may
+    also be that of a dictionary nested in a message, e.g. in a list ending
+    it. Candidates are only used by :func:`decode_parallel` to start
+    decoding, and checked against the messages of the previous range.
+
+    Args:
+        file: Log file opened in binary mode.
+        offset: Byte offset to search from.
+        end: Byte offset to stop searching at.
+        window: Number of bytes to search in.
+
+    Returns:
+        Byte offset of the first candidate, or None if there is none in the
+        window.
+    """
+    file.seek(offset)
+    data = file.read(window)
+    for i in range(min(len(data), end - offset)):
+        if not (0x80 <= data[i] <= 0x8F or data[i] in (0xDE, 0xDF)):
+            continue  # not a map header
+        unpacker = msgpack.Unpacker(max_buffer_size=len(data) - i + 1)
+        unpacker.feed(data[i:])
+        nb_dicts = 0
+        try:
+            while nb_dicts < RESYNC_CHECKS:
+                if not isinstance(unpacker.unpack(), dict):
+                    break
+                nb_dicts += 1
+        except msgpack.OutOfData:  # end of the window
+            if nb_dicts > 0:
+                return offset + i
+        except Exception:  # any unpacking error means this is no boundary
+            continue
+        if nb_dicts == RESYNC_CHECKS:
+            return offset + i
+    return None
+
+
+def unpack_chain(
+    file: BinaryIO,
+    start: int,
+    end: int,
+    fn: Optional[Callable[[dict], Any]],
+    chunk_size: int,
+    stop: Collection[int] = (),
+    resync: bool = False,
+) -> Tuple[List[int], List[Any], int]:
+    """Unpack messages from a position, recording the offset of each one.
+
+    Args:
+        file: Log file without compression nor interned keys.
+        start: Byte offset to start unpacking from.
+        end: Stop at the first message starting at or after this offset.
+        fn: Function applied to each message, if any.
+        chunk_size: Number of bytes to read per internal loop cycle.
+        stop: Also stop at the first message starting at one of these
+            offsets.
+        resync: If set, ``start`` is a resync candidate rather than a
+            message boundary. Unpacking errors then stop unpacking rather
+            than being raised, and exceptions raised by ``fn`` are returned
+            as :class:`FailedResult` results.
+
+    Returns:
+        Byte offsets of the unpacked messages, list of these messages, or of
+        the values returned by ``fn``, and byte offset where unpacking
+        stopped.
+    """
+    file.seek(start)
+    unpacker = msgpack.Unpacker(raw=False, ext_hook=ext_hook)
+    offsets: List[int] = []
+    results: List[Any] = []
+    position = start
+    while position < end and position not in stop:
+        try:
+            unpacked = unpacker.unpack()
+        except msgpack.OutOfData:
+            data = file.read(chunk_size)
+            if not data:  # end of file
+                break
+            unpacker.feed(data)
+            continue
+        except Exception:
+            if resync:
+                break
+            raise
+        offsets.append(position)
+        if fn is None:
+            results.append(unpacked)
+        elif not resync:
+            results.append(fn(unpacked))
+        else:  # the unpacked object may not be a message
+            try:
+                results.append(fn(unpacked))
+            except Exception as exn:
+                results.append(FailedResult(exn))
+        position = start + unpacker.tell()
+    return offsets, results, position
+
+
+def decode_resync_range(
+    path: str,
+    start: int,
+    end: int,
+    fn: Optional[Callable[[dict], Any]],
+    chunk_size: int,
+) -> Tuple[List[int], List[Any], int]:
+    """Decode the messages of a byte range after resynchronizing in it.
+
+    Args:
+        path: Path to a log file without compression nor interned keys.
+        start: Byte offset where the range starts, not necessarily on a
+            message boundary unless it is zero.
+        end: Byte offset where the next range starts.
+        fn: Function applied to each message, if any.
+        chunk_size: Number of bytes to read per internal loop cycle.
+
+    Returns:
+        Result of :func:`unpack_chain` from the first resync candidate in
+        the range, or empty lists if there is none.
+    """
+    with open(path, "rb") as file:
+        candidate = find_resync_candidate(file, start, end) if start > 0 else 0
+        if candidate is None:
+            return [], [], start
+        return unpack_chain(
+            file, candidate, end, fn, chunk_size, resync=start > 0
+        )
+
+
+def decode_resync(
+    path: str,
+    fn: Optional[Callable[[dict], Any]],
+    workers: int,
+    chunk_size: int,
+) -> Generator[Any, None, None]:
+    """Decode a log file without index over workers that resync themselves.
+
+    The log file is split into byte ranges of the same size. Each worker
+    resynchronizes on the first position of its range from which
+    dictionaries unpack, then unpacks messages until the end of its range,
+    recording their offsets. This position may be inside a message, but
+    unpacking from it usually falls back on message boundaries. Results of
+    a worker are used from the first message boundary reached by the
+    previous range, where both agree. If they never meet, the calling
+    process decodes the range itself from that boundary.
+
+    Args:
+        path: Path to a log file without compression nor interned keys.
+        fn: Function applied to each message by workers, if any.
+        workers: Number of worker processes.
+        chunk_size: Number of bytes to read per internal loop cycle.
+
+    Returns:
+        Generator to each decoded message, or to the value returned by ``fn``
+        for each message, in sequence.
+    """
+    file_size = os.path.getsize(path)
+    bounds = [file_size * i // workers for i in range(workers + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as executor, open(
+        path, "rb"
+    ) as file:
+        futures = [
+            executor.submit(
+                decode_resync_range, path, start, end, fn, chunk_size
+            )
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        position = 0  # verified message boundary
+        for future, end in zip(futures, bounds[1:]):
+            offsets, results, final = future.result()
+            i = bisect.bisect_left(offsets, position)
+            if i == len(offsets) or offsets[i] != position:
+                # The worker did not reach this boundary: decode from it
+                # until the end of the range or a message of the worker
+                _, gap_results, position = unpack_chain(
+                    file, position, end, fn, chunk_size, set(offsets)
+                )
+                yield from gap_results
+                i = bisect.bisect_left(offsets, position)
+                if i == len(offsets) or offsets[i] != position:
+                    continue
+            yield from unwrap_results(results[i:])
+            position = final
+
+
+def decode_parallel(
+    path: str,
+    fn: Optional[Callable[[dict], Any]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 100_000,
+) -> Generator[Any, None, None]:
+    """Decode a log file in parallel over several processes.
+
+    The log file is split into one byte range per worker. Ranges start on
+    message boundaries found by :func:`get_split_offsets` in log files with
+    an index, compressed blocks or interned keys. In other log files, each
+    worker resynchronizes on a message boundary in its own range, see
+    :func:`decode_resync`. Delta-encoded log files are not supported.
+
+    Args:
+        path: Path to the log file to read.
+        fn: Optional, function applied to each message by workers, for
+            instance to project it onto a few fields. It needs to be picklable,
+            so lambdas are not supported. Its results are sent back to the
+            calling process, so they should be small compared to messages.
+        workers: Optional, number of worker processes. Defaults to the number
+            of processors on the machine.
+        chunk_size: Optional, number of bytes to read per internal loop cycle.
+
+    Returns:
+        Generator to each decoded message, or to the value returned by ``fn``
+        for each message, in sequence.
+    """
+    workers = workers or os.cpu_count() or 1
+    index = Index.read(path)
+    with open(path, "rb") as file:
+        resync = not (is_compressed(file) or is_interned(file))
+    if index is None and resync:
+        yield from decode_resync(path, fn, workers, chunk_size)
+        return
+    splits = get_split_offsets(path, workers, index)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(decode_range, path, start, end, fn, chunk_size)
+            for start, end in zip(splits[:-1], splits[1:])
+        ]
+        for future in futures:
+            yield from future.result()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Read dictionaries in series from all files of a rotated log."""
+
+from typing import Generator, List, Optional
+
+from .decode import decode
+from .rotation import list_rotated_files
+from .seek import read_time_at
+
+
+def read_first_time(path: str, time_field: str) -> Optional[float]:
+    """Read the timestamp of the first timed message of a log file.
+
+    Args:
+        path: Path to the log file.
+        time_field: Timestamp field of messages.
+
+    Returns:
+        Timestamp of the first timed message, or None if there is none.
+    """
+    with open(path, "rb") as file:
+        return read_time_at(file, 0, time_field)[0]
+
+
+def decode_rotated(
+    path: str,
+    chunk_size: int = 100_000,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    time_field: str = "time",
+    use_mmap: bool = False,
+    fields: Optional[List[str]] = None,
+) -> Generator[dict, None, None]:
+    """Read dictionaries in series from all files of a rotated log.
+
+    Files of the rotated log, see :mod:`mpacklog.rotation`, are read in
+    sequence as if they were a single log file. With a time range, files
+    whose messages all precede the start time are skipped, as found from the
+    first timestamp of the next file, and reading stops at the first file
+    starting at or after the end time. Timestamps are assumed to be
+    non-decreasing along the log.
+
+    Args:
+        path: Base path of the rotated log.
+        chunk_size: Optional, number of bytes to read per internal loop cycle.
+        start_time: Optional, only yield messages with a timestamp greater
+            than or equal to this value.
+        end_time: Optional, only yield messages with a timestamp strictly
+            lower than this value.
+        time_field: Optional, timestamp field of messages, with nested keys in
+            "key1/.../keyN" format.
+        use_mmap: Optional, if set, map log files in memory rather than
+            reading them.
+        fields: Optional, only unpack these fields, i.e. nested keys in
+            "key1/.../keyN" format.
+
+    Returns:
+        Generator to each dictionary from the rotated log, in sequence.
+    """
+    paths = list_rotated_files(path)
+    for i, file_path in enumerate(paths):
+        if start_time is not None and i + 1 < len(paths):
+            next_time = read_first_time(paths[i + 1], time_field)
+            if next_time is not None and next_time < start_time:
+                continue
+        if end_time is not None:
+            first_time = read_first_time(file_path, time_field)
+            if first_time is not None and first_time >= end_time:
+                return
+        yield from decode(
+            file_path,
+            chunk_size,
+            start_time=start_time,
+            end_time=end_time,
+            time_field=time_field,
+            use_mmap=use_mmap,
+            fields=fields,
+        )
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Read the last dictionaries from a log file."""
+
+from collections import deque
+from typing import BinaryIO, Deque, List, Optional, Tuple
+
+import msgpack
+
+from .compression import is_compressed, read_tail_blocks
+from .ext_types import ext_hook
+from .index import Index
+from .key_table import KeyTableUnpacker, is_interned, read_key_table
+
+
+def skip_to_end(
+    file: BinaryIO, start: int, nb_boundaries: int, read_size: int = 65536
+) -> Tuple[List[int], int]:
+    """Skip packed objects from a message boundary to the end of a file.
+
+    Args:
+        file: Log file opened in binary mode.
+        start: Byte offset of a message boundary.
+        nb_boundaries: Number of boundaries to keep, counting from the end.
+        read_size: Number of bytes to read at once.
+
+    Returns:
+        Byte offsets of the last complete objects from the boundary, at most
+        ``nb_boundaries`` of them, and byte offset right after the last one.
+        Objects are messages or, in log files with interned keys, key table
+        records.
+    """
+    file.seek(start)
+    unpacker = msgpack.Unpacker(file, read_size=read_size)
+    boundaries: Deque[int] = deque(maxlen=nb_boundaries)
+    position = start
+    while True:
+        try:
+            unpacker.skip()
+        except (msgpack.OutOfData, StopIteration):  # end of file
+            break
+        boundaries.append(position)
+        position = start + unpacker.tell()
+    return list(boundaries), position
+
+
+def read_tail(
+    file: BinaryIO,
+    nb_messages: int,
+    window: int = 65536,
+    index: Optional[Index] = None,
+) -> Tuple[List[dict], int]:
+    """Read the last messages of a log file.
+
+    In compressed log files, the file is read backwards from its end, by
+    chunks of doubling size, until the blocks from the first block start in
+    the chunk contain enough messages. Otherwise, messages are skipped
+    without unpacking them from a known message boundary to the end of the
+    file: the last entry of the log index, then earlier ones until enough
+    messages are found, or the beginning of the file if there is no index.
+    Message boundaries cannot be found from arbitrary offsets, as nested
+    dictionaries, e.g. in lists, look the same as messages.
+
+    Args:
+        file: Log file opened in binary mode.
+        nb_messages: Number of messages to read.
+        window: Number of bytes to read initially from compressed log files,
+            and at once when skipping messages.
+        index: Index of the log file, if it has one.
+
+    Returns:
+        List of the last messages in the file, and byte offset right after
+        the last complete message.
+    """
+    if is_compressed(file):
+        return read_tail_blocks(file, nb_messages, window)
+    interned = is_interned(file)
+    offsets = index.offsets if index is not None else []
+    nb_objects = max(nb_messages, 1)
+    step = 1
+    while True:
+        start = offsets[-step] if step <= len(offsets) else 0
+        boundaries, end = skip_to_end(file, start, nb_objects, window)
+        messages: List[dict] = []
+        if boundaries:
+            file.seek(boundaries[0])
+            data = file.read(end - boundaries[0])
+            if interned:  # expand keys
+                table = read_key_table(file, boundaries[0])
+                unpacker = KeyTableUnpacker(table)
+            else:  # regular log file
+                unpacker = msgpack.Unpacker(raw=False, ext_hook=ext_hook)
+            unpacker.feed(data)
+            messages = list(unpacker)
+        if len(messages) >= nb_messages:
+            return messages[len(messages) - nb_messages :], end
+        if len(boundaries) == nb_objects:  # some objects were key records
+            nb_objects *= 2
+        elif start > 0:  # start from an earlier index entry
+            step *= 2
+        else:  # the whole file has fewer messages
+            return messages, end
+
+
+def decode_tail(
+    path: str, nb_messages: int, window: int = 65536
+) -> List[dict]:
+    """Read the last dictionaries from a log file.
+
+    With a log index or compressed blocks, only the end of the file is read,
+    so that the cost of this function does not depend on the size of the log
+    file. Otherwise, previous messages are skipped from the beginning of the
+    file, which is about ten times faster than unpacking them.
+
+    Args:
+        path: Path to the log file to read.
+        nb_messages: Number of dictionaries to read.
+        window: Optional, number of bytes to read initially from the end of
+            compressed files, doubled until enough dictionaries are found,
+            and at once when skipping messages.
+
+    Returns:
+        List of the last dictionaries from the log file, in sequence.
+    """
+    if nb_messages <= 0:
+        return []
+    with open(path, "rb") as file:
+        messages, _ = read_tail(file, nb_messages, window, Index.read(path))
+    return messages
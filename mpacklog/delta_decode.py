@@ -6,34 +6,59 @@
 
 """Read dictionaries from delta-encoded log files."""
 
-from typing import Generator
+from typing import Any, Generator
 
 import msgpack
 
+from .compression import BlockUnpacker, is_compressed
+from .ext_types import ext_hook
+from .index import Index
+from .key_table import KeyTableUnpacker, get_key_table
+from .read_chunks import read_chunks
+
 
 def delta_decode(
     path: str,
     chunk_size: int = 100_000,
+    start: int = 0,
+    use_mmap: bool = False,
 ) -> Generator[dict, None, None]:
     """Read dictionaries from a delta-encoded log file.
 
     Args:
         path: Path to the delta-encoded log file to read.
         chunk_size: Optional, number of bytes to read per internal loop cycle.
+        start: Optional, number of the first message to yield. If the log
+            file has a keyframe index, decoding starts from the nearest
+            keyframe before this message. Otherwise, all previous deltas are
+            replayed from the beginning of the file.
+        use_mmap: Optional, if set, map the log file in memory rather than
+            reading it, which saves a copy of the data and keeps resident
+            memory bounded on large files.
 
     Returns:
         Generator to each cumulative dictionary from the log file, in sequence.
         Each yielded dictionary is cumulatively updated with all previous
         deltas.
     """
+    number, offset = 0, 0
+    if start > 0:
+        index = Index.read(path)
+        if index is not None and index.keyframes:
+            number, offset = index.lookup(start)
     cumulative_dict = {}
     with open(path, "rb") as file:
-        unpacker = msgpack.Unpacker(raw=False)
-        while True:
-            data = file.read(chunk_size)
-            if not data:  # end of file
-                break
+        table = get_key_table(file, offset)
+        file.seek(offset)
+        unpacker: Any = msgpack.Unpacker(raw=False, ext_hook=ext_hook)
+        if table is not None:  # log file with interned keys
+            unpacker = KeyTableUnpacker(table)
+        if is_compressed(file):
+            unpacker = BlockUnpacker(unpacker)
+        for data in read_chunks(file, chunk_size, use_mmap):
             unpacker.feed(data)
             for unpacked in unpacker:
                 cumulative_dict.update(unpacked)
-                yield cumulative_dict
+                if number >= start:
+                    yield cumulative_dict
+                number += 1
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Loggers writing delta-encoded log files."""
+
+from typing import Optional
+
+from .async_logger import AsyncLogger
+from .delta_packer import DeltaPacker
+from .index import IndexWriter
+from .sync_logger import SyncLogger
+
+
+class DeltaLogger(SyncLogger):
+    """Logger with synchronous I/O writing delta-encoded log files.
+
+    Each logged message only contains the top-level keys whose values changed
+    since the previous message, with full keyframes written periodically.
+    Output files are read back by :func:`mpacklog.delta_decode.delta_decode`.
+    Byte offsets of keyframes are recorded in a sidecar index file, so that
+    decoding can start from any message without replaying the whole log.
+
+    With compression, blocks of messages start with keyframes, so that they
+    can be decoded independently.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        keyframe_count: Optional[int] = 1000,
+        keyframe_interval: Optional[float] = None,
+        index: bool = True,
+        time_field: Optional[str] = "time",
+        ndarray_ext: bool = False,
+        intern_keys: bool = False,
+        **kwargs,
+    ):
+        """Initialize logger.
+
+        Args:
+            path: Path to the output log file.
+            keyframe_count: If set, write a keyframe every this many messages.
+            keyframe_interval: If set, write a keyframe when this duration in
+                seconds has elapsed since the last keyframe.
+            index: If set (default), write the keyframe index of the log.
+            time_field: Timestamp field recorded in index entries, if any.
+            ndarray_ext: If set, pack NumPy arrays into the compact
+                extension type of :func:`mpacklog.ext_types.pack_ndarray`
+                rather than into lists.
+            intern_keys: If set, replace the string keys of dictionaries by
+                integer ids in the log file, as described in
+                :mod:`mpacklog.key_table`. Not compatible with compression.
+            kwargs: Other keyword arguments forwarded to :class:`SyncLogger`.
+
+        Raises:
+            ValueError: If both ``intern_keys`` and ``compression`` are set.
+        """
+        if intern_keys and kwargs.get("compression") is not None:
+            raise ValueError("Compression and interned keys are exclusive")
+        super().__init__(path, **kwargs)
+        self._index = (
+            IndexWriter(self.path, 1, time_field, keyframes=True)
+            if index
+            else None
+        )
+        self._packer = DeltaPacker(
+            keyframe_count, keyframe_interval, ndarray_ext, intern_keys
+        )
+
+    def _pack(self, message: dict) -> bytes:
+        """Pack a message and account for it in the index, if any.
+
+        Args:
+            message: Message to pack.
+
+        Returns:
+            Bytes to write to the log file.
+        """
+        data = self._packer.pack(message)
+        return self._add(message, data, self._packer.is_keyframe)
+
+    def _start_file(self) -> None:
+        """Start packing a new output file, beginning with a keyframe."""
+        super()._start_file()
+        self._packer.reset()
+
+
+class AsyncDeltaLogger(AsyncLogger):
+    """Logger with asynchronous I/O writing delta-encoded log files.
+
+    Each logged message only contains the top-level keys whose values changed
+    since the previous message, with full keyframes written periodically.
+    Output files are read back by :func:`mpacklog.delta_decode.delta_decode`.
+    Byte offsets of keyframes are recorded in a sidecar index file, so that
+    decoding can start from any message without replaying the whole log.
+
+    With compression, blocks of messages start with keyframes, so that they
+    can be decoded independently.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        keyframe_count: Optional[int] = 1000,
+        keyframe_interval: Optional[float] = None,
+        index: bool = True,
+        time_field: Optional[str] = "time",
+        ndarray_ext: bool = False,
+        intern_keys: bool = False,
+        **kwargs,
+    ):
+        """Initialize logger.
+
+        Args:
+            path: Path to the output log file.
+            keyframe_count: If set, write a keyframe every this many messages.
+            keyframe_interval: If set, write a keyframe when this duration in
+                seconds has elapsed since the last keyframe.
+            index: If set (default), write the keyframe index of the log.
+            time_field: Timestamp field recorded in index entries, if any.
+            ndarray_ext: If set, pack NumPy arrays into the compact
+                extension type of :func:`mpacklog.ext_types.pack_ndarray`
+                rather than into lists.
+            intern_keys: If set, replace the string keys of dictionaries by
+                integer ids in the log file, as described in
+                :mod:`mpacklog.key_table`. Not compatible with compression.
+            kwargs: Other keyword arguments forwarded to :class:`AsyncLogger`.
+
+        Raises:
+            ValueError: If both ``intern_keys`` and ``compression`` are set.
+        """
+        if intern_keys and kwargs.get("compression") is not None:
+            raise ValueError("Compression and interned keys are exclusive")
+        super().__init__(path, **kwargs)
+        self._index = (
+            IndexWriter(self.path, 1, time_field, keyframes=True)
+            if index
+            else None
+        )
+        self._packer = DeltaPacker(
+            keyframe_count, keyframe_interval, ndarray_ext, intern_keys
+        )
+
+    def _pack(self, message: dict) -> bytes:
+        """Pack a message and account for it in the index, if any.
+
+        Args:
+            message: Message to pack.
+
+        Returns:
+            Bytes to write to the log file.
+        """
+        data = self._packer.pack(message)
+        return self._add(message, data, self._packer.is_keyframe)
+
+    def _start_file(self) -> None:
+        """Start packing a new output file, beginning with a keyframe."""
+        super()._start_file()
+        self._packer.reset()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Pack dictionaries into the delta-encoded format."""
+
+import time
+from typing import Any, Dict, Optional
+
+import msgpack
+
+from .ext_types import serialize_ndarray
+from .key_table import KeyInterningPacker
+from .serialize import serialize
+
+
+class DeltaPacker:
+    """Pack dictionaries into the delta-encoded format.
+
+    Each packed message only contains the top-level keys whose values changed
+    since the previous message. A full message, called a keyframe, is packed
+    every ``keyframe_count`` messages or every ``keyframe_interval`` seconds.
+    The output is read back by :func:`mpacklog.delta_decode.delta_decode`.
+
+    Values are compared by their packed bytes, so that in-place modifications
+    of logged objects are detected and values such as NumPy arrays or NaNs
+    compare as expected.
+
+    Keys of dictionaries can be interned as described in
+    :mod:`mpacklog.key_table`, in which case the full key table is packed
+    along with each keyframe.
+
+    Note:
+        Keys removed from a message are not recorded: they keep their last
+        value in decoded dictionaries. Keyframes also pack these keys, with
+        their last value, so that decoding from a keyframe yields the same
+        dictionaries as replaying all previous deltas.
+
+    Attributes:
+        is_keyframe: True if the last packed message is a keyframe.
+    """
+
+    is_keyframe: bool
+
+    def __init__(
+        self,
+        keyframe_count: Optional[int] = 1000,
+        keyframe_interval: Optional[float] = None,
+        ndarray_ext: bool = False,
+        intern_keys: bool = False,
+    ):
+        """Initialize packer.
+
+        Args:
+            keyframe_count: If set, pack a keyframe every this many messages.
+            keyframe_interval: If set, pack a keyframe when this duration in
+                seconds has elapsed since the last keyframe.
+            ndarray_ext: If set, pack NumPy arrays into the compact
+                extension type of :func:`mpacklog.ext_types.pack_ndarray`
+                rather than into lists.
+            intern_keys: If set, replace the string keys of dictionaries by
+                integer ids.
+        """
+        default = serialize_ndarray if ndarray_ext else serialize
+        self.__interner = (
+            KeyInterningPacker(default, table_interval=None)
+            if intern_keys
+            else None
+        )
+        self.__keyframe_count = keyframe_count
+        self.__keyframe_interval = keyframe_interval
+        self.__last_keyframe_time = 0.0
+        self.__packer = msgpack.Packer(default=default, use_bin_type=True)
+        self.__previous: Dict[Any, bytes] = {}
+        self.__since_keyframe = 0
+        self.is_keyframe = False
+
+    def reset(self) -> None:
+        """Start packing a new log file, beginning with a keyframe."""
+        self.__previous = {}
+        self.__since_keyframe = 0
+        if self.__interner is not None:
+            self.__interner.reset()
+
+    def __next_is_keyframe(self) -> bool:
+        """Check whether the next message should be a keyframe.
+
+        Returns:
+            True if the next packed message should be a keyframe.
+        """
+        if not self.__previous:
+            return True
+        if (
+            self.__keyframe_count is not None
+            and self.__since_keyframe >= self.__keyframe_count
+        ):
+            return True
+        if self.__keyframe_interval is not None:
+            elapsed = time.monotonic() - self.__last_keyframe_time
+            return elapsed >= self.__keyframe_interval
+        return False
+
+    def pack(self, message: dict) -> bytes:
+        """Pack a message.
+
+        Args:
+            message: Dictionary to pack.
+
+        Returns:
+            Packed keyframe or delta.
+        """
+        if self.__interner is not None:
+            message = self.__interner.intern(message)
+        pack = self.__packer.pack
+        packed = {key: pack(value) for key, value in message.items()}
+        self.is_keyframe = self.__next_is_keyframe()
+        if self.is_keyframe:
+            self.__previous.update(packed)
+            changed = self.__previous  # including keys removed since
+            self.__since_keyframe = 1
+            if self.__keyframe_interval is not None:
+                self.__last_keyframe_time = time.monotonic()
+        else:  # delta
+            previous = self.__previous
+            changed = {
+                key: value
+                for key, value in packed.items()
+                if previous.get(key) != value
+            }
+            previous.update(changed)
+            self.__since_keyframe += 1
+        chunks = [self.__packer.pack_map_header(len(changed))]
+        if self.__interner is not None:
+            chunks.insert(0, self.__interner.pack_record(self.is_keyframe))
+        for key, value in changed.items():
+            chunks.append(pack(key))
+            chunks.append(value)
+        return b"".join(chunks)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""MessagePack extension types used in log files.
+
+Extension types keep log files valid MessagePack streams while storing some
+objects in a more compact form. Each type has a reserved extension code:
+
+- :data:`NDARRAY_EXT_CODE`: NumPy array, stored as its dtype, shape and raw
+  little-endian bytes.
+- :data:`KEY_TABLE_EXT_CODE`: record of the key table of a log file with
+  interned keys, see :mod:`mpacklog.key_table`.
+- :data:`BLOCK_EXT_CODE`: block of compressed messages, see
+  :mod:`mpacklog.compression`.
+"""
+
+import functools
+import struct
+from typing import Any, Tuple
+
+import msgpack
+
+from .serialize import serialize
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is an optional dependency
+    np = None  # type: ignore[assignment]
+
+NDARRAY_EXT_CODE = 1
+
+KEY_TABLE_EXT_CODE = 2
+
+BLOCK_EXT_CODE = 3
+
+NDARRAY_KINDS = "biufc"
+
+
+@functools.lru_cache(maxsize=256)
+def pack_ndarray_header(dtype_str: str, shape: Tuple[int, ...]) -> bytes:
+    """Pack the header of an array payload.
+
+    Args:
+        dtype_str: Little-endian dtype string of the array, e.g. "<f8".
+        shape: Shape of the array.
+
+    Returns:
+        Header made of the length of the dtype string, the dtype string, the
+        number of dimensions and the shape of the array.
+    """
+    dtype_bytes = dtype_str.encode("ascii")
+    return struct.pack(
+        f"<B{len(dtype_bytes)}sB{len(shape)}Q",
+        len(dtype_bytes),
+        dtype_bytes,
+        len(shape),
+        *shape,
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def unpack_ndarray_header(header: bytes) -> Tuple[Any, Tuple[int, ...]]:
+    """Unpack the header of an array payload.
+
+    Args:
+        header: Header packed by :func:`pack_ndarray_header`.
+
+    Returns:
+        Pair of dtype and shape of the array.
+    """
+    dtype_len = header[0]
+    dtype = np.dtype(header[1 : 1 + dtype_len].decode("ascii"))
+    ndim = header[1 + dtype_len]
+    shape = struct.unpack_from(f"<{ndim}Q", header, 2 + dtype_len)
+    return dtype, shape
+
+
+def pack_ndarray(array) -> msgpack.ExtType:
+    """Pack a NumPy array into an extension type.
+
+    The payload is made of the header of :func:`pack_ndarray_header`,
+    followed by the raw bytes of the values of the array in C order and
+    little-endian byte order. Values are read through the buffer protocol of
+    the array, without intermediate copy when the array is already
+    contiguous and little-endian.
+
+    Args:
+        array: NumPy array with a boolean or numeric dtype.
+
+    Returns:
+        Extension type holding the array.
+    """
+    dtype = array.dtype
+    if dtype.str[0] == ">" or not array.flags.c_contiguous:
+        dtype = dtype.newbyteorder("<")
+        array = np.ascontiguousarray(array, dtype=dtype).reshape(array.shape)
+    header = pack_ndarray_header(dtype.str, array.shape)
+    return msgpack.ExtType(NDARRAY_EXT_CODE, b"".join((header, array)))
+
+
+def unpack_ndarray(data: bytes):
+    """Unpack a NumPy array from the payload of its extension type.
+
+    Args:
+        data: Payload of the extension type.
+
+    Returns:
+        Read-only NumPy array sharing memory with the payload.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    if np is None:
+        raise ImportError(
+            "unpacking arrays requires NumPy, "
+            "which can be installed by `pip install numpy`"
+        )
+    header_len = 2 + data[0] + 8 * data[1 + data[0]]
+    dtype, shape = unpack_ndarray_header(data[:header_len])
+    return np.frombuffer(data, dtype=dtype, offset=header_len).reshape(shape)
+
+
+def ext_hook(code: int, data: bytes) -> Any:
+    """Unpack extension types found in log files.
+
+    Args:
+        code: Extension code.
+        data: Payload of the extension type.
+
+    Returns:
+        Unpacked object, or the extension type itself if its code is unknown.
+    """
+    if code == NDARRAY_EXT_CODE:
+        return unpack_ndarray(data)
+    return msgpack.ExtType(code, data)
+
+
+def serialize_ndarray(obj):
+    """Serialize an object for message packing, with arrays as extensions.
+
+    NumPy arrays with boolean or numeric dtypes are packed into extension
+    types by :func:`pack_ndarray`. Other objects are serialized by
+    :func:`mpacklog.serialize.serialize`.
+
+    Args:
+        obj: Object to serialize.
+
+    Returns:
+        Serialized object.
+    """
+    if (
+        np is not None
+        and isinstance(obj, np.ndarray)
+        and obj.dtype.kind in NDARRAY_KINDS
+    ):
+        return pack_ndarray(obj)
+    return serialize(obj)
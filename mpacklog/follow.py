@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Follow a log file as it grows, as in `tail -F`.
+
+A :class:`FileFollower` reads new bytes from a log file as they are written.
+It waits for them on inotify events on Linux, so that an idle follower does
+not wake up until its file changes, and otherwise falls back to polling with
+an exponential backoff. It also follows the log file when it is truncated,
+replaced by a new file at the same path, or when the next file of a rotated
+log, see :mod:`mpacklog.rotation`, or a new log file in a watched directory
+appears. Files that existed before, or were already followed, are never
+switched back to, even if they are modified.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import Optional, Set
+
+from .rotation import (
+    get_base_path,
+    get_next_rotated_file,
+    list_rotated_files,
+)
+from .utils import list_log_files
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+INOTIFY_TIMEOUT = 1.0  # seconds between two checks without inotify events
+
+
+def load_inotify() -> Optional[ctypes.CDLL]:
+    """Load the C library with inotify functions, if there is one.
+
+    Returns:
+        C library, or None if inotify is not available on this platform.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") else None
+
+
+libc = load_inotify()
+
+
+class Inotify:
+    """Watch a log file and its directory with inotify.
+
+    Attributes:
+        fd: File descriptor to read inotify events from.
+    """
+
+    fd: int
+
+    def __init__(self, path: str):
+        """Start watching a log file.
+
+        Args:
+            path: Path to the log file.
+
+        Raises:
+            OSError: If inotify fails to initialize.
+        """
+        if libc is None:
+            raise OSError("inotify is not available on this platform")
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.path.dirname(path) or "."
+        self.__file_wd = -1
+        self.__libc = libc
+        self.fd = fd
+        try:
+            self.__add_watch(directory, IN_CREATE | IN_MOVED_TO)
+            self.watch(path)
+        except OSError:
+            os.close(fd)
+            raise
+
+    def __add_watch(self, path: str, mask: int) -> int:
+        """Add a watch to the inotify instance.
+
+        Args:
+            path: Path to watch.
+            mask: Events to watch for.
+
+        Returns:
+            Watch descriptor.
+
+        Raises:
+            OSError: If the path cannot be watched.
+        """
+        wd = self.__libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {path}")
+        return wd
+
+    def watch(self, path: str) -> None:
+        """Watch a new log file in place of the previous one.
+
+        Args:
+            path: Path to the log file.
+        """
+        if self.__file_wd >= 0:  # no error check: the file may be deleted
+            self.__libc.inotify_rm_watch(self.fd, self.__file_wd)
+        self.__file_wd = self.__add_watch(
+            path, IN_MODIFY | IN_ATTRIB | IN_DELETE_SELF | IN_MOVE_SELF
+        )
+
+    def read_events(self) -> int:
+        """Read all pending events without blocking.
+
+        Returns:
+            Bitwise OR of the masks of all pending events.
+        """
+        mask = 0
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return mask
+            offset = 0
+            while offset < len(data):
+                _, event_mask, _, name_len = INOTIFY_EVENT.unpack_from(
+                    data, offset
+                )
+                mask |= event_mask
+                offset += INOTIFY_EVENT.size + name_len
+
+    def close(self) -> None:
+        """Stop watching and release the inotify file descriptor."""
+        os.close(self.fd)
+
+
+class FileFollower:
+    """Follow a log file as it grows, as in `tail -F`.
+
+    Attributes:
+        chunk_size: Maximum number of bytes returned by a read.
+        log_path: Path watched for newer log files, that is, the base path of
+            a rotated log, a directory of log files, or the log file itself.
+        offset: Byte offset of the next read in the current log file.
+        path: Path to the current log file.
+        reopened: True if the last read switched to the beginning of a log
+            file, because it was truncated, replaced or rotated. Data from
+            the previous file should then be discarded by the reader, for
+            instance by resetting its unpacker.
+    """
+
+    chunk_size: int
+    log_path: str
+    offset: int
+    path: str
+    reopened: bool
+
+    def __init__(
+        self,
+        path: str,
+        offset: int = 0,
+        log_path: Optional[str] = None,
+        chunk_size: int = 4096,
+        use_inotify: bool = True,
+        min_delay: float = 0.001,
+        max_delay: float = 0.05,
+        check_period: float = 0.1,
+    ):
+        """Open a log file to follow.
+
+        Args:
+            path: Path to the log file.
+            offset: Byte offset to start reading from.
+            log_path: Path watched for newer log files. Defaults to the base
+                path of the rotated log the file is part of, if any, or to the
+                file itself.
+            chunk_size: Maximum number of bytes returned by a read.
+            use_inotify: If set (default), wait for inotify events when they
+                are available. Otherwise, poll the file with a backoff.
+            min_delay: Polling delay in seconds after new data, doubled after
+                each empty poll, when inotify is not used.
+            max_delay: Maximum polling delay in seconds.
+            check_period: Minimum duration in seconds between two checks for
+                a replaced or newer log file while the file grows.
+        """
+        if log_path is None:
+            base_path = get_base_path(path)
+            if base_path is not None and list_rotated_files(base_path):
+                log_path = base_path
+            else:  # not part of a rotated log
+                log_path = path
+        file = open(path, "rb")
+        file.seek(offset)
+        inotify: Optional[Inotify] = None
+        if use_inotify:
+            try:
+                inotify = Inotify(path)
+            except OSError:  # e.g. not on Linux, fall back to polling
+                inotify = None
+        self.__check_period = check_period
+        self.__delay = min_delay
+        self.__events = 0
+        self.__file = file
+        self.__inotify = inotify
+        self.__last_check = time.monotonic()
+        self.__max_delay = max_delay
+        self.__min_delay = min_delay
+        self.__next_path: Optional[str] = None
+        self.__seen_files: Set[str] = set(
+            list_log_files(log_path) if os.path.isdir(log_path) else [path]
+        )
+        self.chunk_size = chunk_size
+        self.log_path = log_path
+        self.offset = offset
+        self.path = path
+        self.reopened = False
+
+    def __enter__(self):
+        """Enter a context block."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the follower when exiting a context block."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the log file and stop watching it."""
+        self.__file.close()
+        if self.__inotify is not None:
+            self.__inotify.close()
+
+    @property
+    def uses_inotify(self) -> bool:
+        """True if the follower waits for inotify events."""
+        return self.__inotify is not None
+
+    def __find_new_file(self) -> Optional[str]:
+        """Check whether the log continues in a new file.
+
+        Returns:
+            Path to the new file, or None if the log continues in the current
+            one.
+        """
+        if self.log_path != self.path:  # rotated log or directory
+            next_path = get_next_rotated_file(self.path)
+            if next_path is not None:
+                return next_path
+        if os.path.isdir(self.log_path):
+            files = set(list_log_files(self.log_path))
+            new_files = files - self.__seen_files
+            self.__seen_files |= files
+            if new_files:  # created since the last check
+                return max(
+                    new_files, key=lambda file: (os.path.getmtime(file), file)
+                )
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:  # file deleted, wait for it to reappear
+            return None
+        if inode != os.fstat(self.__file.fileno()).st_ino:
+            return self.path  # file replaced, e.g. by logrotate
+        return None
+
+    def __open(self, path: str) -> None:
+        """Switch to the beginning of a log file.
+
+        Args:
+            path: Path to the log file.
+        """
+        self.__file.close()
+        self.__file = open(path, "rb")
+        if self.__inotify is not None:
+            self.__inotify.watch(path)
+        self.__next_path = None
+        self.offset = 0
+        self.path = path
+        self.reopened = True
+
+    def __read_available(self) -> bytes:
+        """Read available bytes without waiting.
+
+        Returns:
+            New bytes, or an empty bytes object if there are none yet.
+        """
+        while True:
+            data = self.__file.read(self.chunk_size)
+            if data:
+                self.offset += len(data)
+                return data
+            if os.fstat(self.__file.fileno()).st_size < self.offset:
+                self.__file.seek(0)  # file truncated
+                self.offset = 0
+                self.reopened = True
+                continue
+            if self.__next_path is not None:  # current file read to its end
+                self.__open(self.__next_path)
+                continue
+            now = time.monotonic()
+            if (
+                self.__events & ~IN_MODIFY
+                or now - self.__last_check >= self.__check_period
+            ):
+                self.__events = 0
+                self.__last_check = now
+                self.__next_path = self.__find_new_file()
+                if self.__next_path is not None:
+                    continue  # read the current file to its end first
+            return b""
+
+    def __get_timeout(self, deadline: Optional[float]) -> Optional[float]:
+        """Get the duration of the next wait.
+
+        Args:
+            deadline: Monotonic time after which reads return, if any.
+
+        Returns:
+            Duration in seconds, or None if the deadline has passed.
+        """
+        if self.__inotify is not None:
+            timeout = INOTIFY_TIMEOUT
+        else:  # exponential backoff
+            timeout = self.__delay
+            self.__delay = min(2.0 * self.__delay, self.__max_delay)
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        return min(timeout, remaining) if remaining > 0.0 else None
+
+    def read(self, timeout: Optional[float] = None) -> bytes:
+        """Wait for new bytes from the log file.
+
+        Args:
+            timeout: If set, return after this duration in seconds even if
+                there are no new bytes.
+
+        Returns:
+            New bytes, or an empty bytes object if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.reopened = False
+        while True:
+            data = self.__read_available()
+            if data:
+                self.__delay = self.__min_delay
+                return data
+            wait_time = self.__get_timeout(deadline)
+            if wait_time is None:
+                return b""
+            if self.__inotify is None:
+                time.sleep(wait_time)
+                continue
+            fd = self.__inotify.fd
+            if select.select([fd], [], [], wait_time)[0]:
+                self.__events |= self.__inotify.read_events()
+
+    async def read_async(self, timeout: Optional[float] = None) -> bytes:
+        """Wait asynchronously for new bytes from the log file.
+
+        Args:
+            timeout: If set, return after this duration in seconds even if
+                there are no new bytes.
+
+        Returns:
+            New bytes, or an empty bytes object if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.reopened = False
+        while True:
+            data = self.__read_available()
+            if data:
+                self.__delay = self.__min_delay
+                return data
+            wait_time = self.__get_timeout(deadline)
+            if wait_time is None:
+                return b""
+            if self.__inotify is None:
+                await asyncio.sleep(wait_time)
+                continue
+            await self.__wait_events(wait_time)
+
+    async def __wait_events(self, timeout: float) -> None:
+        """Wait asynchronously for inotify events.
+
+        Args:
+            timeout: Maximum duration to wait for, in seconds.
+        """
+        assert self.__inotify is not None
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = self.__inotify.fd
+
+        def on_readable() -> None:
+            if not readable.done():
+                readable.set_result(None)
+
+        loop.add_reader(fd, on_readable)
+        try:
+            await asyncio.wait_for(readable, timeout)
+        except asyncio.TimeoutError:
+            return
+        finally:
+            loop.remove_reader(fd)
+        self.__events |= self.__inotify.read_events()
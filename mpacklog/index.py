@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Sidecar index of message byte offsets in log files.
+
+An index is stored next to its log file, with the ``.idx`` suffix appended to
+the log file name. It is a MessagePack stream starting with a header
+dictionary, followed by one ``[message_number, byte_offset, time]`` entry per
+indexed message, where ``time`` is the value of the timestamp field of the
+message, or None if there is no such field. Entries are appended while the log
+is written, so that an index can be read while its log file is still growing.
+"""
+
+import bisect
+import os
+from typing import Any, BinaryIO, Generator, List, Optional, Tuple
+
+import msgpack
+
+from .compression import decompress_block, is_compressed
+from .key_table import KeyTableUnpacker, get_key_table
+
+INDEX_VERSION = 1
+
+
+def get_index_path(path: str) -> str:
+    """Get the path to the sidecar index of a log file.
+
+    Args:
+        path: Path to the log file.
+
+    Returns:
+        Path to the index file.
+    """
+    return f"{path}.idx"
+
+
+def get_time(message: Any, time_field: Optional[str]) -> Optional[float]:
+    """Get the timestamp of a message.
+
+    Args:
+        message: Unpacked message.
+        time_field: Timestamp field of the message, with nested keys in
+            "key1/.../keyN" format.
+
+    Returns:
+        Timestamp of the message, or None if the message has no such field.
+    """
+    if time_field is None:
+        return None
+    value = message
+    for key in time_field.split("/"):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value if isinstance(value, (int, float)) else None
+
+
+class Index:
+    """Index of message byte offsets in a log file.
+
+    Attributes:
+        keyframes: If True, indexed messages are keyframes of a delta-encoded
+            log, from which decoding can start without reading previous
+            messages.
+        numbers: Message numbers of indexed messages, in increasing order.
+        offsets: Byte offsets of indexed messages in the log file.
+        stride: Number of messages between two index entries.
+        time_field: Timestamp field recorded in index entries, if any.
+        times: Timestamps of indexed messages, None when unavailable.
+    """
+
+    keyframes: bool
+    numbers: List[int]
+    offsets: List[int]
+    stride: int
+    time_field: Optional[str]
+    times: List[Optional[float]]
+
+    def __init__(
+        self,
+        stride: int = 1,
+        time_field: Optional[str] = None,
+        keyframes: bool = False,
+    ):
+        """Initialize an empty index.
+
+        Args:
+            stride: Number of messages between two index entries.
+            time_field: Timestamp field recorded in index entries, if any.
+            keyframes: If True, indexed messages are keyframes of a
+                delta-encoded log.
+        """
+        self.__timed_entries: List[int] = []
+        self.__timed_times: Optional[List[float]] = None
+        self.keyframes = keyframes
+        self.numbers = []
+        self.offsets = []
+        self.stride = stride
+        self.time_field = time_field
+        self.times = []
+
+    def __len__(self) -> int:
+        """Number of entries in the index."""
+        return len(self.numbers)
+
+    @property
+    def header(self) -> dict:
+        """Header dictionary of the index file."""
+        return {
+            "version": INDEX_VERSION,
+            "stride": self.stride,
+            "time_field": self.time_field,
+            "keyframes": self.keyframes,
+        }
+
+    def append(
+        self, number: int, offset: int, time: Optional[float] = None
+    ) -> None:
+        """Add an entry at the end of the index.
+
+        Args:
+            number: Message number, greater than that of previous entries.
+            offset: Byte offset of the message in the log file.
+            time: Timestamp of the message, if available.
+        """
+        self.__timed_times = None
+        self.numbers.append(number)
+        self.offsets.append(offset)
+        self.times.append(time)
+
+    def lookup(self, number: int) -> Tuple[int, int]:
+        """Find the last indexed message at or before a given message.
+
+        Args:
+            number: Message number to look up.
+
+        Returns:
+            Pair of message number and byte offset of the last index entry
+            at or before the desired message, or ``(0, 0)`` if there is no
+            such entry.
+        """
+        i = bisect.bisect_right(self.numbers, number) - 1
+        if i < 0:
+            return 0, 0
+        return self.numbers[i], self.offsets[i]
+
+    def lookup_time(self, time: float) -> Tuple[int, int]:
+        """Find the last indexed message strictly before a given time.
+
+        Timestamps are assumed to be non-decreasing along the log. Entries
+        without timestamp are skipped.
+
+        Args:
+            time: Timestamp to look up.
+
+        Returns:
+            Pair of message number and byte offset of the last index entry
+            with a timestamp strictly lower than ``time``, or ``(0, 0)`` if
+            there is no such entry.
+        """
+        if self.__timed_times is None:
+            self.__timed_entries = [
+                i for i, t in enumerate(self.times) if t is not None
+            ]
+            self.__timed_times = [t for t in self.times if t is not None]
+        j = bisect.bisect_left(self.__timed_times, time) - 1
+        if j < 0:
+            return 0, 0
+        i = self.__timed_entries[j]
+        return self.numbers[i], self.offsets[i]
+
+    @staticmethod
+    def read(path: str) -> Optional["Index"]:
+        """Read the sidecar index of a log file.
+
+        Entries pointing beyond the end of the log file, for instance if the
+        logger was interrupted before writing indexed messages, are ignored.
+
+        Args:
+            path: Path to the log file.
+
+        Returns:
+            Index of the log file, or None if it has no valid index.
+        """
+        index_path = get_index_path(path)
+        if not os.path.exists(index_path):
+            return None
+        log_size = os.path.getsize(path)
+        with open(index_path, "rb") as file:
+            unpacker = msgpack.Unpacker(file, raw=False)
+            try:
+                header = next(unpacker)
+            except (StopIteration, ValueError):
+                return None
+            if not isinstance(header, dict):
+                return None
+            if header.get("version") != INDEX_VERSION:
+                return None
+            index = Index(
+                header["stride"],
+                header.get("time_field"),
+                header["keyframes"],
+            )
+            try:
+                for entry in unpacker:
+                    if entry[1] >= log_size:
+                        break
+                    index.append(*entry)
+            except (ValueError, msgpack.OutOfData):  # truncated last entry
+                pass
+        return index
+
+    def write(self, path: str) -> None:
+        """Write index to the sidecar file of a log file.
+
+        Args:
+            path: Path to the log file.
+        """
+        writer = IndexWriter(
+            path, self.stride, self.time_field, self.keyframes
+        )
+        with writer:
+            for entry in zip(self.numbers, self.offsets, self.times):
+                writer.append(*entry)
+
+
+class IndexWriter:
+    """Write the sidecar index of a log file incrementally.
+
+    The writer is given every message written to the log file, in sequence,
+    along with its packed size, and records an index entry every ``stride``
+    messages. The index file is created on the first appended entry. Entries
+    are flushed as they are appended so that readers can use them right away.
+
+    Attributes:
+        path: Path to the index file.
+    """
+
+    path: str
+
+    def __init__(
+        self,
+        path: str,
+        stride: int = 1000,
+        time_field: Optional[str] = "time",
+        keyframes: bool = False,
+    ):
+        """Initialize writer.
+
+        Args:
+            path: Path to the log file.
+            stride: Number of messages between two index entries. When
+                indexing keyframes, this is the minimum number of messages
+                between two entries.
+            time_field: Timestamp field to record in index entries, if any.
+            keyframes: If True, only record messages flagged as keyframes.
+        """
+        self.__file: Optional[BinaryIO] = None
+        self.__header = Index(stride, time_field, keyframes).header
+        self.__next_number = 0
+        self.__number = 0
+        self.__offset = 0
+        self.__packer = msgpack.Packer(use_bin_type=True)
+        self.__started = False
+        self.__stride = stride
+        self.__time_field = time_field
+        self.path = get_index_path(path)
+
+    def __enter__(self):
+        """Enter the context of the writer.
+
+        Returns:
+            Writer itself.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the index file.
+
+        Args:
+            exc_type: Type of the exception raised in the context, if any.
+            exc_value: Exception raised in the context, if any.
+            traceback: Traceback of the exception, if any.
+        """
+        self.close()
+
+    def add(
+        self,
+        message: Any,
+        size: int,
+        keyframe: bool = True,
+        count: int = 1,
+    ) -> None:
+        """Account for a new message written to the log file.
+
+        Args:
+            message: Message written to the log file, or for delta-encoded
+                logs the full message before encoding.
+            size: Size of the packed message in bytes.
+            keyframe: If False, the message cannot be indexed.
+            count: Number of messages written, for a compressed block of
+                messages starting with ``message``.
+        """
+        if keyframe and self.__number >= self.__next_number:
+            time = get_time(message, self.__time_field)
+            self.append(self.__number, self.__offset, time)
+            self.__next_number = self.__number + self.__stride
+        self.__number += count
+        self.__offset += size
+
+    def append(
+        self, number: int, offset: int, time: Optional[float] = None
+    ) -> None:
+        """Append an entry to the index file.
+
+        Args:
+            number: Message number, greater than that of previous entries.
+            offset: Byte offset of the message in the log file.
+            time: Timestamp of the message, if available.
+        """
+        if self.__file is None and self.__started:
+            self.__file = open(self.path, "ab")
+        elif self.__file is None:
+            self.__file = open(self.path, "wb")
+            self.__file.write(self.__packer.pack(self.__header))
+            self.__started = True
+        self.__file.write(self.__packer.pack([number, offset, time]))
+        self.__file.flush()
+
+    def close(self) -> None:
+        """Close the index file.
+
+        Appending a new entry after closing reopens the index file.
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def reset(self, path: Optional[str] = None) -> None:
+        """Close the index file and start over a new one on next entry.
+
+        Args:
+            path: If set, path to the new log file to index.
+        """
+        self.close()
+        if path is not None:
+            self.path = get_index_path(path)
+        self.__next_number = 0
+        self.__number = 0
+        self.__offset = 0
+        self.__started = False
+
+
+def read_offsets(
+    file: BinaryIO, chunk_size: int = 100_000
+) -> Generator[Tuple[Any, Optional[int]], None, None]:
+    """Read the messages of a log file along with their byte offsets.
+
+    Args:
+        file: Log file opened in binary mode.
+        chunk_size: Number of bytes to read per internal loop cycle.
+
+    Returns:
+        Generator to each message of the log file, along with the byte offset
+        from which decoding can start at this message. In compressed log
+        files, this is the offset of the block of the first message of each
+        block, and None for other messages.
+    """
+    compressed = is_compressed(file)
+    table = get_key_table(file, 0)
+    unpacker: Any = msgpack.Unpacker(raw=False)  # unpacks blocks, if any
+    if table is not None:  # log file with interned keys
+        unpacker = KeyTableUnpacker(table)
+    offset = 0
+    while True:
+        data = file.read(chunk_size)
+        if not data:  # end of file
+            break
+        unpacker.feed(data)
+        while True:
+            try:
+                obj = unpacker.unpack()
+            except msgpack.OutOfData:
+                break
+            if compressed:
+                messages = msgpack.Unpacker(raw=False)
+                messages.feed(decompress_block(obj.data))
+                for i, message in enumerate(messages):
+                    yield message, offset if i == 0 else None
+            else:  # obj is a message
+                yield obj, offset
+            offset = unpacker.tell()
+
+
+def build_index(
+    path: str,
+    stride: int = 1000,
+    time_field: Optional[str] = "time",
+    delta: bool = False,
+    chunk_size: int = 100_000,
+) -> Index:
+    """Build the index of an existing log file.
+
+    The index is written to the sidecar file of the log.
+
+    For delta-encoded logs, only keyframes are indexed. A message is a
+    keyframe when it contains all keys accumulated so far, as the decoded
+    dictionary is then equal to the message itself. For compressed logs,
+    only the first message of each block is indexed.
+
+    Args:
+        path: Path to the log file.
+        stride: Number of messages between two index entries. For
+            delta-encoded logs, minimum number of messages between two
+            indexed keyframes.
+        time_field: Timestamp field to record in index entries, if any.
+        delta: If True, the log file is delta-encoded.
+        chunk_size: Number of bytes to read per internal loop cycle.
+
+    Returns:
+        Index of the log file.
+    """
+    index = Index(stride, time_field, keyframes=delta)
+    keys: set = set()
+    number = 0
+    next_number = 0
+    with open(path, "rb") as file:
+        for message, offset in read_offsets(file, chunk_size):
+            if (
+                offset is not None
+                and number >= next_number
+                and (not delta or keys.issubset(message))
+            ):
+                time = get_time(message, time_field)
+                index.append(number, offset, time)
+                next_number = number + stride
+            if delta:
+                keys.update(message)
+            number += 1
+    index.write(path)
+    return index
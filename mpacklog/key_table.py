@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Log files with interned dictionary keys.
+
+In log files with interned keys, string keys of dictionaries are replaced by
+integer ids, which take a single byte for the first 128 keys. Ids are defined
+by key table records written between messages, as extension types of code
+:data:`mpacklog.ext_types.KEY_TABLE_EXT_CODE`. The payload of a record is a
+packed list ``[start, key, ...]`` defining keys from id ``start`` onwards.
+
+Records with a ``start`` of zero hold the full key table. A log file with
+interned keys begins with one, and full records are repeated periodically so
+that readers starting from a message boundary in the middle of the file only
+need to look back to the last full record.
+"""
+
+import re
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+import msgpack
+
+from .ext_types import KEY_TABLE_EXT_CODE, ext_hook
+from .serialize import serialize
+
+EXT_CODE_POSITIONS = {
+    0xC7: 2,  # ext 8
+    0xC8: 3,  # ext 16
+    0xC9: 5,  # ext 32
+    0xD4: 1,  # fixext 1
+    0xD5: 1,  # fixext 2
+    0xD6: 1,  # fixext 4
+    0xD7: 1,  # fixext 8
+    0xD8: 1,  # fixext 16
+}
+
+KEY_RECORD = object()  # unpacked in place of key table records
+
+KEY_RECORD_PATTERN = re.compile(
+    rb"(?=(?:[\xd4-\xd8]|\xc7.|\xc8..|\xc9....)"
+    + re.escape(bytes([KEY_TABLE_EXT_CODE]))
+    + rb")",
+    re.DOTALL,
+)
+
+
+class KeyTable:
+    """Table of interned keys, as defined by key table records.
+
+    Attributes:
+        keys: Keys indexed by their ids.
+    """
+
+    keys: List[str]
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self.keys = []
+
+    def update(self, payload: bytes) -> int:
+        """Apply a key table record.
+
+        Args:
+            payload: Payload of the key table record.
+
+        Returns:
+            Id of the first key defined by the record, zero for a full table.
+
+        Raises:
+            ValueError: If the payload is not a valid key table record.
+        """
+        record = msgpack.unpackb(payload, raw=False)
+        if (
+            not isinstance(record, list)
+            or not record
+            or type(record[0]) is not int
+            or not 0 <= record[0] <= len(self.keys)
+            or not all(type(key) is str for key in record[1:])
+        ):
+            raise ValueError(f"Invalid key table record {record!r}")
+        start = record[0]
+        del self.keys[start:]
+        self.keys.extend(record[1:])
+        return start
+
+    def expand_keys(self, pairs) -> dict:
+        """Build a dictionary with its interned keys expanded to strings.
+
+        Args:
+            pairs: Key-value pairs of an unpacked dictionary.
+
+        Returns:
+            Dictionary with string keys.
+        """
+        keys = self.keys
+        return {
+            keys[key] if type(key) is int else key: value
+            for key, value in pairs
+        }
+
+
+class KeyInterningPacker:
+    """Pack dictionaries with their string keys interned.
+
+    Key table records are packed along with messages that have new keys, and
+    a full key table is packed with the first message and then every
+    ``table_interval`` messages. The output is read back transparently by all
+    decoders.
+
+    Note:
+        Integer keys are ambiguous with interned keys, and raise an error.
+        Dictionaries returned by the ``default`` conversion function are
+        packed without interning their keys.
+    """
+
+    def __init__(
+        self,
+        default: Callable = serialize,
+        table_interval: Optional[int] = 1000,
+    ):
+        """Initialize packer.
+
+        Args:
+            default: Function to convert objects that MessagePack cannot pack
+                natively, as in ``msgpack.Packer``.
+            table_interval: If set, pack the full key table every this many
+                messages. Otherwise, only pack it with the first message.
+        """
+        self.__ids: Dict[str, int] = {}
+        self.__new_keys: List[str] = []
+        self.__packer = msgpack.Packer(default=default, use_bin_type=True)
+        self.__since_table: Optional[int] = None
+        self.__table_interval = table_interval
+
+    def reset(self) -> None:
+        """Start packing a new log file, with a new key table."""
+        self.__ids = {}
+        self.__new_keys = []
+        self.__since_table = None
+
+    def __intern_key(self, key: Any) -> Any:
+        """Get the id of a key, registering it if needed.
+
+        Args:
+            key: Dictionary key.
+
+        Returns:
+            Id of a string key, or the key itself for other types.
+
+        Raises:
+            ValueError: If the key is an integer.
+        """
+        if type(key) is str:
+            key_id = self.__ids.get(key)
+            if key_id is None:
+                key_id = self.__ids[key] = len(self.__ids)
+                self.__new_keys.append(key)
+            return key_id
+        if type(key) is int:
+            raise ValueError(
+                f"Cannot intern keys of a dictionary with integer key {key}"
+            )
+        return key
+
+    def intern(self, obj: Any) -> Any:
+        """Replace the string keys of dictionaries in an object by their ids.
+
+        Args:
+            obj: Object to process, e.g. a message.
+
+        Returns:
+            Object where dictionaries, including those nested in dictionaries
+            and lists, have interned keys.
+        """
+        obj_type = type(obj)
+        if obj_type is dict:
+            ids = self.__ids
+            try:
+                return {
+                    ids[key]: self.intern(value) for key, value in obj.items()
+                }
+            except KeyError:  # some keys are new
+                return {
+                    self.__intern_key(key): self.intern(value)
+                    for key, value in obj.items()
+                }
+        if obj_type is list or obj_type is tuple:
+            return [self.intern(item) for item in obj]
+        return obj
+
+    def pack_record(self, full: bool = False) -> bytes:
+        """Pack the key table record due before the next message, if any.
+
+        Args:
+            full: If set, pack the full key table.
+
+        Returns:
+            Packed record, or empty bytes if no record is due.
+        """
+        if (
+            full
+            or self.__since_table is None
+            or (
+                self.__table_interval is not None
+                and self.__since_table >= self.__table_interval
+            )
+        ):
+            start, keys = 0, list(self.__ids)
+            self.__since_table = 0
+        elif self.__new_keys:
+            start, keys = (
+                len(self.__ids) - len(self.__new_keys),
+                self.__new_keys,
+            )
+        else:  # no record
+            self.__since_table += 1
+            return b""
+        self.__new_keys = []
+        self.__since_table += 1
+        payload = msgpack.packb([start, *keys], use_bin_type=True)
+        return self.__packer.pack(msgpack.ExtType(KEY_TABLE_EXT_CODE, payload))
+
+    def pack(self, message: Any) -> bytes:
+        """Pack a message, preceded by a key table record if one is due.
+
+        Args:
+            message: Message to pack.
+
+        Returns:
+            Packed message.
+        """
+        interned = self.intern(message)
+        return self.pack_record() + self.__packer.pack(interned)
+
+
+class KeyTableUnpacker:
+    """Unpack messages with interned keys from a MessagePack stream.
+
+    Key table records are applied as they are unpacked, and interned keys of
+    unpacked dictionaries are expanded back to strings. This unpacker has the
+    same streaming interface as ``msgpack.Unpacker``.
+
+    Attributes:
+        table: Key table in effect at the current position in the stream.
+    """
+
+    table: KeyTable
+
+    def __init__(self, table: Optional[KeyTable] = None, **kwargs):
+        """Initialize unpacker.
+
+        Args:
+            table: Key table in effect at the beginning of the stream, if it
+                does not start with a full key table record.
+            kwargs: Other keyword arguments forwarded to ``msgpack.Unpacker``,
+                for instance ``file_like``.
+        """
+        self.table = table if table is not None else KeyTable()
+        self.__unpacker = msgpack.Unpacker(
+            raw=False,
+            ext_hook=self.__ext_hook,
+            object_pairs_hook=self.table.expand_keys,
+            strict_map_key=False,
+            **kwargs,
+        )
+
+    def __ext_hook(self, code: int, data: bytes) -> Any:
+        """Apply key table records and unpack other extension types.
+
+        Args:
+            code: Extension code.
+            data: Payload of the extension type.
+
+        Returns:
+            Unpacked object, or :data:`KEY_RECORD` for key table records.
+        """
+        if code == KEY_TABLE_EXT_CODE:
+            self.table.update(data)
+            return KEY_RECORD
+        return ext_hook(code, data)
+
+    def __iter__(self):
+        """Iterate over messages available in the stream."""
+        return self
+
+    def __next__(self) -> Any:
+        """Unpack the next message.
+
+        Returns:
+            Next message.
+
+        Raises:
+            StopIteration: If there is no complete message left in the
+                buffer.
+        """
+        while True:
+            message = next(self.__unpacker)
+            if message is not KEY_RECORD:
+                return message
+
+    def feed(self, data) -> None:
+        """Feed bytes to the unpacker.
+
+        Args:
+            data: Bytes or buffer to append to the stream.
+        """
+        self.__unpacker.feed(data)
+
+    def skip(self) -> None:
+        """Skip the next message.
+
+        Messages are unpacked rather than skipped over, as key table records
+        need to be applied.
+
+        Raises:
+            OutOfData: If there is no complete message left in the buffer.
+        """
+        self.unpack()
+
+    def tell(self) -> int:
+        """Get the position of the unpacker in the stream.
+
+        Returns:
+            Number of bytes unpacked from the beginning of the stream.
+        """
+        return self.__unpacker.tell()
+
+    def unpack(self) -> Any:
+        """Unpack the next message.
+
+        Returns:
+            Next message.
+
+        Raises:
+            OutOfData: If there is no complete message left in the buffer.
+        """
+        while True:
+            message = self.__unpacker.unpack()
+            if message is not KEY_RECORD:
+                return message
+
+
+def is_key_record(data: bytes) -> bool:
+    """Check whether a buffer starts with a key table record.
+
+    Args:
+        data: Buffer to check.
+
+    Returns:
+        True if the buffer starts with the header of a key table record.
+    """
+    if not data:
+        return False
+    position = EXT_CODE_POSITIONS.get(data[0])
+    return (
+        position is not None
+        and position < len(data)
+        and data[position] == KEY_TABLE_EXT_CODE
+    )
+
+
+def is_interned(file: BinaryIO) -> bool:
+    """Check whether a log file has interned keys.
+
+    Args:
+        file: Log file opened in binary mode.
+
+    Returns:
+        True if the log file starts with a key table record.
+    """
+    position = file.tell()
+    file.seek(0)
+    data = file.read(8)
+    file.seek(position)
+    return is_key_record(data)
+
+
+def replay_key_records(data, table: KeyTable) -> bool:
+    """Apply the key table records of a buffer starting with a full table.
+
+    Args:
+        data: Buffer that should start with a full key table record, followed
+            by messages and other records.
+        table: Key table to update.
+
+    Returns:
+        True if the buffer starts with a full key table record followed by
+        valid messages and records, possibly ending with an incomplete one.
+    """
+    unpacker = msgpack.Unpacker(
+        raw=False, strict_map_key=False, max_buffer_size=len(data) + 1
+    )
+    unpacker.feed(data)
+    first = True
+    while True:
+        try:
+            obj = unpacker.unpack()
+        except msgpack.OutOfData:
+            return not first
+        except Exception:  # any unpacking error means this is no record
+            return False
+        if isinstance(obj, msgpack.ExtType):
+            if obj.code != KEY_TABLE_EXT_CODE:
+                return False
+            try:
+                start = table.update(obj.data)
+            except ValueError:
+                return False
+            if first and start != 0:
+                return False
+        elif first or not isinstance(obj, dict):
+            return False
+        first = False
+
+
+def read_key_table(
+    file: BinaryIO, offset: int, window: int = 65536
+) -> KeyTable:
+    """Read the key table in effect at a message boundary of a log file.
+
+    The file is read backwards from the boundary, by chunks of doubling size,
+    until the last full key table record before the boundary. Records between
+    this full table and the boundary are then applied to it.
+
+    Args:
+        file: Log file with interned keys, opened in binary mode.
+        offset: Byte offset of a message boundary.
+        window: Number of bytes to read initially.
+
+    Returns:
+        Key table in effect at the boundary.
+    """
+    position = file.tell()
+    try:
+        while offset > 0:
+            start = max(0, offset - window)
+            file.seek(start)
+            data = memoryview(file.read(offset - start))
+            matches = list(KEY_RECORD_PATTERN.finditer(data))
+            for match in reversed(matches):
+                table = KeyTable()
+                if replay_key_records(data[match.start() :], table):
+                    return table
+            if start == 0:
+                break
+            window *= 2
+        return KeyTable()
+    finally:
+        file.seek(position)
+
+
+def get_key_table(file: BinaryIO, offset: int) -> Optional[KeyTable]:
+    """Get the key table in effect at a message boundary of a log file.
+
+    Args:
+        file: Log file opened in binary mode.
+        offset: Byte offset of a message boundary.
+
+    Returns:
+        Key table in effect at the boundary, or None if the log file does
+        not have interned keys.
+    """
+    if not is_interned(file):
+        return None
+    return read_key_table(file, offset)
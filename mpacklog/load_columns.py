@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Load selected fields from a log file into NumPy arrays."""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cli.fields import Field
+from .decode import decode
+from .index import Index
+
+MISSING = object()
+
+
+def compile_keys(label: str) -> List[Tuple[str, Optional[int]]]:
+    """Resolve the keys of a field once, ahead of lookups.
+
+    Args:
+        label: Field, i.e. nested keys in "key1/.../keyN" format.
+
+    Returns:
+        List of keys of the field, each paired with its integer value when it
+        can be used as a list index.
+    """
+    return [
+        (key, int(key) if key.lstrip("-").isdigit() else None)
+        for key in Field(label).keys
+    ]
+
+
+def get_from_compiled_keys(
+    message: dict, keys: List[Tuple[str, Optional[int]]]
+) -> Any:
+    """Get a value from a message by compiled keys.
+
+    Args:
+        message: Unpacked message.
+        keys: Compiled keys of a field.
+
+    Returns:
+        Value at the field in the message, or :data:`MISSING` if the message
+        has no such field.
+    """
+    value: Any = message
+    for key, position in keys:
+        try:
+            if position is not None and (
+                isinstance(value, list) or hasattr(value, "ndim")
+            ):
+                value = value[position]
+            else:
+                value = value[key]
+        except (IndexError, KeyError, TypeError):
+            return MISSING
+    return value
+
+
+def load_columns(
+    path: str,
+    fields: List[str],
+    chunk_size: int = 100_000,
+    masked: bool = False,
+    use_mmap: bool = False,
+) -> Dict[str, Any]:
+    """Load selected fields from a log file into NumPy arrays.
+
+    Each field gets one floating-point array with one row per message in the
+    log file. Fields with list values, such as vectors, get two-dimensional
+    arrays with one column per list element. Arrays are preallocated from the
+    index of the log file if it has one, and grow geometrically otherwise.
+
+    Args:
+        path: Path to the log file to read.
+        fields: Fields to load, i.e. nested keys in "key1/.../keyN" format.
+        chunk_size: Optional, number of bytes to read per internal loop cycle.
+        masked: Optional, if set, return masked arrays where values missing
+            from messages are masked. Otherwise, missing values are NaN.
+        use_mmap: Optional, if set, map the log file in memory rather than
+            reading it.
+
+    Returns:
+        Dictionary mapping each field to its array of values.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+        ValueError: If a field has values that are not numbers or lists of
+            numbers of the same length.
+    """
+    try:
+        import numpy as np
+    except ImportError as exn:
+        raise ImportError(
+            "loading columns requires NumPy, "
+            "which can be installed by `pip install numpy`"
+        ) from exn
+
+    compiled_keys = [compile_keys(field) for field in fields]
+    index = Index.read(path)
+    capacity = 1024
+    if index is not None and len(index) > 0:
+        capacity = max(capacity, index.numbers[-1] + index.stride)
+    columns: List[Any] = [None] * len(fields)
+    present: List[Any] = [None] * len(fields)
+    nb_rows = 0
+    messages = decode(path, chunk_size, use_mmap=use_mmap, fields=fields)
+    for message in messages:
+        if nb_rows >= capacity:
+            capacity *= 2
+            for j, column in enumerate(columns):
+                if column is None:
+                    continue
+                grown = np.full((capacity,) + column.shape[1:], np.nan)
+                grown[:nb_rows] = column[:nb_rows]
+                columns[j] = grown
+                grown_mask = np.zeros(capacity, dtype=bool)
+                grown_mask[:nb_rows] = present[j][:nb_rows]
+                present[j] = grown_mask
+        for j, keys in enumerate(compiled_keys):
+            value = get_from_compiled_keys(message, keys)
+            if value is MISSING or value is None:
+                continue
+            if columns[j] is None:
+                shape = (capacity,) + np.shape(value)
+                columns[j] = np.full(shape, np.nan)
+                present[j] = np.zeros(capacity, dtype=bool)
+            try:
+                columns[j][nb_rows] = value
+            except (TypeError, ValueError) as exn:
+                raise ValueError(
+                    f"Cannot load value {value!r} of field '{fields[j]}' "
+                    f"from message {nb_rows} into an array: {exn}"
+                ) from exn
+            present[j][nb_rows] = True
+        nb_rows += 1
+
+    arrays: Dict[str, Any] = {}
+    for field, column, mask in zip(fields, columns, present):
+        if column is None:
+            column = np.full(nb_rows, np.nan)
+            mask = np.zeros(nb_rows, dtype=bool)
+        column = column[:nb_rows].copy()
+        if masked:
+            mask = np.broadcast_to(
+                ~mask[:nb_rows].reshape((-1,) + (1,) * (column.ndim - 1)),
+                column.shape,
+            )
+            column = np.ma.masked_array(column, mask=mask)
+        arrays[field] = column
+    return arrays
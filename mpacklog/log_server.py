@@ -10,20 +10,25 @@ import asyncio
 import logging
 import socket
 
-import aiofiles
 import msgpack
 from loop_rate_limiters import AsyncRateLimiter
 
+from mpacklog.compression import get_log_unpacker
+from mpacklog.follow import FileFollower
+from mpacklog.key_table import get_key_table
 from mpacklog.serialize import serialize
 from mpacklog.utils import find_log_file
 
+STOP_CHECK_PERIOD = 0.1  # seconds between two checks for a server stop
+
 
 class LogServer:
     """Server to stream from MessagePack dictionary logs.
 
     Attributes:
         last_log: Last logged dictionary.
-        log_path: Path to a log file, or a directory containing log files.
+        log_path: Path to a log file, to the base path of a rotated log, or
+            to a directory containing log files.
         port: Port number to listen to.
     """
 
@@ -41,10 +46,11 @@ class LogServer:
         """Prepare a new server.
 
         Args:
-            log_path: Path to a log file, or a directory containing log files.
+            log_path: Path to a log file, to the base path of a rotated log,
+                or to a directory containing log files.
             port: Port number to listen to.
-            frequency: Rate limiting frequency in Hz for the two internal
-                (unpack and serve) loops.
+            frequency: Rate limiting frequency in Hz for the serve loop. The
+                unpack loop waits for updates of the log file instead.
             read_from_beginning: If True, read the whole log file from its
                 beginning. Otherwise (default), start reading from end of file.
         """
@@ -77,30 +83,39 @@ class LogServer:
         sock.close()
 
     async def unpack(self):
-        """Unpack latest data from log file."""
+        """Unpack latest data from log file.
+
+        When the log file is truncated or replaced, or when a newer log file
+        appears in the log path, for instance when the logger rotates to the
+        next file of a rotated log, the server switches to it once it has read
+        the current file to its end.
+        """
         log_file = find_log_file(self.log_path)
-        rate = AsyncRateLimiter(
-            frequency=self.__frequency,
-            name="unpack",
-            warn=False,
-        )
-        async with aiofiles.open(log_file, "rb") as file:
-            await file.seek(0, 0 if self.__read_from_beginning else 2)
-            unpacker = msgpack.Unpacker(raw=False)
+        with open(log_file, "rb") as sync_file:
+            offset = sync_file.seek(0, 0 if self.__read_from_beginning else 2)
+            table = get_key_table(sync_file, offset)
+            sync_file.seek(0)
+            header = sync_file.read(8)
+        unpacker = get_log_unpacker(header, table)
+        # Bytes of a file whose format is not known yet, which can only be
+        # its beginning as there is no complete message before them
+        pending = header[:offset] if unpacker is None else b""
+        with FileFollower(log_file, offset, self.log_path) as follower:
             while self.__keep_going:
-                data = await file.read(4096)
-                if not data:  # end of file
-                    await rate.sleep()
-                    continue
+                data = await follower.read_async(timeout=STOP_CHECK_PERIOD)
+                if follower.reopened:  # new file, start over
+                    unpacker, pending = None, b""
+                if unpacker is None:  # detect format from the file header
+                    pending += data
+                    unpacker = get_log_unpacker(pending)
+                    if unpacker is None:
+                        continue
+                    data, pending = pending, b""
                 unpacker.feed(data)
-                try:
-                    for unpacked in unpacker:
-                        if not isinstance(unpacked, dict):
-                            raise ValueError(f"{unpacked=} not a dictionary")
-                        self.last_log = unpacked
-                except BrokenPipeError:  # handle e.g. piping to `head`
-                    break
-                await rate.sleep()
+                for unpacked in unpacker:
+                    if not isinstance(unpacked, dict):
+                        raise ValueError(f"{unpacked=} not a dictionary")
+                    self.last_log = unpacked
 
     async def serve(self, client, address) -> None:
         """Server a client connection.
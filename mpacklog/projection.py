@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Unpack selected fields of dictionaries from a MessagePack stream."""
+
+from typing import Any, List, Optional
+
+import msgpack
+
+from .cli.fields import build_field_tree
+from .ext_types import KEY_TABLE_EXT_CODE, ext_hook
+from .key_table import KEY_RECORD, KeyTable
+
+MISSING = object()
+
+
+def remove_field(dictionary: dict, keys: List[str]) -> None:
+    """Remove a field from a nested dictionary, along with emptied parents.
+
+    Args:
+        dictionary: Nested dictionary.
+        keys: Keys of the field to remove.
+    """
+    child = dictionary.get(keys[0])
+    if len(keys) > 1 and isinstance(child, dict):
+        remove_field(child, keys[1:])
+        if child:
+            return
+    dictionary.pop(keys[0], None)
+
+
+class ProjectedUnpacker:
+    """Unpack selected fields of dictionaries from a MessagePack stream.
+
+    The projected unpacker walks the stream and only builds objects for
+    selected fields, skipping over the bytes of other values. It has the same
+    streaming interface as ``msgpack.Unpacker``.
+
+    Lists along the path to a selected field, for instance with the field
+    "action/0", are unpacked entirely. Dictionaries along the path to a
+    selected field are left out when none of their selected fields is found.
+
+    In log files with interned keys, key ids read along the way are only
+    looked up in the key table, while dictionaries of selected fields are
+    unpacked with their keys expanded.
+    """
+
+    def __init__(self, fields: List[str], table: Optional[KeyTable] = None):
+        """Initialize unpacker.
+
+        Args:
+            fields: Fields to unpack, i.e. nested keys in "key1/.../keyN"
+                format.
+            table: Key table in effect at the beginning of the stream, if it
+                has interned keys.
+        """
+        self.__scanner = msgpack.Unpacker(strict_map_key=False)
+        self.__table = table
+        self.__tree = build_field_tree(fields)
+        if table is None:
+            self.__unpacker = msgpack.Unpacker(raw=False, ext_hook=ext_hook)
+        else:  # interned keys
+            self.__unpacker = msgpack.Unpacker(
+                raw=False,
+                ext_hook=self.__ext_hook,
+                object_pairs_hook=table.expand_keys,
+                strict_map_key=False,
+            )
+
+    def __ext_hook(self, code: int, data: bytes) -> Any:
+        """Apply key table records and unpack other extension types.
+
+        Args:
+            code: Extension code.
+            data: Payload of the extension type.
+
+        Returns:
+            Unpacked object, or :data:`mpacklog.key_table.KEY_RECORD` for key
+            table records.
+        """
+        if code == KEY_TABLE_EXT_CODE and self.__table is not None:
+            self.__table.update(data)
+            return KEY_RECORD
+        return ext_hook(code, data)
+
+    def __iter__(self):
+        """Iterate over projected dictionaries available in the stream."""
+        return self
+
+    def __next__(self) -> Any:
+        """Unpack the next projected dictionary.
+
+        Returns:
+            Next projected dictionary.
+
+        Raises:
+            StopIteration: If there is no complete message left in the
+                buffer.
+        """
+        try:
+            return self.unpack()
+        except msgpack.OutOfData:
+            raise StopIteration
+
+    def feed(self, data) -> None:
+        """Feed bytes to the unpacker.
+
+        Args:
+            data: Bytes or buffer to append to the stream.
+        """
+        self.__scanner.feed(data)
+        self.__unpacker.feed(data)
+
+    def skip(self) -> None:
+        """Skip the next message.
+
+        Raises:
+            OutOfData: If there is no complete message left in the buffer.
+        """
+        if self.__table is not None:  # key table records need to be applied
+            self.unpack()
+            return
+        self.__scanner.skip()
+        self.__unpacker.skip()
+
+    def unpack(self) -> Any:
+        """Unpack the selected fields of the next message.
+
+        Returns:
+            Projected dictionary, empty if none of the selected fields is
+            found in the message.
+
+        Raises:
+            OutOfData: If there is no complete message left in the buffer.
+        """
+        while True:
+            self.__scanner.skip()  # the message is then complete in buffer
+            value = self.__unpack_tree(self.__tree)
+            if value is not KEY_RECORD:
+                return {} if value is MISSING else value
+
+    def __unpack_tree(self, tree: dict) -> Any:
+        """Unpack the selected fields of the next object.
+
+        Args:
+            tree: Tree of fields to unpack.
+
+        Returns:
+            Projected dictionary, list if the next object is a list,
+            :data:`mpacklog.key_table.KEY_RECORD` if it is a key table record,
+            or :data:`MISSING` if none of the selected fields was found.
+        """
+        unpacker = self.__unpacker
+        try:
+            nb_items = unpacker.read_map_header()
+        except ValueError:  # not a dictionary
+            value = unpacker.unpack()
+            if isinstance(value, list) or value is KEY_RECORD:
+                return value
+            return MISSING
+        keys = self.__table.keys if self.__table is not None else None
+        output = {}
+        for _ in range(nb_items):
+            key = unpacker.unpack()
+            if keys is not None and type(key) is int:
+                key = keys[key]
+            if key not in tree:
+                unpacker.skip()
+                continue
+            subtree = tree[key]
+            if subtree is None:
+                output[key] = unpacker.unpack()
+                continue
+            value = self.__unpack_tree(subtree)
+            if value is not MISSING:
+                output[key] = value
+        return output if output else MISSING
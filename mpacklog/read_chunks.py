@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Read log files by chunks, from regular reads or a memory map."""
+
+import mmap
+import os
+from typing import BinaryIO, Generator, Union
+
+
+def read_chunks(
+    file: BinaryIO, chunk_size: int = 100_000, use_mmap: bool = False
+) -> Generator[Union[bytes, memoryview], None, None]:
+    """Read a file by chunks from its current position to its end.
+
+    With a memory map, chunks are views on the mapped file, so that feeding
+    them to an unpacker copies them once from the page cache rather than
+    twice through an intermediate bytes object. Pages are advised for
+    sequential access and released once read, so that the resident memory of
+    the reader stays bounded on large files.
+
+    Args:
+        file: File opened in binary mode.
+        chunk_size: Number of bytes per chunk.
+        use_mmap: If set, map the file in memory rather than reading it.
+
+    Returns:
+        Generator to each chunk of the file, in sequence. Memory-mapped chunks
+        are only valid until the next chunk is requested.
+    """
+    if not use_mmap:
+        while True:
+            data = file.read(chunk_size)
+            if not data:  # end of file
+                break
+            yield data
+        return
+
+    offset = file.tell()
+    file_size = os.fstat(file.fileno()).st_size
+    if offset >= file_size:  # empty files cannot be mapped
+        return
+    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        released = 0
+        view = memoryview(mapped)
+        try:
+            while offset < file_size:
+                end = min(offset + chunk_size, file_size)
+                chunk = view[offset:end]
+                try:
+                    yield chunk
+                finally:
+                    chunk.release()
+                offset = end
+                released = release_pages(mapped, released, offset)
+        finally:
+            view.release()
+    finally:
+        mapped.close()
+        file.seek(offset)
+
+
+def release_pages(mapped: mmap.mmap, start: int, end: int) -> int:
+    """Release memory-mapped pages that have been read.
+
+    Args:
+        mapped: Memory map of the file, mapped read-only.
+        start: Byte offset up to which pages have already been released.
+        end: Byte offset up to which the file has been read.
+
+    Returns:
+        Byte offset up to which pages are now released.
+    """
+    if not hasattr(mapped, "madvise") or not hasattr(mmap, "MADV_DONTNEED"):
+        return start
+    end -= end % mmap.PAGESIZE
+    if end - start < 64 * mmap.PAGESIZE:
+        return start
+    mapped.madvise(mmap.MADV_DONTNEED, start, end - start)
+    return end
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Rotation of log files after a size or duration threshold.
+
+A rotated log is a set of log files named after a base path, with a
+sequence number inserted before the extension: the base path "robot.mpack"
+yields "robot.00000.mpack", "robot.00001.mpack", etc. Sequence numbers
+always have five digits, so that other numeric suffixes such as dates in
+"run.20260101.mpack" are not mistaken for them. Each file of the set is
+a complete log file on its own, with its own sidecar index if any, so that
+it can be decoded independently of the others. Concatenating the messages of
+all files in sequence yields the whole log.
+"""
+
+import glob
+import os
+import re
+import time
+from typing import List, Optional
+
+MAX_ROTATED_NUMBER = 99999
+
+ROTATED_NUMBER_PATTERN = re.compile(r"\d{5}")
+
+
+def get_rotated_path(path: str, number: int) -> str:
+    """Get the path to a file of a rotated log.
+
+    Args:
+        path: Base path of the rotated log.
+        number: Sequence number of the file.
+
+    Returns:
+        Path to the file.
+
+    Raises:
+        ValueError: If the sequence number does not fit in five digits.
+    """
+    if not 0 <= number <= MAX_ROTATED_NUMBER:
+        raise ValueError(
+            f"Rotated file number {number} is not between 0 and "
+            f"{MAX_ROTATED_NUMBER}"
+        )
+    root, ext = os.path.splitext(path)
+    return f"{root}.{number:05d}{ext}"
+
+
+def get_base_path(path: str) -> Optional[str]:
+    """Get the base path of a rotated log from the path to one of its files.
+
+    Args:
+        path: Path to a log file.
+
+    Returns:
+        Base path of the rotated log, or None if the file is not part of a
+        rotated log.
+    """
+    root, ext = os.path.splitext(path)
+    base_root, _, number = root.rpartition(".")
+    if not base_root or not ROTATED_NUMBER_PATTERN.fullmatch(number):
+        return None
+    return f"{base_root}{ext}"
+
+
+def get_next_rotated_file(path: str) -> Optional[str]:
+    """Get the next file of the rotated log a log file is part of.
+
+    Args:
+        path: Path to a file of a rotated log.
+
+    Returns:
+        Path to the file with the lowest sequence number greater than that of
+        the log file, or None if there is none or if the log file is not part
+        of a rotated log.
+    """
+    base_path = get_base_path(path)
+    if base_path is None:
+        return None
+    files = list_rotated_files(base_path)
+    numbers = [get_rotated_number(file_path) for file_path in files]
+    number = get_rotated_number(path)
+    for file_path, file_number in zip(files, numbers):
+        if file_number > number:
+            return file_path
+    return None
+
+
+def get_rotated_number(path: str) -> int:
+    """Get the sequence number of a file of a rotated log.
+
+    Args:
+        path: Path to a file of a rotated log.
+
+    Returns:
+        Sequence number of the file.
+    """
+    root, _ = os.path.splitext(path)
+    return int(root.rpartition(".")[2])
+
+
+def list_rotated_files(path: str) -> List[str]:
+    """List the files of a rotated log, in sequence.
+
+    Args:
+        path: Base path of the rotated log.
+
+    Returns:
+        Paths to the files of the rotated log, sorted by sequence number.
+    """
+    root, ext = os.path.splitext(path)
+    numbered = []
+    for file_path in glob.glob(f"{glob.escape(root)}.*{glob.escape(ext)}"):
+        number = file_path[len(root) + 1 : len(file_path) - len(ext)]
+        if ROTATED_NUMBER_PATTERN.fullmatch(number):
+            numbered.append((int(number), file_path))
+    return [file_path for _, file_path in sorted(numbered)]
+
+
+class Rotation:
+    """Decide when a logger rotates to the next file of a rotated log.
+
+    Attributes:
+        max_bytes: If set, rotate once a file has this many bytes.
+        max_duration: If set, rotate once a file has been written to for
+            this duration in seconds.
+        number: Sequence number of the current file.
+        path: Base path of the rotated log.
+    """
+
+    max_bytes: Optional[int]
+    max_duration: Optional[float]
+    number: int
+    path: str
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: Optional[int] = None,
+        max_duration: Optional[float] = None,
+    ):
+        """Initialize rotation, starting from the first file.
+
+        Args:
+            path: Base path of the rotated log.
+            max_bytes: If set, rotate once a file has this many bytes.
+            max_duration: If set, rotate once a file has been written to for
+                this duration in seconds.
+
+        Raises:
+            FileExistsError: If files of the rotated log already exist.
+        """
+        existing = list_rotated_files(path)
+        if existing:
+            raise FileExistsError(f"Files {existing} already exist!")
+        self.__nb_bytes = 0
+        self.__start_time: Optional[float] = None
+        self.max_bytes = max_bytes
+        self.max_duration = max_duration
+        self.number = 0
+        self.path = path
+
+    @property
+    def current_path(self) -> str:
+        """Path to the current file of the rotated log."""
+        return get_rotated_path(self.path, self.number)
+
+    def add(self, nb_bytes: int) -> None:
+        """Account for bytes written to the current file.
+
+        Args:
+            nb_bytes: Number of bytes written.
+        """
+        if self.__start_time is None:
+            self.__start_time = time.monotonic()
+        self.__nb_bytes += nb_bytes
+
+    def is_due(self) -> bool:
+        """Check whether the logger should rotate before its next write.
+
+        Returns:
+            True if the current file has reached a rotation threshold.
+        """
+        if self.__start_time is None:  # nothing written to the current file
+            return False
+        if self.max_bytes is not None and self.__nb_bytes >= self.max_bytes:
+            return True
+        return (
+            self.max_duration is not None
+            and time.monotonic() - self.__start_time >= self.max_duration
+        )
+
+    def reset(self) -> None:
+        """Start over the current file, for instance if it is truncated."""
+        self.__nb_bytes = 0
+        self.__start_time = None
+
+    def next(self) -> str:
+        """Move on to the next file of the rotated log.
+
+        Returns:
+            Path to the next file.
+        """
+        self.reset()
+        self.number += 1
+        return self.current_path
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Packers compiled for messages with a fixed structure."""
+
+import dataclasses
+import operator
+import struct
+from typing import Any, Callable, Dict, List, Tuple
+
+import msgpack
+
+from .ext_types import np  # None if NumPy is not installed
+from .serialize import serialize
+
+FLOAT_PREFIX = b"\xcb"  # MessagePack float 64 header
+
+
+class Schema:
+    """Packer compiled for messages with the same structure as a sample.
+
+    A schema is built from a sample message, either a dictionary or a
+    dataclass instance, possibly nested. It compiles a packing function for
+    the parts of the message that hold float NumPy arrays: map headers and
+    keys along the way are precomputed bytes, and arrays are written into
+    template buffers that already hold their list and float headers, rather
+    than being converted to lists and packed value by value. Other values
+    are packed by a regular MessagePack packer, which is already as fast as
+    Python gets for scalars, so that messages without float arrays are
+    packed by the regular packer directly.
+
+    Packed bytes are identical to those of a regular packer, so that log files
+    are read back as usual. Messages that do not fit the schema, for instance
+    with missing keys or values of another type or shape, are packed by the
+    regular packer. Dictionaries are packed with their keys in the order of
+    the sample: a message built with its keys in another order is packed into
+    different bytes, but unpacks to the same dictionary. Dataclass instances
+    are packed as dictionaries of their fields.
+
+    A schema can be passed to loggers to replace their packer.
+
+    Attributes:
+        pack: Compiled function packing a message into bytes.
+    """
+
+    pack: Callable[[Any], bytes]
+
+    def __init__(self, sample: Any, default: Callable = serialize):
+        """Compile packer.
+
+        Args:
+            sample: Sample message, either a dictionary or a dataclass
+                instance, possibly nested.
+            default: Function to convert objects that MessagePack cannot pack
+                natively, as in ``msgpack.Packer``.
+        """
+        self.pack = compile_packer(sample, default)
+
+
+def pack_dataclasses(obj: Any, default: Callable) -> Any:
+    """Convert dataclass instances into dictionaries for a regular packer.
+
+    Args:
+        obj: Object to convert.
+        default: Conversion of other objects.
+
+    Returns:
+        Converted object.
+    """
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {
+            field.name: getattr(obj, field.name)
+            for field in dataclasses.fields(obj)
+        }
+    return default(obj)
+
+
+def get_items(sample: Any) -> List[Tuple[str, Any]]:
+    """Get the key-value pairs of a dictionary or dataclass instance.
+
+    Args:
+        sample: Dictionary or dataclass instance.
+
+    Returns:
+        List of key-value pairs, or an empty list if the sample is neither.
+    """
+    if isinstance(sample, dict):
+        if all(isinstance(key, str) for key in sample):
+            return list(sample.items())
+    elif dataclasses.is_dataclass(sample) and not isinstance(sample, type):
+        return [
+            (field.name, getattr(sample, field.name))
+            for field in dataclasses.fields(sample)
+        ]
+    return []
+
+
+def pack_float_array_template(shape: Tuple[int, ...]) -> Any:
+    """Build a buffer laid out as a packed array of floats of a given shape.
+
+    The buffer holds the MessagePack array headers and float headers of
+    nested lists of floats, so that writing the values of an array into it
+    yields the same bytes as packing the nested lists of the array.
+
+    Args:
+        shape: Shape of the array.
+
+    Returns:
+        Pair of the buffer, a zero-dimensional structured NumPy array, and the
+        view of its float values with the shape of the array.
+    """
+    header_packer = msgpack.Packer()
+
+    def get_dtype(sub_shape: Tuple[int, ...]):
+        if not sub_shape:
+            return np.dtype([("prefix", "u1"), ("value", ">f8")])
+        header = header_packer.pack_array_header(sub_shape[0])
+        return np.dtype(
+            [
+                ("header", "u1", (len(header),)),
+                ("items", get_dtype(sub_shape[1:]), (sub_shape[0],)),
+            ]
+        )
+
+    buffer = np.zeros((), dtype=get_dtype(shape))
+    view = buffer
+    for dim in range(len(shape)):
+        header = header_packer.pack_array_header(shape[dim])
+        view["header"] = np.frombuffer(header, dtype="u1")
+        view = view["items"]
+    view["prefix"] = FLOAT_PREFIX[0]
+    return buffer, view["value"]
+
+
+def compile_float_array(shape: Tuple[int, ...], pack_value: Callable):
+    """Compile the packing function of float arrays of a given shape.
+
+    Args:
+        shape: Shape of the array.
+        pack_value: Regular packing function for other values.
+
+    Returns:
+        Function packing an array into the same bytes as its nested lists.
+    """
+    buffer, values = pack_float_array_template(shape)
+
+    def pack_array(array) -> bytes:
+        if (
+            type(array) is not np.ndarray
+            or array.shape != shape
+            or array.dtype.kind != "f"
+        ):
+            return pack_value(array)
+        values[...] = array
+        return buffer.tobytes()
+
+    return pack_array
+
+
+def is_float_array(value: Any, default: Callable) -> bool:
+    """Check whether a value is a float array packed as nested lists.
+
+    Args:
+        value: Value to check.
+        default: Function converting objects that MessagePack cannot pack.
+
+    Returns:
+        True if the value is a float NumPy array that ``default`` converts to
+        a list.
+    """
+    return (
+        np is not None
+        and type(value) is np.ndarray
+        and value.ndim > 0
+        and value.dtype.kind == "f"
+        and isinstance(default(value), list)
+    )
+
+
+def has_float_array(value: Any, default: Callable) -> bool:
+    """Check whether a value holds float arrays packed as nested lists.
+
+    Args:
+        value: Value to check.
+        default: Function converting objects that MessagePack cannot pack.
+
+    Returns:
+        True if the value is, or has in its items, a float array.
+    """
+    if is_float_array(value, default):
+        return True
+    return any(
+        has_float_array(child, default) for _, child in get_items(value)
+    )
+
+
+def has_dataclass(value: Any) -> bool:
+    """Check whether a value is or holds a dataclass instance.
+
+    Args:
+        value: Value to check.
+
+    Returns:
+        True if the value is, or has in its items, a dataclass instance.
+    """
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return True
+    return any(has_dataclass(child) for _, child in get_items(value))
+
+
+def compile_packer(
+    sample: Any, default: Callable = serialize
+) -> Callable[[Any], bytes]:
+    """Compile the packing function of messages shaped like a sample.
+
+    Args:
+        sample: Sample message, either a dictionary or a dataclass instance.
+        default: Function to convert objects that MessagePack cannot pack
+            natively.
+
+    Returns:
+        Packing function.
+    """
+    if has_dataclass(sample):  # dataclass instances are packed as dicts
+        packer = msgpack.Packer(
+            default=lambda obj: pack_dataclasses(obj, default),
+            use_bin_type=True,
+        )
+    else:  # same packer as loggers
+        packer = msgpack.Packer(default=default, use_bin_type=True)
+    if not has_float_array(sample, default):
+        return packer.pack  # the regular packer is as fast as it gets
+
+    namespace: Dict[str, Any] = {"join": b"".join}
+    lookups: List[str] = []  # statements reading values from messages
+    guards: List[str] = []  # conditions for messages to fit the schema
+    parts: List[str] = []  # expressions of packed parts
+    struct_format: List[str] = []
+    struct_args: List[str] = []
+    constant = bytearray()
+
+    def add_global(prefix: str, value: Any) -> str:
+        name = f"{prefix}{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    def add_type_guard(var: str, value: Any) -> None:
+        guards.append(f"type({var}) is {add_global('t', type(value))}")
+
+    def flush_constant() -> None:
+        if constant:
+            struct_format.append(f"{len(constant)}s")
+            struct_args.append(add_global("c", bytes(constant)))
+            constant.clear()
+
+    def flush_struct() -> None:
+        flush_constant()
+        if struct_args:
+            pack = struct.Struct(">" + "".join(struct_format)).pack
+            parts.append(f"{add_global('s', pack)}({', '.join(struct_args)})")
+            struct_format.clear()
+            struct_args.clear()
+
+    def compile_value(value: Any, var: str) -> None:
+        if is_float_array(value, default):
+            flush_struct()
+            pack_array = compile_float_array(value.shape, packer.pack)
+            parts.append(f"{add_global('a', pack_array)}({var})")
+        elif has_float_array(value, default):  # dictionary or dataclass
+            items = get_items(value)
+            add_type_guard(var, value)
+            keys = [key for key, _ in items]
+            if isinstance(value, dict):
+                guards.append(f"len({var}) == {len(items)}")
+                getter = add_global("g", operator.itemgetter(*keys))
+            else:  # dataclass instance
+                getter = add_global("g", operator.attrgetter(*keys))
+            child_vars = [f"{var}_{i}" for i in range(len(items))]
+            if len(items) > 1:
+                lookups.append(f"{', '.join(child_vars)} = {getter}({var})")
+            else:  # getters return a single value rather than a tuple
+                lookups.append(f"{child_vars[0]} = {getter}({var})")
+            constant.extend(packer.pack_map_header(len(items)))
+            for (key, child), child_var in zip(items, child_vars):
+                constant.extend(packer.pack(key))
+                compile_value(child, child_var)
+        elif type(value) is float:
+            add_type_guard(var, value)
+            constant.extend(FLOAT_PREFIX)
+            flush_constant()
+            struct_format.append("d")
+            struct_args.append(var)
+        elif type(value) is bool:
+            add_type_guard(var, value)
+            flush_constant()
+            struct_format.append("B")
+            struct_args.append(f"(0xC3 if {var} else 0xC2)")
+        else:  # packed by the regular packer
+            flush_struct()
+            parts.append(f"pack_value({var})")
+
+    compile_value(sample, "message")
+    flush_struct()
+    namespace["fallback"] = packer.pack
+    namespace["pack_value"] = packer.pack
+    result = parts[0] if len(parts) == 1 else f"join(({', '.join(parts)},))"
+    condition = " and ".join(guards) or "True"
+    errors = "AttributeError, IndexError, KeyError, TypeError"
+    source = "\n".join(
+        [  # globals are bound to closure variables, which are faster to load
+            f"def make_pack({', '.join(namespace)}):",
+            "    def pack(message):",
+            "        try:",
+            *(f"            {lookup}" for lookup in lookups or ["pass"]),
+            f"        except ({errors}):",
+            "            return fallback(message)",
+            f"        if not ({condition}):",
+            "            return fallback(message)",
+            f"        return {result}",
+            "    return pack",
+        ]
+    )
+    exec(source, namespace)  # noqa: S102, source is generated above
+    return namespace["make_pack"](
+        **{
+            name: value
+            for name, value in namespace.items()
+            if name != "__builtins__" and name != "make_pack"
+        }
+    )
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Find message boundaries and timestamps in log files.
+
+Log files are plain sequences of MessagePack dictionaries, without framing.
+Looking at the bytes around an arbitrary offset is not enough to tell a
+message boundary apart: a nested dictionary that ends a message, followed by
+the next messages, unpacks like a sequence of messages. Message boundaries
+are therefore found by skipping whole messages, without unpacking them, from
+a known boundary such as the beginning of the file or an index entry. In
+compressed log files, message boundaries are the boundaries of blocks.
+"""
+
+import os
+from typing import Any, BinaryIO, List, Optional, Tuple
+
+import msgpack
+
+from .compression import decompress_block, find_block, is_compressed
+from .ext_types import ext_hook
+from .index import Index, get_time
+from .key_table import KeyTableUnpacker, get_key_table
+
+
+def find_boundary(
+    file: BinaryIO,
+    offset: int,
+    end: Optional[int] = None,
+    window: int = 65536,
+    start: int = 0,
+) -> Optional[int]:
+    """Find the first message boundary at or after a given byte offset.
+
+    Messages are skipped from a known boundary up to the offset. Skipping
+    does not unpack messages, so it runs about ten times faster than
+    decoding, but its cost still grows with the distance between the known
+    boundary and the offset.
+
+    Args:
+        file: Log file opened in binary mode.
+        offset: Byte offset to search from.
+        end: Optional byte offset to stop searching at. Defaults to the end of
+            the file.
+        window: Number of bytes to read at once.
+        start: Byte offset of a known message boundary at or before
+            ``offset``, for instance from the log index. Defaults to the
+            beginning of the file.
+
+    Returns:
+        Byte offset of the first message boundary found, or None if there is
+        none before ``end``.
+    """
+    if is_compressed(file):
+        return find_block(file, offset, end, window)
+    file_size = os.fstat(file.fileno()).st_size
+    end = file_size if end is None else min(end, file_size)
+    file.seek(start)
+    unpacker = msgpack.Unpacker(file, read_size=window)
+    position = start
+    while position < offset:
+        try:
+            unpacker.skip()
+        except (msgpack.OutOfData, StopIteration):  # incomplete last message
+            return None
+        position = start + unpacker.tell()
+    return position if position < end else None
+
+
+def read_time_at(
+    file: BinaryIO, offset: int, time_field: str
+) -> Tuple[Optional[float], int]:
+    """Read the timestamp of the first timed message from a boundary.
+
+    Args:
+        file: Log file opened in binary mode.
+        offset: Byte offset of a message boundary.
+        time_field: Timestamp field of messages.
+
+    Returns:
+        Timestamp of the first message with a timestamp at or after the
+        boundary, or None if there is none, along with the byte offset of
+        this message, or in compressed log files of its block.
+    """
+    if is_compressed(file):
+        return read_block_time_at(file, offset, time_field)
+    table = get_key_table(file, offset)
+    file.seek(offset)
+    if table is not None:
+        unpacker = KeyTableUnpacker(table, file_like=file)
+    else:  # regular log file
+        unpacker = msgpack.Unpacker(file, raw=False)
+    while True:
+        position = offset + unpacker.tell()
+        try:
+            message = unpacker.unpack()
+        except (msgpack.OutOfData, StopIteration):
+            return None, position
+        time = get_time(message, time_field)
+        if time is not None:
+            return time, position
+
+
+def read_block_time_at(
+    file: BinaryIO, offset: int, time_field: str
+) -> Tuple[Optional[float], int]:
+    """Read the timestamp of the first timed message from a block boundary.
+
+    Args:
+        file: Compressed log file opened in binary mode.
+        offset: Byte offset of a block boundary.
+        time_field: Timestamp field of messages.
+
+    Returns:
+        Timestamp of the first message with a timestamp at or after the
+        boundary, or None if there is none, along with the byte offset of
+        the block of this message.
+    """
+    file.seek(offset)
+    blocks = msgpack.Unpacker(file, raw=False)
+    position = offset
+    while True:
+        try:
+            block = blocks.unpack()
+        except (msgpack.OutOfData, StopIteration):
+            return None, position
+        unpacker = msgpack.Unpacker(raw=False, ext_hook=ext_hook)
+        unpacker.feed(decompress_block(block.data))
+        for message in unpacker:
+            time = get_time(message, time_field)
+            if time is not None:
+                return time, position
+        position = offset + blocks.tell()
+
+
+def read_messages_at(file: BinaryIO, offset: int) -> List[Any]:
+    """Read the message, or block of messages, at a message boundary.
+
+    Args:
+        file: Log file opened in binary mode.
+        offset: Byte offset of a message boundary.
+
+    Returns:
+        Message at the boundary, or in compressed log files all messages of
+        the block at the boundary. The list is empty at the end of the file.
+    """
+    file.seek(offset)
+    if is_compressed(file):
+        try:
+            block = msgpack.Unpacker(file, raw=False).unpack()
+        except (msgpack.OutOfData, StopIteration):
+            return []
+        unpacker = msgpack.Unpacker(raw=False, ext_hook=ext_hook)
+        unpacker.feed(decompress_block(block.data))
+        return list(unpacker)
+    table = get_key_table(file, offset)
+    file.seek(offset)
+    if table is not None:
+        unpacker = KeyTableUnpacker(table, file_like=file)
+    else:  # regular log file
+        unpacker = msgpack.Unpacker(file, raw=False, ext_hook=ext_hook)
+    try:
+        return [unpacker.unpack()]
+    except (msgpack.OutOfData, StopIteration):
+        return []
+
+
+def find_time_offset(
+    file: BinaryIO,
+    time: float,
+    time_field: str = "time",
+    index: Optional[Index] = None,
+    window: int = 65536,
+) -> int:
+    """Find a message boundary before the first message at a given time.
+
+    Timestamps are assumed to be non-decreasing along the log. If the log
+    file has an index with the same timestamp field, it is used to look up
+    the offset directly. Otherwise, the file is bisected, skipping messages
+    from the last boundary known to be before the desired time.
+
+    Args:
+        file: Log file opened in binary mode.
+        time: Timestamp to look for.
+        time_field: Timestamp field of messages.
+        index: Index of the log file, if any.
+        window: Bisection stops when the search range is smaller than this
+            number of bytes.
+
+    Returns:
+        Byte offset of a message boundary such that all messages before it
+        have timestamps strictly lower than ``time``.
+    """
+    if index is not None and index.time_field == time_field:
+        return index.lookup_time(time)[1]
+    low = 0  # always a message boundary before the desired time
+    high = os.fstat(file.fileno()).st_size
+    while high - low > window:
+        middle = (low + high) // 2
+        boundary = find_boundary(file, middle, high, start=low)
+        if boundary is None:
+            high = middle
+            continue
+        boundary_time, position = read_time_at(file, boundary, time_field)
+        if boundary_time is not None and boundary_time < time:
+            low = position
+        else:
+            high = middle
+    return low
@@ -6,10 +6,85 @@
 
 """Serialization function."""
 
+from typing import Any, Callable, Dict
+
+Encoder = Callable[[Any], Any]
+
+ENCODERS: Dict[type, Encoder] = {}  # encoders cached by object type
+
+REGISTERED_ENCODERS: Dict[type, Encoder] = {}  # encoders set by the user
+
+
+def encode_tolist(obj):
+    """Encode an object with a ``tolist`` method, e.g. a NumPy array."""
+    return obj.tolist()
+
+
+def encode_np(obj):
+    """Encode an object with an ``np`` attribute, e.g. a Pinocchio SE3."""
+    return obj.np.tolist()
+
+
+def encode_serialize(obj):
+    """Encode an object with its own ``serialize`` method."""
+    return obj.serialize()
+
+
+def encode_as_is(obj):
+    """Leave an object as is, e.g. if it is natively packable."""
+    return obj
+
+
+def register_encoder(cls: type, encoder: Encoder) -> None:
+    """Register a custom encoder for a type of objects.
+
+    The encoder is used for objects of this type and of its subclasses, with
+    precedence over the default conversions of :func:`serialize`. For
+    instance:
+
+    .. code:: python
+
+        register_encoder(pin.SE3, lambda transform: transform.np.tolist())
+        register_encoder(MyDataclass, dataclasses.asdict)
+
+    Args:
+        cls: Type of objects to encode.
+        encoder: Function converting an object of this type into something
+            that MessagePack can pack.
+    """
+    REGISTERED_ENCODERS[cls] = encoder
+    ENCODERS.clear()  # cached encoders may now be resolved differently
+
+
+def find_encoder(obj) -> Encoder:
+    """Find the encoder for an object, when meeting its type the first time.
+
+    Args:
+        obj: Object to serialize.
+
+    Returns:
+        Encoder for objects of the same type.
+    """
+    for cls in type(obj).__mro__:
+        if cls in REGISTERED_ENCODERS:
+            return REGISTERED_ENCODERS[cls]
+    if hasattr(obj, "tolist"):  # numpy.ndarray
+        return encode_tolist
+    if hasattr(obj, "np"):  # pinocchio.SE3
+        return encode_np
+    if hasattr(obj, "serialize"):  # more complex objects
+        return encode_serialize
+    return encode_as_is
+
 
 def serialize(obj):
     r"""Serialize an object for message packing.
 
+    The conversion is chosen the first time an object of a given type is
+    serialized, and cached for all subsequent objects of the same type.
+    Custom conversions can be set by :func:`register_encoder`. This function
+    is the default hook of the packers of all loggers and of the log server.
+
     Args:
         obj: Object to serialize.
 
@@ -30,10 +105,8 @@ def serialize(obj):
         In [3]: %timeit x.tolist()
         117 ns ± 0.865 ns per loop (mean ± std. dev. of 7 runs, 1e7 loops each)
     """
-    if hasattr(obj, "tolist"):  # numpy.ndarray
-        return obj.tolist()
-    if hasattr(obj, "np"):  # pinocchio.SE3
-        return obj.np.tolist()
-    if hasattr(obj, "serialize"):  # more complex objects
-        return obj.serialize()
-    return obj
+    try:
+        encoder = ENCODERS[type(obj)]
+    except KeyError:
+        encoder = ENCODERS[type(obj)] = find_encoder(obj)
+    return encoder(obj)
@@ -6,59 +6,397 @@
 
 """Logger with synchronous I/O."""
 
+import io
 import os
 import queue
+import threading
+from typing import Any, BinaryIO, Optional
 
 import msgpack
 
+from .compression import BlockCompressor
+from .ext_types import serialize_ndarray
+from .index import IndexWriter
+from .key_table import KeyInterningPacker
+from .rotation import Rotation
+from .schema import Schema
 from .serialize import serialize
 
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+_STOP = object()  # sentinel waking up the background writer thread
+
 
 class SyncLogger:
     """Logger with synchronous I/O.
 
     This logger exposes an API similar to AsyncLogger, but all I/O operations
-    are synchronous.
+    are synchronous. The output file is opened on the first write and kept
+    open, along with a single packer, until the logger is closed. The logger
+    can be used as a context manager, in which case pending messages are
+    written and the file is closed when exiting the context.
+
+    Optionally, a background thread started by :func:`start` can drain the
+    queue and write messages so that :func:`put` never waits for disk I/O.
+    If the thread fails to write a message, it keeps draining the queue and
+    the first exception is raised again by the next call to :func:`write`,
+    :func:`stop` or :func:`close`.
+
+    The logger can also rotate its output file after a size or duration
+    threshold, writing a rotated log as described in
+    :mod:`mpacklog.rotation`. Rotation happens between two messages, once
+    all previous messages are written and the previous file is closed.
+
+    Attributes:
+        dropped_messages: Number of messages dropped because the queue was
+            full, when the overflow policy is not "block".
+        path: Path to the output log file, which is the current file of the
+            rotated log when rotating.
+        queue: Queue of messages waiting to be written.
     """
 
+    dropped_messages: int
     path: str
     queue: queue.Queue
 
-    def __init__(self, path: str):
+    def __init__(
+        self,
+        path: str,
+        buffer_size: int = io.DEFAULT_BUFFER_SIZE,
+        maxsize: int = 0,
+        overflow: str = "block",
+        index_stride: Optional[int] = None,
+        time_field: Optional[str] = "time",
+        ndarray_ext: bool = False,
+        schema: Optional[Schema] = None,
+        intern_keys: bool = False,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        block_size: int = 1 << 20,
+        rotate_bytes: Optional[int] = None,
+        rotate_interval: Optional[float] = None,
+    ):
         """Initialize logger.
 
         Args:
             path: Path to the output log file.
+            buffer_size: Size in bytes of the output file buffer.
+            maxsize: Maximum number of messages in the queue. The default
+                value of zero means the queue is unbounded.
+            overflow: Policy when putting a message in a full queue: "block"
+                waits for a free slot, "drop_newest" discards the new message
+                and "drop_oldest" discards the oldest message in the queue.
+            index_stride: If set, record the byte offset of every this many
+                messages in the sidecar index file of the log.
+            time_field: Timestamp field recorded in index entries, if any.
+            ndarray_ext: If set, pack NumPy arrays into the compact
+                extension type of :func:`mpacklog.ext_types.pack_ndarray`
+                rather than into lists.
+            schema: If set, pack messages with this compiled packer, which is
+                faster for messages with float arrays and the same structure
+                as its sample.
+            intern_keys: If set, replace the string keys of dictionaries by
+                integer ids in the log file, as described in
+                :mod:`mpacklog.key_table`. Not compatible with ``schema``.
+            compression: If set, write messages in blocks compressed by this
+                codec, "zlib", "zstd" or "lz4", as described in
+                :mod:`mpacklog.compression`. Not compatible with
+                ``intern_keys``.
+            compression_level: Compression level, or None for the default
+                level of the codec.
+            block_size: Uncompressed size in bytes of compressed blocks.
+                Messages of the current block are only written once it is
+                complete, or when the logger is closed.
+            rotate_bytes: If set, rotate to a new output file once the
+                current one has at least this many bytes. Output files are
+                then named after ``path`` with a sequence number, see
+                :func:`mpacklog.rotation.get_rotated_path`.
+            rotate_interval: If set, rotate to a new output file once the
+                current one has been written to for this duration in seconds.
+
+        Raises:
+            ValueError: If the overflow policy is unknown, if both ``schema``
+                and ``intern_keys`` are set, or if both ``compression`` and
+                ``intern_keys`` are set.
         """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy '{overflow}', "
+                f"should be one of {OVERFLOW_POLICIES}"
+            )
+        self.__buffer_size = buffer_size
+        self.__error: Optional[BaseException] = None
+        self.__file: Optional[BinaryIO] = None
+        self.__lock = threading.Lock()
+        self.__overflow = overflow
+        default = serialize_ndarray if ndarray_ext else serialize
+        self._packer: Any
+        if intern_keys:
+            if schema is not None:
+                raise ValueError("Schemas and interned keys are exclusive")
+            self._packer = KeyInterningPacker(default)
+        else:  # regular log file
+            self._packer = schema or msgpack.Packer(
+                default=default, use_bin_type=True
+            )
+        self._compressor: Optional[BlockCompressor] = None
+        if compression is not None:
+            if intern_keys:
+                raise ValueError("Compression and interned keys are exclusive")
+            self._compressor = BlockCompressor(
+                compression, block_size, compression_level
+            )
+        self.__rotation: Optional[Rotation] = None
+        if rotate_bytes is not None or rotate_interval is not None:
+            self.__rotation = Rotation(path, rotate_bytes, rotate_interval)
+            path = self.__rotation.current_path
+        self.__thread: Optional[threading.Thread] = None
+        self._index = (
+            IndexWriter(path, index_stride, time_field)
+            if index_stride is not None
+            else None
+        )
+        self.dropped_messages = 0
         self.path = path
-        self.queue = queue.Queue()
+        self.queue = queue.Queue(maxsize=maxsize)
 
         # Check if the file already exists so that SyncLogger.write doesn't
         # append to an existing file
         if os.path.exists(self.path):
             raise FileExistsError(f"File {path} already exists!")
 
+    def __enter__(self):
+        """Enter the context of the logger.
+
+        Returns:
+            Logger itself.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Write pending messages and close the output file.
+
+        Args:
+            exc_type: Type of the exception raised in the context, if any.
+            exc_value: Exception raised in the context, if any.
+            traceback: Traceback of the exception, if any.
+        """
+        self.close()
+
+    def __get_file(self) -> BinaryIO:
+        """Get the output file, opening it on first call.
+
+        Returns:
+            Buffered output file.
+        """
+        if self.__file is None:
+            self.__file = open(self.path, "ab", buffering=self.__buffer_size)
+        return self.__file
+
+    def __write_message(self, message: dict) -> None:
+        """Write a message to the output file, rotating it first if due.
+
+        Args:
+            message: Message to write.
+        """
+        if self.__rotation is not None and self.__rotation.is_due():
+            self.__close_file()
+            self.path = self.__rotation.next()
+            self._start_file()
+        data = self._pack(message)
+        self.__get_file().write(data)
+        if self.__rotation is not None:
+            self.__rotation.add(len(data))
+
+    def __close_file(self) -> None:
+        """Write the pending compressed block, if any, and close the file."""
+        file = self.__get_file()
+        if self._compressor is not None:
+            file.write(self._compressor.flush(self._index))
+        file.close()
+        self.__file = None
+        if self._index is not None:
+            self._index.close()
+
+    def _start_file(self) -> None:
+        """Start packing a new output file, after a rotation."""
+        if isinstance(self._packer, KeyInterningPacker):
+            self._packer.reset()  # each file has its own key table
+        if self._index is not None:
+            self._index.reset(self.path)
+
+    def _pack(self, message: dict) -> bytes:
+        """Pack a message and account for it in the index, if any.
+
+        Args:
+            message: Message to pack.
+
+        Returns:
+            Bytes to write to the log file.
+        """
+        return self._add(message, self._packer.pack(message))
+
+    def _add(self, message: dict, data: bytes, keyframe: bool = True) -> bytes:
+        """Account for a packed message in the index and compressor, if any.
+
+        Args:
+            message: Message before packing.
+            data: Packed message.
+            keyframe: If False, the message cannot be indexed, nor start a
+                compressed block.
+
+        Returns:
+            Bytes to write to the log file: the packed message, or with
+            compression a completed block if there is one.
+        """
+        if self._compressor is not None:
+            return self._compressor.add(message, data, keyframe, self._index)
+        if self._index is not None:
+            self._index.add(message, len(data), keyframe)
+        return data
+
+    @property
+    def running(self) -> bool:
+        """Check whether the background writer thread is running."""
+        return self.__thread is not None
+
     def put(self, message: dict, write: bool = False):
         """Puts a message in the queue.
 
         Args:
             message: message to log
-            write: whether to append the message to the file immediately
+            write: whether to append the message to the file immediately,
+                ignored when the background writer thread is running
 
         """
-        self.queue.put(message)
+        if self.__overflow == "block":
+            self.queue.put(message)
+        elif self.__overflow == "drop_newest":
+            try:
+                self.queue.put_nowait(message)
+            except queue.Full:
+                self.dropped_messages += 1
+        else:  # self.__overflow == "drop_oldest"
+            while True:
+                try:
+                    self.queue.put_nowait(message)
+                    break
+                except queue.Full:
+                    pass
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.dropped_messages += 1
+                except queue.Empty:
+                    pass
 
-        if write:
+        if write and self.__thread is None:
             self.write()
 
-    def write(self):
+    def write(self, flush: bool = True):
         """Write all messages in the queue to the file.
 
-        This method appends to the file if it already exists.
-        """
-        with open(self.path, "ab") as file:
-            packer = msgpack.Packer(default=serialize, use_bin_type=True)
+        This method appends to the file if it already exists. When the
+        background writer thread is running, it waits until the thread has
+        written all messages currently in the queue.
 
+        Args:
+            flush: If set (default), flush the file buffer after writing so
+                that messages are visible to readers right away. Otherwise,
+                messages stay in the file buffer until it is full or until
+                :func:`flush` or :func:`close` is called.
+        """
+        if self.__thread is not None:
+            self.queue.join()
+            self.__raise_error()
+            if flush:
+                with self.__lock:
+                    self.__get_file().flush()
+            return
+        with self.__lock:
             while not self.queue.empty():
                 message = self.queue.get()
-                file.write(packer.pack(message))
+                try:
+                    self.__write_message(message)
+                finally:
+                    self.queue.task_done()
+            if flush:
+                self.__get_file().flush()
+
+    def flush(self):
+        """Write messages from the queue and flush the file buffer."""
+        self.write(flush=True)
+
+    def start(self):
+        """Start the background writer thread."""
+        if self.__thread is not None:
+            return
+        self.__thread = threading.Thread(
+            target=self.__run,
+            name=f"SyncLogger({self.path})",
+            daemon=True,
+        )
+        self.__thread.start()
+
+    def stop(self):
+        """Write pending messages, then stop the background writer thread.
+
+        Raises:
+            Exception: First exception raised by the background thread while
+                writing messages, if any.
+        """
+        thread = self.__thread
+        if thread is None:
+            return
+        while thread.is_alive():
+            try:
+                self.queue.put(_STOP, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        thread.join()
+        self.__thread = None
+        self.__raise_error()
+
+    def __raise_error(self) -> None:
+        """Raise the exception of the background thread, if any, once."""
+        error, self.__error = self.__error, None
+        if error is not None:
+            raise error
+
+    def __run(self):
+        """Drain the queue and write messages until stopped."""
+        keep_going = True
+        while keep_going:
+            message = self.queue.get()
+            with self.__lock:
+                while True:
+                    try:
+                        if message is _STOP:
+                            keep_going = False
+                        else:
+                            self.__write_message(message)
+                    except Exception as exn:
+                        if self.__error is None:
+                            self.__error = exn
+                    finally:
+                        self.queue.task_done()
+                    try:
+                        message = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                try:
+                    self.__get_file().flush()
+                except Exception as exn:
+                    if self.__error is None:
+                        self.__error = exn
+
+    def close(self):
+        """Write messages from the queue, then close output files."""
+        try:
+            self.stop()
+        finally:
+            if self.__file is not None or not self.queue.empty():
+                self.write(flush=False)
+                with self.__lock:
+                    self.__close_file()
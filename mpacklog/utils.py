@@ -9,22 +9,66 @@
 import glob
 import logging
 import os
+from typing import List, Optional
+
+from .rotation import list_rotated_files
+
+
+def list_log_files(directory: str) -> List[str]:
+    """List the log files in a directory.
+
+    Args:
+        directory: Path to the directory.
+
+    Returns:
+        Paths to the log files in the directory, in no particular order.
+    """
+    return glob.glob(os.path.join(glob.escape(directory), "*.mpack"))
+
+
+def get_newest_log_file(path: str) -> Optional[str]:
+    """Get the newest log file in a path.
+
+    Args:
+        path: Path to a directory, to the base path of a rotated log, or to a
+            specific log file.
+
+    Returns:
+        The log file itself, the last file of the rotated log, or the most
+        recently modified log file in the directory, or None if there is no
+        log file.
+    """
+    if os.path.isfile(path):
+        return path
+    rotated_files = list_rotated_files(path)
+    if rotated_files:
+        return rotated_files[-1]
+    mpack_files = list_log_files(path)
+    if not mpack_files:
+        return None
+    return max(mpack_files, key=lambda file: (os.path.getmtime(file), file))
 
 
 def find_log_file(path: str) -> str:
     """Find the most recent log file to open in a path.
 
     Args:
-        path: Path to a directory or a specific log file.
+        path: Path to a directory, to the base path of a rotated log, or to a
+            specific log file.
+
+    Returns:
+        Path to the most recent log file.
+
+    Raises:
+        FileNotFoundError: If there is no log file in the path.
     """
-    if os.path.exists(path):
-        if os.path.isfile(path):
-            return path
-    mpack_files = glob.glob(os.path.join(path, "*.mpack"))
-    log_file = max(mpack_files, key=os.path.getmtime)
-    logging.info(
-        "Opening the most recent log in %s: %s",
-        path,
-        os.path.basename(log_file),
-    )
+    log_file = get_newest_log_file(path)
+    if log_file is None:
+        raise FileNotFoundError(f"No log file found in {path}")
+    if log_file != path:
+        logging.info(
+            "Opening the most recent log in %s: %s",
+            path,
+            os.path.basename(log_file),
+        )
     return log_file
@@ -9,6 +9,8 @@ import unittest
 from io import StringIO
 from unittest.mock import patch
 
+import numpy as np
+
 from mpacklog.cli.csv_printer import CSVPrinter
 
 
@@ -87,6 +89,55 @@ class TestCSVPrinter(unittest.TestCase):
         output = mock_stdout.getvalue()
         self.assertEqual(output.strip(), "3.0,nested_result")
 
+    def test_process_ndarray_values(self):
+        """Test processing NumPy arrays and their elements."""
+        with patch("sys.stdout", new_callable=StringIO):
+            printer = CSVPrinter(["vector/1", "vector"])
+
+        data = {"time": 4.0, "vector": np.array([1.5, 2.5])}
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            printer.process(data)
+
+        output = mock_stdout.getvalue()
+        self.assertEqual(output.strip(), '4.0,2.5,"[1.5, 2.5]"')
+
+    def test_process_buffered(self):
+        """Test writing rows to the standard output once the buffer is full."""
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            printer = CSVPrinter(["value"], buffer_size=25)
+            self.assertEqual(mock_stdout.getvalue(), "")
+            printer.process({"time": 0.5, "value": None})
+            self.assertEqual(mock_stdout.getvalue(), "")
+            printer.process({"time": 1.5, "value": float("nan")})
+            self.assertEqual(
+                mock_stdout.getvalue(), "time,value\n0.5,None\n1.5,nan\n"
+            )
+            printer.process({"time": 2.5, "value": "a,b"})
+            printer.flush()
+        self.assertTrue(mock_stdout.getvalue().endswith('2.5,"a,b"\n'))
+
+    def test_process_batch(self):
+        """Test that batches are printed as their messages one by one."""
+        messages = [
+            {"time": 0.5, "flag": True, "vector": np.array([1.0, 2.0])},
+            {"time": 1.5, "flag": False, "name": "a,b"},
+            {"time": 2.5, "name": None},
+        ]
+        fields = ["flag", "vector", "name"]
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            printer = CSVPrinter(list(fields))
+            for message in messages:
+                printer.process(message)
+        with patch("sys.stdout", new_callable=StringIO) as batch_stdout:
+            printer = CSVPrinter(list(fields))
+            printer.process_batch(messages)
+            printer.process_batch([])
+        self.assertEqual(batch_stdout.getvalue(), mock_stdout.getvalue())
+        self.assertEqual(
+            batch_stdout.getvalue().split("\n")[1:],
+            ['0.5,1,"[1.0, 2.0]",0', '1.5,0,0,"a,b"', "2.5,0,0,None", ""],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -9,7 +9,7 @@ import unittest
 from io import StringIO
 from unittest.mock import patch
 
-from mpacklog.cli.field_printer import FieldPrinter
+from mpacklog.cli.field_printer import FieldPrinter, get_key_structure
 
 
 class TestFieldPrinter(unittest.TestCase):
@@ -19,7 +19,6 @@ class TestFieldPrinter(unittest.TestCase):
         """Test field printer initialization."""
         printer = FieldPrinter()
         self.assertEqual(printer.fields, set())
-        self.assertEqual(printer.observation, {})
 
     def test_process_simple_dict(self):
         """Test processing a simple dictionary."""
@@ -77,13 +76,76 @@ class TestFieldPrinter(unittest.TestCase):
         output = mock_stdout.getvalue()
         self.assertEqual(output, "")  # No output for existing fields
 
-    def test_observation_update(self):
-        """Test that observation is updated with new data."""
+    def test_nested_structure_change(self):
+        """Test listing fields that appear deep in known top-level keys."""
         printer = FieldPrinter()
-        data = {"key": "value"}
-        with patch("sys.stdout", new_callable=StringIO):
-            printer.process(data)
-        self.assertEqual(printer.observation["key"], "value")
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            printer.process({"a": {"b": 1}, "c": 2})
+            printer.process({"a": {"b": 3}, "c": 4})
+            printer.process({"a": {"b": 5, "d": 6}, "c": 7})
+            printer.process({"a": {"b": {"e": 8}, "d": 9}, "c": 10})
+        self.assertEqual(
+            mock_stdout.getvalue(),
+            "- a/b\n- c\n\n- a/d\n\n- a/b/e\n\n",
+        )
+        self.assertEqual(printer.fields, {"a/b", "a/b/e", "a/d", "c"})
+
+    def test_alternating_structures(self):
+        """Test messages of several structures interleaved in a log."""
+        printer = FieldPrinter()
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            for i in range(10):
+                printer.process({"imu": {"pitch": i}})
+                printer.process({"servo": {"position": i}})
+        self.assertEqual(
+            mock_stdout.getvalue(), "- imu/pitch\n\n- servo/position\n\n"
+        )
+
+    def test_process_batch(self):
+        """Test processing a batch of dictionaries one by one."""
+        printer = FieldPrinter()
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            printer.process_batch([{"a": 1}, {"a": 2, "b": {"c": 3}}])
+        self.assertEqual(mock_stdout.getvalue(), "- a\n\n- b/c\n\n")
+
+    def test_buffered_output(self):
+        """Test that output goes through the printer buffer."""
+        printer = FieldPrinter(buffer_size=1024)
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            printer.process_batch([{"a": 1}, {"b": 2}])
+            self.assertEqual(mock_stdout.getvalue(), "")
+            printer.flush()
+        self.assertEqual(mock_stdout.getvalue(), "- a\n\n- b\n\n")
+
+    def test_max_structures(self):
+        """Test that the set of seen key structures stays bounded."""
+        printer = FieldPrinter(max_structures=4)
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            for i in range(10):
+                printer.process({f"key{i}": i})
+                printer.process({"key0": i})
+        self.assertEqual(len(printer._FieldPrinter__structures), 4)
+        self.assertEqual(mock_stdout.getvalue().count("- key0\n"), 1)
+        self.assertEqual(len(printer.fields), 10)
+
+
+class TestKeyStructure(unittest.TestCase):
+    """Test key structures of nested dictionaries."""
+
+    def test_get_key_structure(self):
+        """Test that values are ignored but not keys and nesting."""
+        structure = get_key_structure({"a": {"b": 1, "c": [1]}, "d": 2.0})
+        self.assertEqual(structure, ("a", None, "b", "c", None, "d"))
+        self.assertEqual(
+            get_key_structure({"a": {"b": 2, "c": []}, "d": 3}), structure
+        )
+        for other in (
+            {"a": {"b": 2}, "d": 3},
+            {"a": {"b": 2, "c": {}}, "d": 3},
+            {"a": {"b": 2}, "c": 1, "d": 3},
+            {"a": 1, "d": {"b": 2}},
+        ):
+            self.assertNotEqual(get_key_structure(other), structure)
 
 
 if __name__ == "__main__":
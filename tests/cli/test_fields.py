@@ -9,8 +9,13 @@ import unittest
 from io import StringIO
 from unittest.mock import patch
 
+import numpy as np
+
 from mpacklog.cli.fields import (
+    MISSING,
     Field,
+    FieldPath,
+    FieldTree,
     filter_fields,
     get_from_field,
     get_from_keys,
@@ -51,6 +56,44 @@ class TestField(unittest.TestCase):
         self.assertEqual(field.keys, [""])
 
 
+class TestFieldPath(unittest.TestCase):
+    """Test precompiled field paths."""
+
+    def test_keys(self):
+        """Test that the path is parsed once into keys."""
+        path = FieldPath("foo/0/bar")
+        self.assertEqual(path.field, "foo/0/bar")
+        self.assertEqual(path.keys, ("foo", "0", "bar"))
+
+    def test_lookup_nested(self):
+        """Test looking up values in nested dictionaries and lists."""
+        data = {"items": [{"name": "first"}, {"name": "second"}], "0": "x"}
+        self.assertEqual(FieldPath("items/1/name").lookup(data), "second")
+        self.assertEqual(FieldPath("items/-1/name").lookup(data), "second")
+        self.assertEqual(FieldPath("0").lookup(data), "x")
+        self.assertEqual(FieldPath("items/0").lookup(data), {"name": "first"})
+
+    def test_lookup_ndarray(self):
+        """Test looking up elements of NumPy arrays."""
+        data = {"vector": np.array([1.5, 2.5]), "scalar": np.float64(1.0)}
+        self.assertEqual(FieldPath("vector/1").lookup(data), 2.5)
+        self.assertIs(FieldPath("vector/2").lookup(data), MISSING)
+        self.assertIs(FieldPath("scalar/0").lookup(data), MISSING)
+
+    def test_lookup_missing(self):
+        """Test the sentinel returned when there is no value at a path."""
+        data = {"level1": {"level2": None}, "items": [1, 2]}
+        self.assertIsNone(FieldPath("level1/level2").lookup(data))
+        for field in (
+            "nonexistent",
+            "level1/nonexistent",
+            "level1/level2/level3",
+            "items/2",
+            "items/name",
+        ):
+            self.assertIs(FieldPath(field).lookup(data), MISSING)
+
+
 class TestGetFromKeys(unittest.TestCase):
     """Test get_from_keys function."""
 
@@ -127,6 +170,13 @@ class TestGetFromField(unittest.TestCase):
         result = get_from_field(data, "nonexistent", default="default")
         self.assertEqual(result, "default")
 
+    def test_get_from_field_key_error(self):
+        """Test KeyError raised with the path to the missing key."""
+        data = {"level1": {"level2": "value"}}
+        with self.assertRaises(KeyError) as cm:
+            get_from_field(data, "level1/nonexistent")
+        self.assertIn("level1/nonexistent", str(cm.exception))
+
 
 class TestListFields(unittest.TestCase):
     """Test list_fields function."""
@@ -242,8 +292,17 @@ class TestFilterFields(unittest.TestCase):
             "simple": "keep",
         }
         result = filter_fields(data, ["level1/level2", "simple"])
-        # Due to set_from_keys behavior, nested structures are flattened
-        expected = {"level1": "target", "simple": "keep"}
+        expected = {"level1": {"level2": "target"}, "simple": "keep"}
+        self.assertEqual(result, expected)
+
+    def test_filter_field_paths(self):
+        """Test filtering fields given as precompiled field paths."""
+        data = {
+            "level1": {"level2": "target", "other": "ignore"},
+            "simple": "keep",
+        }
+        result = filter_fields(data, [FieldPath("level1/level2"), "simple"])
+        expected = {"level1": {"level2": "target"}, "simple": "keep"}
         self.assertEqual(result, expected)
 
     def test_filter_nonexistent_field(self):
@@ -258,5 +317,99 @@ class TestFilterFields(unittest.TestCase):
         self.assertIn("not found", output)
 
 
+class TestFieldTree(unittest.TestCase):
+    """Test single-pass extraction of fields with a field tree."""
+
+    def setUp(self):
+        self.data = {
+            "observation": {
+                "servo": {
+                    "left": {"position": 1.0, "velocity": 0.1},
+                    "right": {"position": 2.0, "velocity": 0.2},
+                },
+                "imu": {"pitch": 0.3},
+            },
+            "action": [{"torque": 4.0}, {"torque": 5.0}],
+            "time": 0.5,
+        }
+
+    def test_shared_prefixes(self):
+        """Test extracting fields sharing a prefix."""
+        tree = FieldTree(
+            [
+                "observation/servo/left/position",
+                "observation/servo/right/velocity",
+                "observation/imu",
+                "time",
+            ]
+        )
+        self.assertEqual(
+            tree.extract(self.data),
+            {
+                "observation": {
+                    "servo": {
+                        "left": {"position": 1.0},
+                        "right": {"velocity": 0.2},
+                    },
+                    "imu": {"pitch": 0.3},
+                },
+                "time": 0.5,
+            },
+        )
+
+    def test_parent_field(self):
+        """Test that a parent field selects its whole value."""
+        tree = FieldTree(["observation/imu/pitch", "observation/imu"])
+        self.assertEqual(
+            tree.extract(self.data), {"observation": {"imu": {"pitch": 0.3}}}
+        )
+
+    def test_wildcard(self):
+        """Test expanding wildcards against dictionaries and lists."""
+        tree = FieldTree(["observation/servo/*/position", "action/*/torque"])
+        self.assertEqual(
+            tree.extract(self.data),
+            {
+                "observation": {
+                    "servo": {
+                        "left": {"position": 1.0},
+                        "right": {"position": 2.0},
+                    }
+                },
+                "action": {"0": {"torque": 4.0}, "1": {"torque": 5.0}},
+            },
+        )
+
+    def test_wildcard_with_key(self):
+        """Test a wildcard merged with a regular key at the same level."""
+        tree = FieldTree(
+            ["observation/servo/*/position", "observation/servo/left"]
+        )
+        servo = tree.extract(self.data)["observation"]["servo"]
+        self.assertEqual(servo["left"], {"position": 1.0, "velocity": 0.1})
+        self.assertEqual(servo["right"], {"position": 2.0})
+
+    def test_list_index(self):
+        """Test extracting list and array elements by index."""
+        data = {"action": self.data["action"], "vector": np.array([1, 2])}
+        tree = FieldTree(["action/1/torque", "vector/0"])
+        self.assertEqual(
+            tree.extract(data),
+            {"action": {"1": {"torque": 5.0}}, "vector": {"0": 1}},
+        )
+
+    def test_missing_fields(self):
+        """Test that missing fields are reported and left out."""
+        tree = FieldTree(
+            ["observation/servo/*/torque", "observation/imu/yaw", "time/sec"]
+        )
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            self.assertEqual(tree.extract(self.data), {})
+        output = mock_stdout.getvalue()
+        self.assertIn("Field 'observation/imu/yaw' not found", output)
+        self.assertIn("Field 'time/sec' not found", output)
+        self.assertNotIn("torque", output)  # wildcard fields are optional
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -9,6 +9,8 @@ import unittest
 from io import StringIO
 from unittest.mock import patch
 
+import numpy as np
+
 from mpacklog.cli.json_printer import JSONPrinter
 
 
@@ -38,10 +40,9 @@ class TestJSONPrinter(unittest.TestCase):
             printer.process(data)
 
         output = mock_stdout.getvalue().strip()
-        # Should contain filtered fields
-        # Note that `set_from_keys` flattens the structure
+        # Should contain filtered fields, nested as in the input
         self.assertIn('"field1": "keep"', output)
-        self.assertIn('"nested": "keep"', output)
+        self.assertIn('"nested": {"value": "keep"}', output)
         # Should not contain ignored field
         self.assertNotIn("ignore", output)
 
@@ -80,10 +81,109 @@ class TestJSONPrinter(unittest.TestCase):
             printer.process(data)
 
         output = mock_stdout.getvalue().strip()
-        # Due to set_from_keys behavior, the nested structure is flattened
-        self.assertIn('"complex": "target_value"', output)
+        self.assertEqual(
+            output, '{"complex": {"nested": {"deep": "target_value"}}}'
+        )
         self.assertNotIn("ignored", output)
 
+    def test_process_wildcard_fields(self):
+        """Test processing fields with wildcard keys."""
+        printer = JSONPrinter(["servo/*/position", "time"])
+        data = {
+            "servo": {
+                "left": {"position": 1.0, "velocity": 0.1},
+                "right": {"position": 2.0, "velocity": 0.2},
+            },
+            "time": 0.5,
+        }
+
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            printer.process(data)
+
+        output = mock_stdout.getvalue().strip()
+        self.assertEqual(
+            output,
+            '{"servo": {"left": {"position": 1.0}, '
+            '"right": {"position": 2.0}}, "time": 0.5}',
+        )
+
+    def test_process_ndarray_values(self):
+        """Test processing NumPy arrays."""
+        printer = JSONPrinter(None)
+        data = {"matrix": np.eye(2), "count": np.int64(3)}
+
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            printer.process(data)
+
+        output = mock_stdout.getvalue().strip()
+        self.assertEqual(
+            output, '{"matrix": [[1.0, 0.0], [0.0, 1.0]], "count": 3}'
+        )
+
+    def test_process_bytes_values(self):
+        """Test that bytes, which are not JSON types, raise a TypeError."""
+        printer = JSONPrinter(None)
+        with self.assertRaises(TypeError):
+            printer.process({"b": b"abc"})
+        with self.assertRaises(TypeError):
+            printer.process({"nan": float("nan"), "b": b"abc"})
+
+    def test_process_non_finite_values(self):
+        """Test printing NaN and infinite values as null."""
+        printer = JSONPrinter(None)
+        data = {
+            "nan": float("nan"),
+            "list": [float("nan"), 1.0, float("-inf")],
+            "array": np.array([np.inf, 2.0]),
+        }
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            printer.process(data)
+            printer.process({"value": 1.0})
+            printer.process({"nan": 1.0, "value": float("inf")})
+
+        self.assertEqual(
+            mock_stdout.getvalue(),
+            '{"nan": null, "list": [null, 1.0, null], "array": [null, 2.0]}\n'
+            '{"value": 1.0}\n'
+            '{"nan": 1.0, "value": null}\n',
+        )
+
+    def test_process_buffered(self):
+        """Test writing lines to the standard output once the buffer is full."""
+        printer = JSONPrinter(None, buffer_size=1000)
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            for i in range(10):
+                printer.process({"value": i})
+            self.assertEqual(mock_stdout.getvalue(), "")
+            printer.flush()
+            printer.flush()
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(len(output_lines), 10)
+        self.assertEqual(output_lines[-1], '{"value": 9}')
+
+    def test_process_batch(self):
+        """Test that batches are printed as their messages one by one."""
+        messages = [
+            {"time": 0.5, "value": 1.0, "other": 2},
+            {"time": 1.5, "value": float("nan")},
+            {"time": 2.5, "value": 3.0},
+        ]
+        for fields in (None, ["value"]):
+            with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+                printer = JSONPrinter(fields)
+                for message in messages:
+                    printer.process(message)
+            with patch("sys.stdout", new_callable=StringIO) as batch_stdout:
+                printer = JSONPrinter(fields, buffer_size=1000)
+                printer.process_batch(messages)
+                printer.process_batch([])
+                printer.flush()
+            self.assertEqual(batch_stdout.getvalue(), mock_stdout.getvalue())
+        self.assertEqual(
+            batch_stdout.getvalue(),
+            '{"value": 1.0}\n{"value": null}\n{"value": 3.0}\n',
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
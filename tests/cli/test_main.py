@@ -9,14 +9,28 @@ import argparse
 import os
 import sys
 import tempfile
+import threading
+import time
 import unittest
 from io import StringIO
 from unittest.mock import MagicMock, patch
 
 import msgpack
 
+from mpacklog import SyncLogger
+from mpacklog.cli.field_printer import FieldPrinter
 from mpacklog.cli.json_printer import JSONPrinter
-from mpacklog.cli.main import dump_log, get_argument_parser, main
+from mpacklog.cli.main import (
+    dump_dataset,
+    dump_log,
+    get_argument_parser,
+    main,
+    sample_log,
+    split_log_files,
+)
+from mpacklog.compression import BlockCompressor
+from mpacklog.index import Index
+from mpacklog.key_table import KeyInterningPacker
 
 
 class TestGetArgumentParser(unittest.TestCase):
@@ -46,6 +60,37 @@ class TestGetArgumentParser(unittest.TestCase):
         self.assertEqual(args.logfile, "test.log")
         self.assertEqual(args.format, "json")
         self.assertFalse(args.follow)
+        self.assertIsNone(args.since)
+        self.assertIsNone(args.until)
+        self.assertEqual(args.merge, [])
+
+    def test_dump_with_merge(self):
+        """Test dump subcommand with other log files to merge."""
+        parser = get_argument_parser()
+        args = parser.parse_args(
+            ["dump", "a.mpack", "field", "-m", "b.mpack", "--merge", "c"]
+        )
+        self.assertEqual(args.logfile, "a.mpack")
+        self.assertEqual(args.fields, ["field"])
+        self.assertEqual(args.merge, ["b.mpack", "c"])
+
+    def test_dump_with_time_range(self):
+        """Test dump subcommand with time range options."""
+        parser = get_argument_parser()
+        args = parser.parse_args(
+            ["dump", "test.log", "--since", "1.5", "--until", "2"]
+        )
+        self.assertEqual(args.since, 1.5)
+        self.assertEqual(args.until, 2.0)
+        self.assertEqual(args.time_field, "time")
+
+    def test_dump_with_tail(self):
+        """Test dump subcommand with tail option."""
+        parser = get_argument_parser()
+        args = parser.parse_args(["dump", "test.log", "--tail", "10"])
+        self.assertEqual(args.tail, 10)
+        args = parser.parse_args(["dump", "test.log", "-n", "3"])
+        self.assertEqual(args.tail, 3)
 
     def test_dump_with_options(self):
         """Test dump subcommand with options."""
@@ -65,6 +110,10 @@ class TestGetArgumentParser(unittest.TestCase):
         args = parser.parse_args(["list", "test.log"])
         self.assertEqual(args.subcmd, "list")
         self.assertEqual(args.logfile, "test.log")
+        self.assertIsNone(args.sample)
+        self.assertFalse(args.index)
+        args = parser.parse_args(["list", "test.log", "--sample", "10"])
+        self.assertEqual(args.sample, 10)
 
     def test_serve_subcommand(self):
         """Test serve subcommand parsing."""
@@ -80,6 +129,16 @@ class TestGetArgumentParser(unittest.TestCase):
         args = parser.parse_args(["serve", "/path/to/logs", "--port", "8080"])
         self.assertEqual(args.port, 8080)
 
+    def test_index_subcommand(self):
+        """Test index subcommand parsing."""
+        parser = get_argument_parser()
+        args = parser.parse_args(["index", "test.log", "--stride", "100"])
+        self.assertEqual(args.subcmd, "index")
+        self.assertEqual(args.logfile, "test.log")
+        self.assertEqual(args.stride, 100)
+        self.assertEqual(args.time_field, "time")
+        self.assertFalse(args.delta)
+
     def test_delta_decode_subcommand(self):
         """Test delta_decode subcommand parsing."""
         parser = get_argument_parser()
@@ -120,14 +179,217 @@ class TestDumpLog(unittest.TestCase):
         output_lines = mock_stdout.getvalue().strip().split("\n")
         self.assertEqual(len(output_lines), 2)
 
+    def test_dump_log_time_range(self):
+        """Test dumping messages within a time range."""
+        printer = JSONPrinter()
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            dump_log(
+                self.temp_file.name,
+                printer,
+                since=1.5,
+                until=3.0,
+                time_field="timestamp",
+            )
+
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(len(output_lines), 1)
+        self.assertIn('"timestamp": 2.0', output_lines[0])
+
+    def test_dump_log_tail(self):
+        """Test dumping the last messages of a log file."""
+        printer = JSONPrinter()
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            dump_log(self.temp_file.name, printer, tail=1)
+
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(len(output_lines), 1)
+        self.assertIn('"timestamp": 2.0', output_lines[0])
+
+    def test_dump_log_interned_keys(self):
+        """Test dumping a log file with interned keys."""
+        packer = KeyInterningPacker()
+        with open(self.temp_file.name, "wb") as file:
+            for data in self.test_data:
+                file.write(packer.pack(data))
+        printer = JSONPrinter()
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            dump_log(self.temp_file.name, printer, tail=1)
+            dump_log(
+                self.temp_file.name, printer, since=1.5, time_field="timestamp"
+            )
+
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(len(output_lines), 2)
+        for line in output_lines:
+            self.assertIn('"nested": {"key": "test"}', line)
+
+    def test_dump_log_compressed(self):
+        """Test dumping a log file made of compressed blocks."""
+        compressor = BlockCompressor("zlib", block_size=64)
+        with open(self.temp_file.name, "wb") as file:
+            for data in self.test_data:
+                file.write(compressor.add(data, msgpack.packb(data)))
+            file.write(compressor.flush())
+        printer = JSONPrinter()
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            dump_log(self.temp_file.name, printer)
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(len(output_lines), len(self.test_data))
+
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            dump_log(self.temp_file.name, printer, tail=1)
+            dump_log(
+                self.temp_file.name, printer, since=1.5, time_field="timestamp"
+            )
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(len(output_lines), 2)
+        for line in output_lines:
+            self.assertIn('"nested": {"key": "test"}', line)
+
     def test_dump_log_broken_pipe(self):
         """Test handling of BrokenPipeError."""
         printer = MagicMock()
-        printer.process.side_effect = BrokenPipeError()
+        printer.process_batch.side_effect = BrokenPipeError()
 
         # Should not raise an exception
         dump_log(self.temp_file.name, printer)
-        printer.process.assert_called_once()
+        printer.process_batch.assert_called_once()
+
+    def test_dump_log_follow(self):
+        """Test following a log file until a message past a time range."""
+
+        def append_messages():
+            time.sleep(0.05)
+            with open(self.temp_file.name, "ab") as file:
+                file.write(msgpack.packb({"timestamp": 2.5, "value": 44}))
+                file.write(msgpack.packb({"timestamp": 3.0, "value": 45}))
+
+        thread = threading.Thread(target=append_messages)
+        thread.start()
+        printer = JSONPrinter(["value"])
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            dump_log(
+                self.temp_file.name,
+                printer,
+                follow=True,
+                until=3.0,
+                time_field="timestamp",
+            )
+        thread.join()
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(
+            output_lines, ['{"value": 42}', '{"value": 43}', '{"value": 44}']
+        )
+
+    def test_dump_log_follow_new_compressed_file(self):
+        """Test detecting the format of a followed file once it is written."""
+        compressor = BlockCompressor("zlib", block_size=64)
+        for value, timestamp in ((44, 2.5), (45, 3.0)):
+            message = {"timestamp": timestamp, "value": value}
+            compressor.add(message, msgpack.packb(message))
+        data = compressor.flush()
+        open(self.temp_file.name, "wb").close()
+
+        def write_blocks():
+            with open(self.temp_file.name, "ab") as file:
+                for chunk in (data[:1], data[1:]):  # header split in two
+                    time.sleep(0.05)
+                    file.write(chunk)
+                    file.flush()
+
+        thread = threading.Thread(target=write_blocks)
+        thread.start()
+        printer = JSONPrinter(["value"])
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            dump_log(
+                self.temp_file.name,
+                printer,
+                follow=True,
+                until=3.0,
+                time_field="timestamp",
+            )
+        thread.join()
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(output_lines, ['{"value": 44}'])
+
+    def test_dump_dataset(self):
+        """Test dumping several log files merged by timestamp."""
+        other_file = tempfile.mktemp(suffix=".mpack")
+        with open(other_file, "wb") as file:
+            file.write(msgpack.packb({"timestamp": 1.5, "value": 0}))
+        printer = JSONPrinter()
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            dump_dataset(
+                [self.temp_file.name, other_file],
+                printer,
+                time_field="timestamp",
+            )
+        os.unlink(other_file)
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(len(output_lines), 3)
+        self.assertIn(f'"source": "{other_file}"', output_lines[1])
+        self.assertIn('"timestamp": 2.0', output_lines[2])
+
+
+class TestSampleLog(unittest.TestCase):
+    """Test processing a sample of the messages of a log file."""
+
+    def write_log(self, **kwargs) -> str:
+        path = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(path, index_stride=100, **kwargs) as logger:
+            for i in range(1000):
+                message = {"time": 0.001 * i, "servo": {"position": i}}
+                if i >= 500:
+                    message["servo"]["velocity"] = 1.0
+                logger.put(message)
+        return path
+
+    def get_processed(self, printer: MagicMock) -> list:
+        batches = printer.process_batch.call_args_list
+        return [message for call in batches for message in call.args[0]]
+
+    def test_index(self):
+        """Test processing the messages at index entries."""
+        printer = FieldPrinter()
+        with patch("sys.stdout", new_callable=StringIO):
+            sample_log(self.write_log(), printer)
+        self.assertEqual(
+            printer.fields, {"time", "servo/position", "servo/velocity"}
+        )
+
+    def test_sample(self):
+        """Test processing evenly spread messages."""
+        for kwargs in ({}, {"intern_keys": True}, {"compression": "zlib"}):
+            path = self.write_log(**kwargs)
+            os.unlink(f"{path}.idx")
+            printer = MagicMock()
+            sample_log(path, printer, nb_samples=4)
+            messages = self.get_processed(printer)
+            self.assertGreaterEqual(len(messages), 4)
+            self.assertIn("velocity", messages[-1]["servo"])
+
+    def test_sample_index(self):
+        """Test processing evenly spread index entries."""
+        printer = MagicMock()
+        sample_log(self.write_log(), printer, nb_samples=3)
+        messages = self.get_processed(printer)
+        self.assertEqual([m["time"] for m in messages], [0.0, 0.3, 0.6])
+
+    def test_missing_index(self):
+        """Test that reading all index entries requires an index."""
+        path = self.write_log()
+        os.unlink(f"{path}.idx")
+        with self.assertRaises(FileNotFoundError):
+            sample_log(path, FieldPrinter())
+
+    def test_main_list(self):
+        """Test listing fields from a sample of messages."""
+        path = self.write_log()
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            main(["list", path, "--index"])
+            main(["list", path, "--sample", "2"])
+        output = mock_stdout.getvalue()
+        self.assertEqual(output.count("- servo/velocity"), 2)
 
 
 class TestMainFunction(unittest.TestCase):
@@ -188,7 +450,7 @@ class TestMainFunction(unittest.TestCase):
         with patch(
             "sys.stdout",
             new_callable=StringIO,
-        ), patch(
+        ) as mock_stdout, patch(
             "sys.stderr",
             new_callable=StringIO,
         ):
@@ -202,6 +464,72 @@ class TestMainFunction(unittest.TestCase):
                     "csv",
                 ]
             )
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(output_lines[0], "time,timestamp,value")
+        self.assertEqual(len(output_lines), 1 + len(self.test_data))
+
+    def test_main_dump_several_files(self):
+        """Test main function with dump command on several log files."""
+        other_file = tempfile.mktemp(suffix=".mpack")
+        with open(other_file, "wb") as file:
+            file.write(msgpack.packb({"timestamp": 0.5, "value": 0}))
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            main(
+                [
+                    "dump",
+                    self.temp_file.name,
+                    "value",
+                    "--merge",
+                    other_file,
+                    "--time-field",
+                    "timestamp",
+                ]
+            )
+        os.unlink(other_file)
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(output_lines, ['{"value": 0}', '{"value": 42}'])
+
+    def test_main_dump_positional_files(self):
+        """Test main function with log files to merge as positionals."""
+        other_file = tempfile.mktemp(suffix=".mpack")
+        with open(other_file, "wb") as file:
+            file.write(msgpack.packb({"timestamp": 0.5, "value": 0}))
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            main(
+                [
+                    "dump",
+                    self.temp_file.name,
+                    other_file,
+                    "value",
+                    "--time-field",
+                    "timestamp",
+                ]
+            )
+        os.unlink(other_file)
+        output_lines = mock_stdout.getvalue().strip().split("\n")
+        self.assertEqual(output_lines, ['{"value": 0}', '{"value": 42}'])
+
+    def test_split_log_files(self):
+        """Test splitting positional arguments into log files and fields."""
+        self.assertEqual(
+            split_log_files("a.mpack", ["value", "time"]),
+            (["a.mpack"], ["value", "time"]),
+        )
+        self.assertEqual(
+            split_log_files("a.mpack", [self.temp_file.name, "value"]),
+            (["a.mpack", self.temp_file.name], ["value"]),
+        )
+
+    def test_main_index_command(self):
+        """Test main function with index command."""
+        main(["index", self.temp_file.name, "--time-field", "timestamp"])
+        index_path = f"{self.temp_file.name}.idx"
+        try:
+            index = Index.read(self.temp_file.name)
+            self.assertEqual(index.numbers, [0])
+            self.assertEqual(index.times, [1.0])
+        finally:
+            os.unlink(index_path)
 
     def test_main_serve_command(self):
         """Test main function with serve command."""
@@ -6,11 +6,15 @@
 
 """Test the asynchronous logger."""
 
+import asyncio
 import os
 import tempfile
 import unittest
 
-from mpacklog import AsyncLogger
+import msgpack
+
+from mpacklog import AsyncLogger, decode
+from mpacklog.index import Index
 
 
 class TestAsyncLogger(unittest.IsolatedAsyncioTestCase):
@@ -29,3 +33,53 @@ class TestAsyncLogger(unittest.IsolatedAsyncioTestCase):
         await logger.stop()
         await logger.write()
         self.assertTrue(os.path.exists(tmp_file))
+
+    async def test_flush_writes_all_messages(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        logger = AsyncLogger(tmp_file, flush_bytes=1 << 20)
+        for i in range(100):
+            await logger.put({"i": i})
+        await logger.flush()
+        read_values = [message["i"] for message in decode(tmp_file)]
+        self.assertEqual(read_values, list(range(100)))
+
+    async def test_flush_interval(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        logger = AsyncLogger(
+            tmp_file, flush_bytes=1 << 20, flush_interval=0.01
+        )
+        writer = asyncio.create_task(logger.write())
+        await logger.put({"foo": 42})
+        await asyncio.sleep(0.1)
+        self.assertEqual(list(decode(tmp_file)), [{"foo": 42}])
+        await logger.stop()
+        await writer
+
+    async def test_unpackable_message_in_batch(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        logger = AsyncLogger(tmp_file, index_stride=1)
+        for i in range(5):
+            await logger.put({"i": i})
+        await logger.put({"i": 1 << 70})  # too large for msgpack
+        await logger.put({"i": 6})
+        with self.assertRaises(OverflowError):
+            await logger.flush()
+        read_values = [message["i"] for message in decode(tmp_file)]
+        self.assertEqual(read_values, list(range(5)))
+        self.assertEqual(len(Index.read(tmp_file)), 5)
+        await logger.flush()  # the logger can write again
+        self.assertEqual(list(decode(tmp_file)), [{"i": 6}])
+
+    async def test_index_offsets_from_reused_buffer(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        logger = AsyncLogger(tmp_file, index_stride=1)
+        messages = [{"i": i, "blob": b"x" * (i * 37 % 300)} for i in range(50)]
+        for message in messages:
+            await logger.put(message)
+        await logger.flush()
+        self.assertEqual(list(decode(tmp_file)), messages)
+        offsets = Index.read(tmp_file).offsets
+        with open(tmp_file, "rb") as file:
+            for offset, message in zip(offsets, messages):
+                file.seek(offset)
+                self.assertEqual(msgpack.Unpacker(file).unpack(), message)
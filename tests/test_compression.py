@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test log files made of compressed blocks of messages."""
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+import msgpack
+
+from mpacklog import (
+    AsyncLogger,
+    DeltaLogger,
+    SyncLogger,
+    decode,
+    decode_parallel,
+    decode_tail,
+    delta_decode,
+)
+from mpacklog.compression import (
+    BlockCompressor,
+    BlockUnpacker,
+    find_block,
+    get_log_unpacker,
+    is_compressed,
+    lz4_frame,
+    zstandard,
+)
+from mpacklog.index import Index, build_index
+from mpacklog.key_table import KeyInterningPacker, KeyTableUnpacker
+from mpacklog.seek import find_time_offset
+
+
+def make_message(i: int) -> dict:
+    return {
+        "observation": {
+            "servo": {"position": 0.1 * i, "velocity": -1.0},
+            "status": "ok" if i % 7 else "warning",
+        },
+        "count": i,
+        "time": 0.001 * i,
+    }
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        self.log_file = tempfile.mktemp(suffix=".mpack")
+        self.messages = [make_message(i) for i in range(3000)]
+        with SyncLogger(
+            self.log_file,
+            compression="zlib",
+            block_size=4096,
+            index_stride=100,
+        ) as logger:
+            for message in self.messages:
+                logger.put(message)
+
+    def write_log(self, **kwargs) -> str:
+        path = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(path, **kwargs) as logger:
+            for message in self.messages:
+                logger.put(message)
+        return path
+
+    def test_round_trip(self):
+        compressor = BlockCompressor("zlib", block_size=100)
+        unpacker = BlockUnpacker()
+        for message in self.messages[:200]:
+            unpacker.feed(compressor.add(message, msgpack.packb(message)))
+        messages = list(unpacker)
+        self.assertGreater(len(messages), 0)
+        unpacker.feed(compressor.flush())
+        self.assertEqual(messages + list(unpacker), self.messages[:200])
+
+    def test_smaller_file(self):
+        plain_file = self.write_log()
+        self.assertLess(
+            os.path.getsize(self.log_file), os.path.getsize(plain_file) / 3
+        )
+
+    def test_is_compressed(self):
+        with open(self.log_file, "rb") as file:
+            self.assertTrue(is_compressed(file))
+        plain_file = self.write_log()
+        with open(plain_file, "rb") as file:
+            self.assertFalse(is_compressed(file))
+
+    def test_decode(self):
+        self.assertEqual(list(decode(self.log_file)), self.messages)
+        messages = list(decode(self.log_file, use_mmap=True, chunk_size=999))
+        self.assertEqual(messages, self.messages)
+
+    def test_decode_ranges(self):
+        for start_index in (10, 1050, 2999):
+            messages = list(decode(self.log_file, start_index=start_index))
+            self.assertEqual(messages, self.messages[start_index:])
+        messages = list(decode(self.log_file, start_index=5, stop_index=7))
+        self.assertEqual(messages, self.messages[5:7])
+        os.remove(self.log_file + ".idx")
+        messages = list(decode(self.log_file, start_time=2.0, end_time=2.1))
+        self.assertEqual(messages, self.messages[2000:2100])
+
+    def test_decode_fields(self):
+        messages = list(decode(self.log_file, fields=["observation/servo"]))
+        self.assertEqual(
+            messages[42],
+            {"observation": {"servo": {"position": 4.2, "velocity": -1.0}}},
+        )
+
+    def test_decode_tail(self):
+        self.assertEqual(
+            decode_tail(self.log_file, 3, window=64), self.messages[-3:]
+        )
+        self.assertEqual(decode_tail(self.log_file, 5000), self.messages)
+
+    def test_decode_parallel(self):
+        messages = list(decode_parallel(self.log_file, workers=3))
+        self.assertEqual(messages, self.messages)
+        os.remove(self.log_file + ".idx")
+        messages = list(decode_parallel(self.log_file, workers=4))
+        self.assertEqual(messages, self.messages)
+
+    def test_find_block(self):
+        index = Index.read(self.log_file)
+        with open(self.log_file, "rb") as file:
+            for offset in index.offsets[1:]:
+                self.assertEqual(find_block(file, offset - 10), offset)
+            self.assertEqual(find_block(file, 0), 0)
+            file_size = os.path.getsize(self.log_file)
+            self.assertIsNone(find_block(file, file_size - 5))
+            offset = find_time_offset(file, 1.5, window=1024)
+            file.seek(offset)
+            unpacker = BlockUnpacker()
+            unpacker.feed(file.read())
+            self.assertLessEqual(next(unpacker)["time"], 1.5)
+
+    def test_index(self):
+        index = Index.read(self.log_file)
+        self.assertGreater(len(index), 10)
+        self.assertEqual(index.numbers[0], 0)
+        rebuilt = build_index(self.log_file, stride=100)
+        self.assertEqual(rebuilt.numbers, index.numbers)
+        self.assertEqual(rebuilt.offsets, index.offsets)
+        self.assertEqual(rebuilt.times, index.times)
+
+    def test_delta_logger(self):
+        delta_file = tempfile.mktemp(suffix=".mpack")
+        with DeltaLogger(
+            delta_file,
+            keyframe_count=100,
+            compression="zlib",
+            block_size=1000,
+        ) as logger:
+            for i in range(1000):
+                logger.put({"time": 0.001 * i, "count": i // 10})
+        index = Index.read(delta_file)
+        self.assertTrue(all(number % 100 == 0 for number in index.numbers))
+        messages = [dict(m) for m in delta_decode(delta_file, start=555)]
+        self.assertEqual(messages[0], {"time": 0.555, "count": 55})
+        self.assertEqual(len(messages), 445)
+
+    def test_async_logger(self):
+        async_file = tempfile.mktemp(suffix=".mpack")
+        logger = AsyncLogger(async_file, compression="zlib", block_size=4096)
+
+        async def main():
+            for message in self.messages:
+                await logger.put(message)
+            await logger.flush()
+
+        asyncio.run(main())
+        self.assertEqual(list(decode(async_file)), self.messages)
+
+    def test_regular_stream(self):
+        plain_file = self.write_log()
+        unpacker = BlockUnpacker()
+        with open(plain_file, "rb") as file:
+            unpacker.feed(file.read())
+        self.assertEqual(list(unpacker), self.messages)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            SyncLogger(tempfile.mktemp(), compression="rar")
+        with self.assertRaises(ValueError):
+            SyncLogger(tempfile.mktemp(), compression="zlib", intern_keys=True)
+        with self.assertRaises(ValueError):
+            DeltaLogger(
+                tempfile.mktemp(), compression="zlib", intern_keys=True
+            )
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd(self):
+        path = self.write_log(compression="zstd", block_size=4096)
+        self.assertEqual(list(decode(path)), self.messages)
+
+    @unittest.skipIf(lz4_frame is None, "lz4 is not installed")
+    def test_lz4(self):
+        path = self.write_log(compression="lz4", block_size=4096)
+        self.assertEqual(list(decode(path)), self.messages)
+
+
+class TestGetLogUnpacker(unittest.TestCase):
+    """Test detecting the format of a log file from its header."""
+
+    def test_formats(self):
+        message = {"time": 0.0}
+        plain = msgpack.packb(message)
+        interned = KeyInterningPacker().pack(message)
+        compressor = BlockCompressor("zlib")
+        compressor.add(message, plain)
+        compressed = compressor.flush()
+        self.assertIsInstance(get_log_unpacker(plain), msgpack.Unpacker)
+        self.assertIsInstance(get_log_unpacker(interned), KeyTableUnpacker)
+        self.assertIsInstance(get_log_unpacker(compressed), BlockUnpacker)
+
+    def test_short_header(self):
+        self.assertIsNone(get_log_unpacker(b""))
+        self.assertIsNone(get_log_unpacker(b"\xc7\x10"))  # ext 8 header
+        self.assertIsNotNone(get_log_unpacker(b"\x80"))  # empty dict
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test reading several log files merged by timestamp."""
+
+import os
+import tempfile
+import unittest
+
+from mpacklog import SyncLogger, open_dataset
+from mpacklog.dataset import list_sources
+from mpacklog.rotation import get_base_path
+
+
+class TestDataset(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.fast_path = os.path.join(self.log_dir, "fast.mpack")
+        self.slow_path = os.path.join(self.log_dir, "slow.mpack")
+        self.fast_messages = [
+            {"time": 0.001 * i, "fast": i} for i in range(1000)
+        ]
+        self.slow_messages = [
+            {"time": 0.01 * i + 0.0005, "slow": i} for i in range(100)
+        ]
+        self.write_log(self.fast_path, self.fast_messages)
+        self.write_log(self.slow_path, self.slow_messages)
+
+    def write_log(self, path, messages, **kwargs):
+        with SyncLogger(path, **kwargs) as logger:
+            for message in messages:
+                logger.put(message)
+
+    def test_merge(self):
+        records = list(open_dataset([self.fast_path, self.slow_path]))
+        self.assertEqual(len(records), 1100)
+        times = [message["time"] for _, message in records]
+        self.assertEqual(times, sorted(times))
+        self.assertEqual(
+            [m for source, m in records if source == self.fast_path],
+            self.fast_messages,
+        )
+        self.assertEqual(
+            [m for source, m in records if source == self.slow_path],
+            self.slow_messages,
+        )
+
+    def test_directory(self):
+        self.assertEqual(
+            list(open_dataset(self.log_dir)),
+            list(open_dataset([self.fast_path, self.slow_path])),
+        )
+
+    def test_rotated_log(self):
+        rotated_path = os.path.join(self.log_dir, "rotated.mpack")
+        messages = [{"time": 0.002 * i, "rotated": i} for i in range(500)]
+        self.write_log(rotated_path, messages, rotate_bytes=1024)
+        self.assertEqual(
+            get_base_path(os.path.join(self.log_dir, "rotated.00001.mpack")),
+            rotated_path,
+        )
+        self.assertIsNone(get_base_path(self.fast_path))
+        self.assertEqual(
+            list_sources(self.log_dir),
+            [self.fast_path, rotated_path, self.slow_path],
+        )
+        records = list(open_dataset(self.log_dir))
+        self.assertEqual(len(records), 1600)
+        self.assertEqual(
+            [m for source, m in records if source == rotated_path], messages
+        )
+
+    def test_dated_log_files(self):
+        dated_path = os.path.join(self.log_dir, "run.20260101.mpack")
+        self.write_log(dated_path, [{"time": 0.5, "dated": 0}])
+        self.assertEqual(
+            list_sources(self.log_dir),
+            [self.fast_path, dated_path, self.slow_path],
+        )
+
+    def test_time_range(self):
+        records = list(
+            open_dataset(
+                [self.fast_path, self.slow_path],
+                start_time=0.2,
+                end_time=0.3,
+            )
+        )
+        self.assertEqual(len(records), 110)
+        self.assertEqual(records[0][1], {"time": 0.2, "fast": 200})
+        self.assertEqual(records[1][1], {"time": 0.2005, "slow": 20})
+
+    def test_fields(self):
+        records = list(open_dataset(self.log_dir, fields=["slow"]))
+        self.assertEqual(records[0][1], {"time": 0.0})
+        self.assertEqual(records[1][1], {"time": 0.0005, "slow": 0})
+
+    def test_untimed_messages(self):
+        untimed_path = os.path.join(self.log_dir, "untimed.mpack")
+        self.write_log(
+            untimed_path,
+            [{"time": 0.5}, {"status": "ok"}, {"time": 0.6}],
+        )
+        records = list(open_dataset([self.slow_path, untimed_path]))
+        untimed = [i for i, r in enumerate(records) if r[0] == untimed_path]
+        self.assertEqual(records[untimed[1]][1], {"status": "ok"})
+        self.assertEqual(records[untimed[1] + 1][1]["time"], 0.5005)
+
+    def test_missing_path(self):
+        with self.assertRaises(FileNotFoundError):
+            list(open_dataset(os.path.join(self.log_dir, "missing.mpack")))
+        with self.assertRaises(FileNotFoundError):
+            list(open_dataset(tempfile.mkdtemp()))
@@ -24,3 +24,102 @@ class TestDecode(unittest.TestCase):
         self.assertEqual(len(read_dicts), 2)
         self.assertEqual(read_dicts[0], {"foo": 12, "something": "else"})
         self.assertEqual(read_dicts[1], {"foo": 42, "bar": "baz"})
+
+    def make_log(self, nb_messages: int, **kwargs) -> str:
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file, **kwargs) as logger:
+            for i in range(nb_messages):
+                logger.put({"time": 0.01 * i, "i": i, "data": [i, "foo"]})
+        return tmp_file
+
+    def test_decode_time_range(self):
+        for kwargs in ({}, {"index_stride": 100}):
+            tmp_file = self.make_log(20_000, **kwargs)
+            messages = list(decode(tmp_file, start_time=150.0, end_time=150.1))
+            self.assertEqual(
+                [message["i"] for message in messages],
+                list(range(15000, 15010)),
+            )
+
+    def test_decode_index_range(self):
+        for kwargs in ({}, {"index_stride": 100}):
+            tmp_file = self.make_log(1000, **kwargs)
+            messages = list(decode(tmp_file, start_index=250, stop_index=260))
+            self.assertEqual(
+                [message["i"] for message in messages], list(range(250, 260))
+            )
+
+    def test_decode_time_and_index_range(self):
+        tmp_file = self.make_log(1000)
+        messages = list(decode(tmp_file, start_time=5.0, stop_index=505))
+        self.assertEqual(
+            [message["i"] for message in messages], list(range(500, 505))
+        )
+
+    def test_decode_skip_untimed_messages(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file) as logger:
+            logger.put({"time": 1.0})
+            logger.put({"foo": "bar"})
+            logger.put({"time": 2.0})
+        messages = list(decode(tmp_file, start_time=0.0))
+        self.assertEqual(messages, [{"time": 1.0}, {"time": 2.0}])
+
+    def test_decode_mmap(self):
+        tmp_file = self.make_log(10_000)
+        messages = list(decode(tmp_file))
+        self.assertEqual(list(decode(tmp_file, use_mmap=True)), messages)
+        self.assertEqual(
+            list(decode(tmp_file, chunk_size=100, use_mmap=True)), messages
+        )
+        ranged = list(decode(tmp_file, start_time=50.0, use_mmap=True))
+        self.assertEqual(ranged, messages[5000:])
+
+    def test_decode_mmap_empty_file(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        open(tmp_file, "wb").close()
+        self.assertEqual(list(decode(tmp_file, use_mmap=True)), [])
+
+    def test_decode_fields(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file) as logger:
+            logger.put(
+                {
+                    "time": 1.0,
+                    "observation": {"position": 1.0, "velocity": 2.0},
+                    "action": [1.0, 2.0],
+                    "config": {"name": "foo"},
+                }
+            )
+            logger.put({"time": 2.0, "observation": "unavailable"})
+        messages = list(
+            decode(tmp_file, fields=["observation/position", "action/1"])
+        )
+        self.assertEqual(
+            messages,
+            [{"observation": {"position": 1.0}, "action": [1.0, 2.0]}, {}],
+        )
+        messages = list(decode(tmp_file, fields=["config", "config/name"]))
+        self.assertEqual(messages, [{"config": {"name": "foo"}}, {}])
+
+    def test_decode_fields_time_range(self):
+        tmp_file = self.make_log(1000)
+        messages = list(
+            decode(tmp_file, start_time=5.0, end_time=5.03, fields=["i"])
+        )
+        self.assertEqual(messages, [{"i": 500}, {"i": 501}, {"i": 502}])
+        messages = list(decode(tmp_file, start_index=998, fields=["data/1"]))
+        self.assertEqual(
+            messages,
+            [
+                {"data": [998, "foo"]},
+                {"data": [999, "foo"]},
+            ],
+        )
+
+    def test_decode_fields_chunks(self):
+        tmp_file = self.make_log(1000)
+        messages = list(decode(tmp_file, chunk_size=7, fields=["time", "i"]))
+        self.assertEqual(
+            messages, [{"time": 0.01 * i, "i": i} for i in range(1000)]
+        )
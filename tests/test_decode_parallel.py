@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test decoding logs in parallel."""
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import msgpack
+
+from mpacklog import SyncLogger, decode, decode_parallel
+from mpacklog.decode_parallel import get_split_offsets
+from mpacklog.index import Index
+
+
+def get_number(message: dict) -> int:
+    return message["i"]
+
+
+class TestDecodeParallel(unittest.TestCase):
+    def make_log(self, nb_messages: int, **kwargs) -> str:
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file, **kwargs) as logger:
+            for i in range(nb_messages):
+                logger.put({"i": i, "blob": b"\x85" * (i % 50), "x": 0.5 * i})
+        return tmp_file
+
+    def test_decode_parallel(self):
+        for kwargs in ({}, {"index_stride": 100}):
+            tmp_file = self.make_log(5000, **kwargs)
+            numbers = list(decode_parallel(tmp_file, get_number, workers=3))
+            self.assertEqual(numbers, list(range(5000)))
+
+    def test_decode_parallel_messages(self):
+        tmp_file = self.make_log(100)
+        messages = list(decode_parallel(tmp_file, workers=8))
+        self.assertEqual(messages, list(decode(tmp_file)))
+
+    def test_decode_parallel_nested_values(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        messages = [
+            {"time": 0.001 * i, "obs": {"x": i, "y": {"z": i}}}
+            for i in range(20_000)
+        ]
+        with SyncLogger(tmp_file) as logger:
+            for message in messages:
+                logger.put(message)
+        for workers in range(2, 8):
+            self.assertEqual(
+                list(decode_parallel(tmp_file, workers=workers)), messages
+            )
+
+    def test_decode_parallel_trailing_list_of_maps(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        messages = [
+            {"i": i, "servos": [{"p": 3 * i + j} for j in range(i % 40)]}
+            for i in range(5000)
+        ]
+        with SyncLogger(tmp_file) as logger:
+            for message in messages:
+                logger.put(message)
+        for workers in range(2, 10):
+            self.assertEqual(
+                list(decode_parallel(tmp_file, workers=workers)), messages
+            )
+
+    def test_decode_parallel_bad_resync(self):
+        """Test decoding ranges whose workers resync inside messages."""
+        tmp_file = self.make_log(2000)
+        with patch(
+            "mpacklog.decode_parallel.ProcessPoolExecutor", ThreadPoolExecutor
+        ), patch(
+            "mpacklog.decode_parallel.find_resync_candidate",
+            lambda file, offset, end: offset,  # likely inside a message
+        ):
+            for workers in (2, 3, 7):
+                numbers = decode_parallel(tmp_file, get_number, workers)
+                self.assertEqual(list(numbers), list(range(2000)))
+
+    def test_get_split_offsets(self):
+        tmp_file = self.make_log(5000, index_stride=100)
+        offsets = get_split_offsets(tmp_file, 4, Index.read(tmp_file))
+        self.assertEqual(len(offsets), 5)
+        self.assertEqual(offsets[0], 0)
+        self.assertEqual(offsets[-1], os.path.getsize(tmp_file))
+        boundaries = []
+        with open(tmp_file, "rb") as file:
+            unpacker = msgpack.Unpacker(file)
+            for _ in range(5000):
+                boundaries.append(unpacker.tell())
+                unpacker.skip()
+        for offset in offsets[1:-1]:
+            self.assertIn(offset, boundaries)
+
+    def test_decode_parallel_empty_file(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        open(tmp_file, "wb").close()
+        self.assertEqual(list(decode_parallel(tmp_file, workers=2)), [])
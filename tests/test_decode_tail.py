@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test reading the last messages of log files."""
+
+import tempfile
+import unittest
+
+import msgpack
+
+from mpacklog import SyncLogger, decode_tail
+
+
+class TestDecodeTail(unittest.TestCase):
+    def make_log(self, nb_messages: int) -> str:
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file) as logger:
+            for i in range(nb_messages):
+                logger.put(
+                    {"i": i, "data": [float(i), bytes(range(0x80, 0x90))]}
+                )
+        return tmp_file
+
+    def test_decode_tail(self):
+        tmp_file = self.make_log(10_000)
+        messages = decode_tail(tmp_file, 5, window=256)
+        self.assertEqual([m["i"] for m in messages], list(range(9995, 10000)))
+
+    def test_decode_tail_whole_file(self):
+        tmp_file = self.make_log(100)
+        messages = decode_tail(tmp_file, 1000, window=256)
+        self.assertEqual([m["i"] for m in messages], list(range(100)))
+
+    def test_decode_tail_large_messages(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file) as logger:
+            for i in range(10):
+                logger.put({"i": i, "blob": b"\x8f" * 1000})
+        messages = decode_tail(tmp_file, 3, window=16)
+        self.assertEqual([m["i"] for m in messages], [7, 8, 9])
+
+    def test_decode_tail_incomplete_message(self):
+        tmp_file = self.make_log(100)
+        with open(tmp_file, "ab") as file:
+            file.write(msgpack.packb({"i": 100, "foo": "bar" * 10})[:20])
+        messages = decode_tail(tmp_file, 2, window=256)
+        self.assertEqual([m["i"] for m in messages], [98, 99])
+
+    def test_decode_tail_nested_values(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file) as logger:
+            for i in range(5000):
+                logger.put({"time": 0.001 * i, "obs": {"x": i, "y": {"z": i}}})
+        for window in range(200, 300, 7):  # cut at all places in a message
+            for nb_messages in (1, 8):
+                messages = decode_tail(tmp_file, nb_messages, window=window)
+                self.assertEqual(
+                    [m["obs"]["x"] for m in messages],
+                    list(range(5000 - nb_messages, 5000)),
+                )
+
+    def test_decode_tail_trailing_list_of_maps(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file) as logger:
+            for i in range(3000):
+                servos = [{"p": 3 * i + j} for j in range(3)]
+                logger.put({"i": i, "servos": servos})
+        for window in range(64, 264, 13):
+            for nb_messages in (1, 2, 5, 17):
+                messages = decode_tail(tmp_file, nb_messages, window=window)
+                self.assertEqual(
+                    [m["i"] for m in messages],
+                    list(range(3000 - nb_messages, 3000)),
+                )
+
+    def test_decode_tail_index(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file, index_stride=100) as logger:
+            for i in range(1000):
+                logger.put({"i": i, "servos": [{"p": i}, {"p": -i}]})
+        for nb_messages in (1, 99, 100, 101, 350, 1000, 2000):
+            messages = decode_tail(tmp_file, nb_messages)
+            self.assertEqual(
+                [m["i"] for m in messages],
+                list(range(max(0, 1000 - nb_messages), 1000)),
+            )
+
+    def test_decode_tail_empty(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        open(tmp_file, "wb").close()
+        self.assertEqual(decode_tail(tmp_file, 10), [])
+        self.assertEqual(decode_tail(self.make_log(10), 0), [])
@@ -9,7 +9,8 @@
 import tempfile
 import unittest
 
-from mpacklog import SyncLogger, delta_decode
+from mpacklog import DeltaLogger, SyncLogger, delta_decode
+from mpacklog.index import Index, build_index
 
 
 class TestDeltaDecode(unittest.TestCase):
@@ -51,3 +52,87 @@ class TestDeltaDecode(unittest.TestCase):
         self.assertEqual(
             cumulative_states[2], {"a": 10, "b": 20, "c": 3, "d": 4}
         )
+
+    def test_delta_decode_start(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with DeltaLogger(tmp_file, keyframe_count=10) as logger:
+            for i in range(95):
+                logger.put({"i": i, "even": i % 2 == 0, "constant": "foo"})
+        index = Index.read(tmp_file)
+        self.assertEqual(index.numbers, list(range(0, 95, 10)))
+        for start in (0, 9, 10, 47, 94, 95):
+            states = [
+                dict(state) for state in delta_decode(tmp_file, start=start)
+            ]
+            self.assertEqual(len(states), 95 - start)
+            if states:
+                self.assertEqual(states[0]["i"], start)
+                self.assertEqual(states[0]["even"], start % 2 == 0)
+                self.assertEqual(states[0]["constant"], "foo")
+
+    def test_delta_decode_start_removed_keys(self):
+        for intern_keys in (False, True):
+            tmp_file = tempfile.mktemp(suffix=".mpack")
+            with DeltaLogger(
+                tmp_file, keyframe_count=10, intern_keys=intern_keys
+            ) as logger:
+                for i in range(95):
+                    message = {"i": i}
+                    if i < 15:  # removed before the second keyframe
+                        message["early"] = i
+                    if i % 7 == 0:
+                        message["sparse"] = i
+                    logger.put(message)
+            full = [dict(state) for state in delta_decode(tmp_file)]
+            self.assertEqual(full[-1]["early"], 14)
+            for start in (10, 20, 47, 90):
+                states = [
+                    dict(state)
+                    for state in delta_decode(tmp_file, start=start)
+                ]
+                self.assertEqual(states, full[start:])
+
+    def test_delta_decode_mmap(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with DeltaLogger(tmp_file, keyframe_count=10) as logger:
+            for i in range(95):
+                logger.put({"i": i, "constant": "foo"})
+        for start in (0, 47):
+            states = [
+                dict(state)
+                for state in delta_decode(
+                    tmp_file, chunk_size=64, start=start, use_mmap=True
+                )
+            ]
+            self.assertEqual(
+                [state["i"] for state in states], list(range(start, 95))
+            )
+
+    def test_delta_decode_start_without_index(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with DeltaLogger(tmp_file, index=False) as logger:
+            for i in range(20):
+                logger.put({"i": i, "constant": "foo"})
+        self.assertIsNone(Index.read(tmp_file))
+        states = [dict(state) for state in delta_decode(tmp_file, start=15)]
+        self.assertEqual(states[0], {"i": 15, "constant": "foo"})
+        self.assertEqual(len(states), 5)
+
+    def test_build_index(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        logger = SyncLogger(tmp_file)
+        logger.put({"a": 1, "b": 2})
+        logger.put({"b": 3})
+        logger.put({"a": 4, "b": 5})  # keyframe
+        logger.put({"a": 6})
+        logger.put({"c": 7})
+        logger.put({"a": 8, "b": 9})
+        logger.put({"a": 10, "b": 11, "c": 12})  # keyframe
+        logger.close()
+        index = build_index(tmp_file, stride=1, delta=True)
+        self.assertEqual(index.numbers, [0, 2, 6])
+        self.assertEqual(Index.read(tmp_file).numbers, [0, 2, 6])
+        states = [dict(state) for state in delta_decode(tmp_file)]
+        for start in range(7):
+            state = next(delta_decode(tmp_file, start=start))
+            self.assertEqual(state, states[start])
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test loggers writing delta-encoded log files."""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from mpacklog import (
+    AsyncDeltaLogger,
+    DeltaLogger,
+    SyncLogger,
+    decode,
+    delta_decode,
+)
+
+
+def make_messages(nb_messages: int):
+    return [
+        {"time": 0.1 * i, "mode": "idle", "config": {"gain": 2.0}}
+        for i in range(nb_messages)
+    ]
+
+
+class TestDeltaLogger(unittest.TestCase):
+    def test_write_deltas(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with DeltaLogger(tmp_file, keyframe_count=None) as logger:
+            logger.put({"foo": 1, "bar": "baz"})
+            logger.put({"foo": 2, "bar": "baz"})
+            logger.put({"foo": 2, "bar": "qux"})
+        self.assertEqual(
+            list(decode(tmp_file)),
+            [{"foo": 1, "bar": "baz"}, {"foo": 2}, {"bar": "qux"}],
+        )
+
+    def test_delta_decode(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        messages = make_messages(100)
+        with DeltaLogger(tmp_file, keyframe_count=10) as logger:
+            for message in messages:
+                logger.put(message)
+        decoded = [dict(state) for state in delta_decode(tmp_file)]
+        self.assertEqual(decoded, messages)
+
+    def test_keyframes(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with DeltaLogger(tmp_file, keyframe_count=10) as logger:
+            for message in make_messages(25):
+                logger.put(message)
+        nb_keys = [len(message) for message in decode(tmp_file)]
+        keyframes = [i for i, nb in enumerate(nb_keys) if nb == 3]
+        self.assertEqual(keyframes, [0, 10, 20])
+
+    def test_smaller_than_full_log(self):
+        full_file = tempfile.mktemp(suffix=".mpack")
+        delta_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(full_file) as full, DeltaLogger(delta_file) as delta:
+            for message in make_messages(100):
+                full.put(message)
+                delta.put(message)
+        self.assertLess(
+            os.path.getsize(delta_file), os.path.getsize(full_file) / 2
+        )
+
+    def test_in_place_modification(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        message = {"array": np.zeros(3), "nested": {"value": 0}}
+        with DeltaLogger(tmp_file) as logger:
+            logger.put(message, write=True)
+            message["array"][1] = 1.0
+            message["nested"]["value"] = 1
+            logger.put(message, write=True)
+        states = [dict(state) for state in delta_decode(tmp_file)]
+        self.assertEqual(states[-1]["array"], [0.0, 1.0, 0.0])
+        self.assertEqual(states[-1]["nested"], {"value": 1})
+
+
+class TestAsyncDeltaLogger(unittest.IsolatedAsyncioTestCase):
+    async def test_delta_decode(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        messages = make_messages(50)
+        logger = AsyncDeltaLogger(tmp_file, keyframe_count=20)
+        for message in messages:
+            await logger.put(message)
+        await logger.flush()
+        decoded = [dict(state) for state in delta_decode(tmp_file)]
+        self.assertEqual(decoded, messages)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test MessagePack extension types."""
+
+import tempfile
+import unittest
+
+import msgpack
+import numpy as np
+
+from mpacklog import DeltaLogger, SyncLogger, decode, delta_decode
+from mpacklog.ext_types import NDARRAY_EXT_CODE, ext_hook, serialize_ndarray
+
+
+def roundtrip(obj):
+    data = msgpack.packb(obj, default=serialize_ndarray)
+    return msgpack.unpackb(data, ext_hook=ext_hook)
+
+
+class TestExtTypes(unittest.TestCase):
+    def test_ndarray_roundtrip(self):
+        arrays = [
+            np.arange(36, dtype=float).reshape(6, 6),
+            np.arange(1000, dtype=np.int32),
+            np.array([True, False]),
+            np.array(3.5),
+            np.zeros((0, 3)),
+            np.arange(6, dtype=">f4").reshape(2, 3),
+            np.arange(36.0).reshape(6, 6)[::2, 1:4],
+            np.array([1 + 2j], dtype=np.complex64),
+        ]
+        for array in arrays:
+            unpacked = roundtrip(array)
+            self.assertIsInstance(unpacked, np.ndarray)
+            self.assertEqual(unpacked.shape, array.shape)
+            self.assertEqual(unpacked.dtype.kind, array.dtype.kind)
+            self.assertEqual(unpacked.dtype.itemsize, array.dtype.itemsize)
+            np.testing.assert_array_equal(unpacked, array)
+
+    def test_ndarray_ext_type(self):
+        array = np.ones((6, 6))
+        ext = serialize_ndarray(array)
+        self.assertIsInstance(ext, msgpack.ExtType)
+        self.assertEqual(ext.code, NDARRAY_EXT_CODE)
+        self.assertLess(len(ext.data), len(msgpack.packb(array.tolist())))
+
+    def test_object_arrays_as_lists(self):
+        array = np.array(["foo", "bar"], dtype=object)
+        self.assertEqual(roundtrip(array), ["foo", "bar"])
+
+    def test_unknown_ext_code(self):
+        data = msgpack.packb(msgpack.ExtType(42, b"foo"))
+        self.assertEqual(
+            msgpack.unpackb(data, ext_hook=ext_hook),
+            msgpack.ExtType(42, b"foo"),
+        )
+
+    def test_loggers(self):
+        for logger_class, decoder in (
+            (SyncLogger, decode),
+            (DeltaLogger, delta_decode),
+        ):
+            tmp_file = tempfile.mktemp(suffix=".mpack")
+            with logger_class(tmp_file, ndarray_ext=True) as logger:
+                logger.put({"time": 0.0, "matrix": np.eye(6)})
+                logger.put({"time": 1.0, "matrix": 2.0 * np.eye(6)})
+            messages = [dict(message) for message in decoder(tmp_file)]
+            self.assertEqual(len(messages), 2)
+            np.testing.assert_array_equal(messages[1]["matrix"], 2 * np.eye(6))
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test following log files as they grow."""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import msgpack
+
+from mpacklog import SyncLogger
+from mpacklog.follow import FileFollower, libc
+from mpacklog.rotation import get_rotated_path
+
+
+class TestFileFollower(unittest.TestCase):
+    use_inotify = True
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.log_dir, "robot.mpack")
+        with open(self.path, "wb") as file:
+            file.write(b"start")
+
+    def follow(self, path=None, offset=0, **kwargs):
+        return FileFollower(
+            path or self.path, offset, use_inotify=self.use_inotify, **kwargs
+        )
+
+    def append(self, data: bytes, path=None, delay: float = 0.0):
+        def target():
+            time.sleep(delay)
+            with open(path or self.path, "ab") as file:
+                file.write(data)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        return thread
+
+    def test_read(self):
+        with self.follow(offset=2) as follower:
+            self.assertEqual(follower.read(), b"art")
+            self.assertEqual(follower.read(timeout=0.01), b"")
+            thread = self.append(b"next", delay=0.05)
+            self.assertEqual(follower.read(timeout=5.0), b"next")
+            thread.join()
+            self.assertEqual(follower.offset, 9)
+            self.assertFalse(follower.reopened)
+
+    def test_uses_inotify(self):
+        with self.follow() as follower:
+            self.assertEqual(
+                follower.uses_inotify, self.use_inotify and libc is not None
+            )
+
+    def test_truncate(self):
+        with self.follow() as follower:
+            self.assertEqual(follower.read(), b"start")
+            with open(self.path, "wb") as file:
+                file.write(b"new")
+            self.assertEqual(follower.read(timeout=5.0), b"new")
+            self.assertTrue(follower.reopened)
+
+    def test_replace(self):
+        with self.follow(check_period=0.0) as follower:
+            self.assertEqual(follower.read(), b"start")
+            os.rename(self.path, self.path + ".old")
+            with open(self.path, "wb") as file:
+                file.write(b"replaced")
+            self.assertEqual(follower.read(timeout=5.0), b"replaced")
+            self.assertTrue(follower.reopened)
+
+    def test_rotation(self):
+        base_path = os.path.join(self.log_dir, "rotated.mpack")
+        first_path = get_rotated_path(base_path, 0)
+        with open(first_path, "wb") as file:
+            file.write(b"first")
+        with self.follow(first_path, check_period=0.0) as follower:
+            self.assertEqual(follower.log_path, base_path)
+            self.assertEqual(follower.read(), b"first")
+            second_path = get_rotated_path(base_path, 1)
+            with open(second_path, "wb") as file:
+                file.write(b"second")
+            self.assertEqual(follower.read(timeout=5.0), b"second")
+            self.assertTrue(follower.reopened)
+            self.assertEqual(follower.path, second_path)
+
+    def test_rotation_next_file(self):
+        base_path = os.path.join(self.log_dir, "rotated.mpack")
+        for number in (0, 1, 2):
+            with open(get_rotated_path(base_path, number), "wb") as file:
+                file.write(f"file{number}".encode())
+        first_path = get_rotated_path(base_path, 0)
+        with self.follow(first_path, check_period=0.0) as follower:
+            self.assertEqual(follower.read(), b"file0")
+            self.assertEqual(follower.read(timeout=5.0), b"file1")
+            self.assertEqual(follower.read(timeout=5.0), b"file2")
+            self.assertEqual(follower.path, get_rotated_path(base_path, 2))
+
+    def test_directory_older_file_modified(self):
+        older_path = os.path.join(self.log_dir, "older.mpack")
+        with open(older_path, "wb") as file:
+            file.write(b"older")
+        with self.follow(log_path=self.log_dir, check_period=0.0) as follower:
+            self.assertEqual(follower.read(), b"start")
+            self.append(b"more", path=older_path).join()
+            self.assertEqual(follower.read(timeout=0.2), b"")
+            self.assertEqual(follower.path, self.path)
+            newer_path = os.path.join(self.log_dir, "newer.mpack")
+            with open(newer_path, "wb") as file:
+                file.write(b"newer")
+            self.assertEqual(follower.read(timeout=5.0), b"newer")
+            self.assertTrue(follower.reopened)
+            self.assertEqual(follower.path, newer_path)
+            self.append(b"again", path=older_path).join()
+            self.assertEqual(follower.read(timeout=0.2), b"")
+            self.assertEqual(follower.path, newer_path)
+
+    def test_logger_rotation(self):
+        base_path = os.path.join(self.log_dir, "logger.mpack")
+        messages = [{"count": i} for i in range(300)]
+        logger = SyncLogger(base_path, rotate_bytes=512)
+
+        def target():
+            with logger:
+                for message in messages:
+                    logger.put(message, write=True)
+                    time.sleep(0.0001)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        unpacker = msgpack.Unpacker()
+        unpacked = []
+        first_path = get_rotated_path(base_path, 0)
+        while not os.path.exists(first_path):
+            time.sleep(0.001)
+        with self.follow(first_path, check_period=0.0) as follower:
+            while len(unpacked) < len(messages):
+                data = follower.read(timeout=5.0)
+                if not data:
+                    break
+                if follower.reopened:
+                    unpacker = msgpack.Unpacker()
+                unpacker.feed(data)
+                unpacked.extend(unpacker)
+        thread.join()
+        self.assertNotEqual(follower.path, first_path)
+        self.assertEqual(unpacked, messages)
+
+    def test_read_async(self):
+        async def main():
+            with self.follow() as follower:
+                self.assertEqual(await follower.read_async(), b"start")
+                self.assertEqual(await follower.read_async(timeout=0.01), b"")
+                thread = self.append(b"async", delay=0.05)
+                data = await follower.read_async(timeout=5.0)
+                thread.join()
+                return data
+
+        self.assertEqual(asyncio.run(main()), b"async")
+
+
+class TestFileFollowerPolling(TestFileFollower):
+    use_inotify = False
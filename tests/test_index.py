@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test sidecar indexes of log files."""
+
+import os
+import tempfile
+import unittest
+
+import msgpack
+
+from mpacklog import AsyncLogger, SyncLogger
+from mpacklog.index import Index, build_index, get_index_path, get_time
+
+
+def read_message_at(path: str, offset: int) -> dict:
+    with open(path, "rb") as file:
+        file.seek(offset)
+        return next(msgpack.Unpacker(file, raw=False))
+
+
+class TestIndex(unittest.TestCase):
+    def test_get_time(self):
+        message = {"time": 1.5, "observation": {"time": 2}}
+        self.assertEqual(get_time(message, "time"), 1.5)
+        self.assertEqual(get_time(message, "observation/time"), 2)
+        self.assertIsNone(get_time(message, "observation/foo"))
+        self.assertIsNone(get_time(message, None))
+
+    def test_lookup(self):
+        index = Index(stride=10, time_field="time")
+        for number in range(0, 50, 10):
+            index.append(number, 100 * number, 0.1 * number)
+        self.assertEqual(index.lookup(0), (0, 0))
+        self.assertEqual(index.lookup(25), (20, 2000))
+        self.assertEqual(index.lookup(1000), (40, 4000))
+        self.assertEqual(index.lookup_time(0.0), (0, 0))
+        self.assertEqual(index.lookup_time(2.5), (20, 2000))
+        self.assertEqual(index.lookup_time(3.0), (20, 2000))
+
+    def test_sync_logger_index(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file, index_stride=10) as logger:
+            for i in range(45):
+                logger.put({"time": 0.5 * i, "i": i})
+        index = Index.read(tmp_file)
+        self.assertEqual(index.numbers, [0, 10, 20, 30, 40])
+        self.assertEqual(index.times, [0.0, 5.0, 10.0, 15.0, 20.0])
+        for number, offset in zip(index.numbers, index.offsets):
+            self.assertEqual(read_message_at(tmp_file, offset)["i"], number)
+
+    def test_build_index(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file, index_stride=7) as logger:
+            for i in range(30):
+                logger.put({"time": 0.5 * i, "i": i})
+        written = Index.read(tmp_file)
+        os.unlink(get_index_path(tmp_file))
+        built = build_index(tmp_file, stride=7)
+        self.assertEqual(built.numbers, written.numbers)
+        self.assertEqual(built.offsets, written.offsets)
+        self.assertEqual(built.times, written.times)
+        self.assertEqual(Index.read(tmp_file).offsets, written.offsets)
+
+    def test_ignore_entries_beyond_log(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file, index_stride=1) as logger:
+            for i in range(10):
+                logger.put({"i": i})
+        index = Index.read(tmp_file)
+        with open(tmp_file, "r+b") as file:
+            file.truncate(index.offsets[5])
+        self.assertEqual(len(Index.read(tmp_file)), 5)
+
+    def test_no_index(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file) as logger:
+            logger.put({"i": 0})
+        self.assertFalse(os.path.exists(get_index_path(tmp_file)))
+        self.assertIsNone(Index.read(tmp_file))
+
+
+class TestAsyncLoggerIndex(unittest.IsolatedAsyncioTestCase):
+    async def test_async_logger_index(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        logger = AsyncLogger(tmp_file, index_stride=4)
+        for i in range(10):
+            await logger.put({"time": float(i), "i": i})
+        await logger.flush()
+        index = Index.read(tmp_file)
+        self.assertEqual(index.numbers, [0, 4, 8])
+        for number, offset in zip(index.numbers, index.offsets):
+            self.assertEqual(read_message_at(tmp_file, offset)["i"], number)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test log files with interned dictionary keys."""
+
+import os
+import tempfile
+import unittest
+
+import msgpack
+
+from mpacklog import (
+    DeltaLogger,
+    SyncLogger,
+    decode,
+    decode_parallel,
+    decode_tail,
+    delta_decode,
+    load_columns,
+)
+from mpacklog.index import build_index
+from mpacklog.key_table import (
+    KeyInterningPacker,
+    KeyTable,
+    KeyTableUnpacker,
+    is_interned,
+    read_key_table,
+)
+
+
+def make_message(i: int) -> dict:
+    message = {
+        "observation": {
+            "servo": {"position": 0.1 * i, "velocity": -1.0},
+            "contacts": [{"left": True}, {"right": False}],
+        },
+    }
+    if i % 100 == 50:  # new keys appear along the way
+        message[f"event{i}"] = {"name": "spike", "value": i}
+    message["time"] = 0.001 * i
+    return message
+
+
+class TestKeyTable(unittest.TestCase):
+    def setUp(self):
+        self.log_file = tempfile.mktemp(suffix=".mpack")
+        self.messages = [make_message(i) for i in range(3000)]
+        with SyncLogger(
+            self.log_file, intern_keys=True, index_stride=100
+        ) as logger:
+            for message in self.messages:
+                logger.put(message)
+
+    def test_round_trip(self):
+        packer = KeyInterningPacker()
+        unpacker = KeyTableUnpacker()
+        for message in self.messages[:200]:
+            unpacker.feed(packer.pack(message))
+        self.assertEqual(list(unpacker), self.messages[:200])
+
+    def test_smaller_file(self):
+        plain_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(plain_file) as logger:
+            for message in self.messages:
+                logger.put(message)
+        self.assertLess(
+            os.path.getsize(self.log_file), os.path.getsize(plain_file) / 2
+        )
+
+    def test_is_interned(self):
+        with open(self.log_file, "rb") as file:
+            self.assertTrue(is_interned(file))
+        plain_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(plain_file) as logger:
+            logger.put({"foo": 1})
+        with open(plain_file, "rb") as file:
+            self.assertFalse(is_interned(file))
+
+    def test_integer_keys(self):
+        packer = KeyInterningPacker()
+        with self.assertRaises(ValueError):
+            packer.pack({"foo": {1: "bar"}})
+
+    def test_full_table_interval(self):
+        packer = KeyInterningPacker(table_interval=10)
+        unpacker = msgpack.Unpacker(strict_map_key=False)
+        for i in range(25):
+            unpacker.feed(packer.pack({"i": i}))
+        records = [
+            msgpack.unpackb(obj.data)
+            for obj in unpacker
+            if isinstance(obj, msgpack.ExtType)
+        ]
+        self.assertEqual(records, [[0, "i"]] * 3)
+
+    def test_read_key_table(self):
+        offsets = []
+        with open(self.log_file, "rb") as file:
+            unpacker = KeyTableUnpacker(file_like=file)
+            for _ in unpacker:
+                offsets.append(unpacker.tell())
+            for number in (0, 49, 50, 1234, 2998):
+                table = read_key_table(file, offsets[number], window=64)
+                unpacker = KeyTableUnpacker(table)
+                file.seek(offsets[number])
+                unpacker.feed(file.read())
+                self.assertEqual(
+                    next(unpacker), self.messages[number + 1], f"{number=}"
+                )
+
+    def test_key_table_update(self):
+        table = KeyTable()
+        self.assertEqual(table.update(msgpack.packb([0, "a", "b"])), 0)
+        self.assertEqual(table.update(msgpack.packb([2, "c"])), 2)
+        self.assertEqual(table.keys, ["a", "b", "c"])
+        self.assertEqual(table.update(msgpack.packb([0, "d"])), 0)
+        self.assertEqual(table.keys, ["d"])
+        with self.assertRaises(ValueError):
+            table.update(msgpack.packb([5, "e"]))
+
+    def test_decode(self):
+        self.assertEqual(list(decode(self.log_file)), self.messages)
+
+    def test_decode_ranges(self):
+        for start_index in (10, 1050, 2999):
+            messages = list(decode(self.log_file, start_index=start_index))
+            self.assertEqual(messages, self.messages[start_index:])
+        os.remove(self.log_file + ".idx")
+        messages = list(decode(self.log_file, start_time=2.0, end_time=2.1))
+        self.assertEqual(messages, self.messages[2000:2100])
+
+    def test_decode_fields(self):
+        messages = list(decode(self.log_file, fields=["observation/servo"]))
+        self.assertEqual(
+            messages[42],
+            {"observation": {"servo": {"position": 4.2, "velocity": -1.0}}},
+        )
+        messages = list(decode(self.log_file, fields=["event150/value"]))
+        self.assertEqual(messages[150], {"event150": {"value": 150}})
+        columns = load_columns(self.log_file, ["observation/servo/position"])
+        self.assertAlmostEqual(columns["observation/servo/position"][7], 0.7)
+
+    def test_decode_tail(self):
+        messages = decode_tail(self.log_file, 3, window=64)
+        self.assertEqual(messages, self.messages[-3:])
+
+    def test_decode_parallel(self):
+        messages = list(decode_parallel(self.log_file, workers=3))
+        self.assertEqual(messages, self.messages)
+
+    def test_build_index(self):
+        index = build_index(self.log_file, stride=1000)
+        self.assertEqual(index.numbers, [0, 1000, 2000])
+        self.assertEqual(index.times, [0.0, 1.0, 2.0])
+
+    def test_delta_logger(self):
+        delta_file = tempfile.mktemp(suffix=".mpack")
+        with DeltaLogger(
+            delta_file, keyframe_count=100, intern_keys=True
+        ) as logger:
+            for i in range(1000):
+                logger.put({"time": 0.001 * i, "count": i // 10})
+        messages = [dict(m) for m in delta_decode(delta_file, start=555)]
+        self.assertEqual(messages[0], {"time": 0.555, "count": 55})
+        self.assertEqual(len(messages), 445)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test loading fields from logs into NumPy arrays."""
+
+import tempfile
+import unittest
+
+import numpy as np
+
+from mpacklog import SyncLogger, load_columns
+
+
+class TestLoadColumns(unittest.TestCase):
+    def make_log(self, nb_messages: int, **kwargs) -> str:
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file, **kwargs) as logger:
+            for i in range(nb_messages):
+                message = {"time": 0.1 * i, "action": [i, 2 * i]}
+                if i % 3 == 0:
+                    message["observation"] = {"position": float(i)}
+                logger.put(message)
+        return tmp_file
+
+    def test_load_columns(self):
+        for kwargs in ({}, {"index_stride": 100}):
+            tmp_file = self.make_log(3000, **kwargs)
+            columns = load_columns(
+                tmp_file,
+                ["time", "action", "action/1", "observation/position"],
+            )
+            self.assertEqual(columns["time"].shape, (3000,))
+            np.testing.assert_allclose(columns["time"], 0.1 * np.arange(3000))
+            self.assertEqual(columns["action"].shape, (3000, 2))
+            np.testing.assert_array_equal(
+                columns["action/1"], 2 * np.arange(3000)
+            )
+            position = columns["observation/position"]
+            self.assertEqual(position[3], 3.0)
+            self.assertTrue(np.isnan(position[4]))
+
+    def test_load_columns_masked(self):
+        tmp_file = self.make_log(10)
+        columns = load_columns(
+            tmp_file, ["observation/position", "action", "foo"], masked=True
+        )
+        position = columns["observation/position"]
+        self.assertEqual(position.count(), 4)
+        self.assertEqual(position[9], 9.0)
+        self.assertIs(position[8], np.ma.masked)
+        self.assertEqual(columns["action"].count(), 20)
+        self.assertEqual(columns["foo"].count(), 0)
+        self.assertEqual(columns["foo"].shape, (10,))
+
+    def test_load_columns_invalid_values(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_file) as logger:
+            logger.put({"foo": 1.0})
+            logger.put({"foo": "bar"})
+        with self.assertRaises(ValueError):
+            load_columns(tmp_file, ["foo"])
@@ -7,13 +7,15 @@
 """Test the server."""
 
 import asyncio
+import os
 import socket
 import tempfile
 import unittest
 
 import msgpack
 
-from mpacklog import AsyncLogger, LogServer
+from mpacklog import AsyncLogger, LogServer, SyncLogger
+from mpacklog.rotation import list_rotated_files
 
 
 class TestLogServer(unittest.IsolatedAsyncioTestCase):
@@ -64,3 +66,74 @@ class TestLogServer(unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(reply["foo"], int)
         self.assertGreaterEqual(reply["foo"], 0)
         self.assertLess(reply["foo"], 10)
+
+
+class TestLogServerInternedKeys(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        log_file = tempfile.mktemp(suffix=".mpack")
+        self.logger = AsyncLogger(log_file, intern_keys=True)
+        await self.logger.flush()
+        asyncio.create_task(self.logger.write())
+        self.server = LogServer(log_file, 4950)
+        asyncio.create_task(self.server.run_async())
+
+    async def asyncTearDown(self):
+        await self.logger.stop()
+        await self.server.stop()
+
+    async def test_last_log(self):
+        for foo in range(10):
+            await self.logger.put({"foo": foo, "bar": {"baz": foo}})
+            await asyncio.sleep(0.01)
+        self.assertIn(self.server.last_log["foo"], range(10))
+        self.assertEqual(
+            self.server.last_log["bar"]["baz"], self.server.last_log["foo"]
+        )
+
+
+class TestLogServerCompressed(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        log_file = tempfile.mktemp(suffix=".mpack")
+        self.logger = AsyncLogger(log_file, compression="zlib", block_size=1)
+        await self.logger.flush()
+        asyncio.create_task(self.logger.write())
+        self.server = LogServer(log_file, 4951)
+        asyncio.create_task(self.server.run_async())
+
+    async def asyncTearDown(self):
+        await self.logger.stop()
+        await self.server.stop()
+
+    async def test_last_log(self):
+        for foo in range(10):
+            await self.logger.put({"foo": foo, "bar": {"baz": foo}})
+            await asyncio.sleep(0.01)
+        self.assertIn(self.server.last_log["foo"], range(9))
+        self.assertEqual(
+            self.server.last_log["bar"]["baz"], self.server.last_log["foo"]
+        )
+
+
+class TestLogServerRotation(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.log_path = os.path.join(tempfile.mkdtemp(), "robot.mpack")
+        self.logger = SyncLogger(self.log_path, rotate_bytes=64)
+        self.logger.put({"foo": -1}, write=True)
+        self.server = LogServer(self.log_path, 4952)
+        asyncio.create_task(self.server.run_async())
+
+    async def asyncTearDown(self):
+        self.logger.close()
+        await self.server.stop()
+
+    async def test_follow_rotation(self):
+        await asyncio.sleep(0.05)
+        for foo in range(20):
+            self.logger.put({"foo": foo, "bar": "x" * 10}, write=True)
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.2)
+        self.assertGreater(len(list_rotated_files(self.log_path)), 2)
+        self.assertEqual(self.server.last_log["foo"], 19)
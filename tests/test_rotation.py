@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test rotation of log files."""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from mpacklog import (
+    AsyncLogger,
+    DeltaLogger,
+    SyncLogger,
+    decode,
+    decode_rotated,
+    delta_decode,
+)
+from mpacklog.index import Index
+from mpacklog.key_table import is_interned
+from mpacklog.rotation import (
+    get_base_path,
+    get_next_rotated_file,
+    get_rotated_path,
+    list_rotated_files,
+)
+from mpacklog.utils import find_log_file
+
+
+def make_message(i: int) -> dict:
+    return {"observation": {"count": i}, "time": 0.001 * i}
+
+
+class TestRotation(unittest.TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.log_dir, "robot.mpack")
+        self.messages = [make_message(i) for i in range(1000)]
+
+    def write_log(self, **kwargs):
+        with SyncLogger(self.path, **kwargs) as logger:
+            for message in self.messages:
+                logger.put(message)
+                logger.write(flush=False)
+
+    def test_rotated_path(self):
+        self.assertEqual(
+            get_rotated_path("/logs/robot.mpack", 3), "/logs/robot.00003.mpack"
+        )
+        self.assertEqual(get_rotated_path("robot", 12), "robot.00012")
+        with self.assertRaises(ValueError):
+            get_rotated_path("robot", 100000)
+
+    def test_dated_file_not_rotated(self):
+        self.assertEqual(
+            get_base_path("/logs/robot.00003.mpack"), "/logs/robot.mpack"
+        )
+        self.assertIsNone(get_base_path("/logs/run.20260101.mpack"))
+        self.assertIsNone(get_base_path("/logs/run.123.mpack"))
+        dated_path = os.path.join(self.log_dir, "robot.20260101.mpack")
+        open(dated_path, "wb").close()
+        open(get_rotated_path(self.path, 0), "wb").close()
+        self.assertEqual(
+            list_rotated_files(self.path), [get_rotated_path(self.path, 0)]
+        )
+
+    def test_next_rotated_file(self):
+        for number in (0, 1, 3):
+            open(get_rotated_path(self.path, number), "wb").close()
+        self.assertEqual(
+            get_next_rotated_file(get_rotated_path(self.path, 0)),
+            get_rotated_path(self.path, 1),
+        )
+        self.assertEqual(
+            get_next_rotated_file(get_rotated_path(self.path, 1)),
+            get_rotated_path(self.path, 3),
+        )
+        self.assertIsNone(
+            get_next_rotated_file(get_rotated_path(self.path, 3))
+        )
+        self.assertIsNone(get_next_rotated_file(self.path))
+
+    def test_rotate_bytes(self):
+        self.write_log(rotate_bytes=4096)
+        paths = list_rotated_files(self.path)
+        self.assertGreater(len(paths), 3)
+        self.assertEqual(paths[0], get_rotated_path(self.path, 0))
+        self.assertFalse(os.path.exists(self.path))
+        for path in paths[:-1]:
+            self.assertGreaterEqual(os.path.getsize(path), 4096)
+            self.assertLess(os.path.getsize(path), 4096 + 100)
+        messages = [m for path in paths for m in decode(path)]
+        self.assertEqual(messages, self.messages)
+
+    def test_rotate_interval(self):
+        with SyncLogger(self.path, rotate_interval=0.05) as logger:
+            for message in self.messages[:6]:
+                logger.put(message, write=True)
+                time.sleep(0.03)
+        self.assertGreater(len(list_rotated_files(self.path)), 1)
+        self.assertEqual(list(decode_rotated(self.path)), self.messages[:6])
+
+    def test_background_thread(self):
+        with SyncLogger(self.path, rotate_bytes=4096) as logger:
+            logger.start()
+            for message in self.messages:
+                logger.put(message)
+        self.assertEqual(list(decode_rotated(self.path)), self.messages)
+
+    def test_existing_files(self):
+        self.write_log(rotate_bytes=4096)
+        with self.assertRaises(FileExistsError):
+            SyncLogger(self.path, rotate_bytes=4096)
+
+    def test_decode_rotated(self):
+        self.write_log(rotate_bytes=4096, index_stride=10)
+        messages = list(decode_rotated(self.path))
+        self.assertEqual(messages, self.messages)
+        messages = list(decode_rotated(self.path, start_time=0.5))
+        self.assertEqual(messages, self.messages[500:])
+        messages = list(
+            decode_rotated(self.path, start_time=0.1, end_time=0.7)
+        )
+        self.assertEqual(messages, self.messages[100:700])
+        messages = list(decode_rotated(self.path, fields=["time"]))
+        self.assertEqual(messages[42], {"time": 0.042})
+
+    def test_index_per_file(self):
+        self.write_log(rotate_bytes=4096, index_stride=10)
+        for path in list_rotated_files(self.path):
+            index = Index.read(path)
+            self.assertEqual(index.offsets[0], 0)
+            first_time = next(decode(path))["time"]
+            self.assertEqual(index.times[0], first_time)
+
+    def test_compression(self):
+        self.write_log(rotate_bytes=512, compression="zlib", block_size=1000)
+        self.assertGreater(len(list_rotated_files(self.path)), 1)
+        self.assertEqual(list(decode_rotated(self.path)), self.messages)
+
+    def test_interned_keys(self):
+        self.write_log(rotate_bytes=4096, intern_keys=True)
+        for path in list_rotated_files(self.path):
+            with open(path, "rb") as file:
+                self.assertTrue(is_interned(file))
+        self.assertEqual(list(decode_rotated(self.path)), self.messages)
+
+    def test_delta_logger(self):
+        with DeltaLogger(
+            self.path, keyframe_count=100, rotate_bytes=2048
+        ) as logger:
+            for i in range(1000):
+                logger.put({"time": 0.001 * i, "count": i // 10})
+                logger.write(flush=False)
+        paths = list_rotated_files(self.path)
+        self.assertGreater(len(paths), 1)
+        messages = [dict(m) for path in paths for m in delta_decode(path)]
+        self.assertEqual(
+            messages,
+            [{"time": 0.001 * i, "count": i // 10} for i in range(1000)],
+        )
+
+    def test_async_logger(self):
+        logger = AsyncLogger(self.path, rotate_bytes=4096)
+
+        async def main():
+            for message in self.messages:
+                await logger.put(message)
+            await logger.flush()
+
+        asyncio.run(main())
+        self.assertGreater(len(list_rotated_files(self.path)), 3)
+        self.assertEqual(list(decode_rotated(self.path)), self.messages)
+
+    def test_find_log_file(self):
+        self.write_log(rotate_bytes=4096)
+        last_path = list_rotated_files(self.path)[-1]
+        self.assertEqual(find_log_file(self.path), last_path)
+        self.assertEqual(find_log_file(self.log_dir), last_path)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test packers compiled from a message schema."""
+
+import dataclasses
+import tempfile
+import unittest
+
+import msgpack
+import numpy as np
+
+from mpacklog import Schema, SyncLogger, decode
+from mpacklog.serialize import serialize
+
+
+@dataclasses.dataclass
+class Servo:
+    position: float
+    velocity: float
+
+
+@dataclasses.dataclass
+class Observation:
+    time: float
+    servo: Servo
+    enabled: bool
+
+
+@dataclasses.dataclass
+class Command:
+    time: float
+    action: np.ndarray
+
+
+def make_message(i: int) -> dict:
+    return {
+        "time": 0.001 * i,
+        "observation": {
+            "servo": {"position": 0.1 * i, "velocity": -1.0},
+            "contact": i % 2 == 0,
+            "count": i,
+        },
+        "action": np.array([0.0, 1.0, 2.0]),
+        "status": "ok",
+    }
+
+
+class TestSchema(unittest.TestCase):
+    def setUp(self):
+        self.packer = msgpack.Packer(default=serialize, use_bin_type=True)
+
+    def test_identical_bytes(self):
+        schema = Schema(make_message(0))
+        for i in range(1, 100):
+            message = make_message(i)
+            self.assertEqual(schema.pack(message), self.packer.pack(message))
+
+    def test_messages_outside_schema(self):
+        schema = Schema(make_message(0))
+        messages = [
+            {"time": 1.0},
+            {**make_message(1), "extra": 42},
+            {**make_message(1), "time": 1},
+            {**make_message(1), "observation": "unavailable"},
+            {**make_message(1), "observation": {"servo": 1.0}},
+            "not a dictionary",
+        ]
+        for message in messages:
+            self.assertEqual(schema.pack(message), self.packer.pack(message))
+
+    def test_flat_floats(self):
+        sample = {f"joint{i}": float(i) for i in range(20)}
+        schema = Schema(sample)
+        self.assertEqual(schema.pack(sample), self.packer.pack(sample))
+
+    def test_float_arrays(self):
+        sample = {
+            "time": 0.0,
+            "vector": np.zeros(1000),
+            "matrix": np.eye(3),
+            "empty": np.zeros((0, 2)),
+            "single": np.float32([1.5]),
+        }
+        schema = Schema(sample)
+        message = {
+            "time": 1.0,
+            "vector": np.random.random(1000),
+            "matrix": np.random.random((3, 3)),
+            "empty": np.zeros((0, 2)),
+            "single": np.float32([2.5]),
+        }
+        self.assertEqual(schema.pack(message), self.packer.pack(message))
+
+    def test_arrays_outside_schema(self):
+        schema = Schema({"vector": np.zeros(3)})
+        messages = [
+            {"vector": np.zeros(4)},
+            {"vector": np.zeros((3, 1))},
+            {"vector": np.arange(3)},
+            {"vector": [1.0, 2.0, 3.0]},
+            {"vector": np.zeros(6)[::2]},
+        ]
+        for message in messages:
+            self.assertEqual(schema.pack(message), self.packer.pack(message))
+
+    def test_dataclass(self):
+        sample = Observation(1.0, Servo(0.5, -0.5), True)
+        schema = Schema(sample)
+        expected = self.packer.pack(dataclasses.asdict(sample))
+        self.assertEqual(schema.pack(sample), expected)
+        other = Observation(2.0, Servo(1, 2), False)  # integer values
+        self.assertEqual(
+            schema.pack(other), self.packer.pack(dataclasses.asdict(other))
+        )
+
+    def test_dataclass_with_array(self):
+        schema = Schema(Command(0.0, np.zeros(4)))
+        command = Command(1.0, np.random.random(4))
+        expected = self.packer.pack(
+            {"time": command.time, "action": command.action}
+        )
+        self.assertEqual(schema.pack(command), expected)
+
+    def test_logger(self):
+        tmp_file = tempfile.mktemp(suffix=".mpack")
+        schema = Schema(make_message(0))
+        with SyncLogger(tmp_file, schema=schema) as logger:
+            for i in range(10):
+                logger.put(make_message(i))
+        messages = list(decode(tmp_file))
+        self.assertEqual(len(messages), 10)
+        self.assertEqual(messages[3]["observation"]["count"], 3)
+        self.assertEqual(messages[3]["action"], [0.0, 1.0, 2.0])
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 Inria
+
+"""Test finding message boundaries and timestamps in log files."""
+
+import os
+import tempfile
+import unittest
+
+import msgpack
+
+from mpacklog import SyncLogger
+from mpacklog.index import Index
+from mpacklog.seek import find_boundary, find_time_offset, read_messages_at
+
+
+class TestSeek(unittest.TestCase):
+    def setUp(self):
+        self.log_file = tempfile.mktemp(suffix=".mpack")
+        self.offsets = []
+        with open(self.log_file, "wb") as file:
+            for i in range(5000):
+                self.offsets.append(file.tell())
+                message = {
+                    "time": 0.001 * i,
+                    "payload": bytes(range(0x80, 0x90)) * 4,
+                    "values": [0.5 * i, -1.0, 1e-9],
+                }
+                file.write(msgpack.packb(message, use_bin_type=True))
+
+    def test_find_boundary(self):
+        with open(self.log_file, "rb") as file:
+            for offset in (0, 1, 17, 50_000, self.offsets[-1] - 1):
+                boundary = find_boundary(file, offset)
+                expected = next(o for o in self.offsets if o >= offset)
+                self.assertEqual(boundary, expected)
+
+    def test_find_boundary_past_last_message(self):
+        with open(self.log_file, "rb") as file:
+            self.assertIsNone(find_boundary(file, self.offsets[-1] + 1))
+
+    def test_find_boundary_small_window(self):
+        with open(self.log_file, "rb") as file:
+            self.assertEqual(
+                find_boundary(file, 5, window=16), self.offsets[1]
+            )
+
+    def test_find_boundary_start(self):
+        with open(self.log_file, "rb") as file:
+            boundary = find_boundary(file, 50_000, start=self.offsets[100])
+            self.assertEqual(
+                boundary, next(o for o in self.offsets if o >= 50_000)
+            )
+
+    def test_read_messages_at(self):
+        with open(self.log_file, "rb") as file:
+            messages = read_messages_at(file, self.offsets[42])
+            self.assertEqual(len(messages), 1)
+            self.assertEqual(messages[0]["time"], 0.042)
+            file.seek(0, 2)
+            self.assertEqual(read_messages_at(file, file.tell()), [])
+
+    def test_find_time_offset(self):
+        with open(self.log_file, "rb") as file:
+            for time in (0.0, 1.2345, 4.0, 10.0):
+                offset = find_time_offset(file, time, window=1024)
+                self.assertIn(offset, self.offsets)
+                i = self.offsets.index(offset)
+                self.assertTrue(i == 0 or 0.001 * i < time)
+                self.assertLess(self.offsets[-1] - offset + 10, 1e6)
+
+    def test_find_time_offset_with_index(self):
+        index = Index(stride=100, time_field="time")
+        for i in range(0, 5000, 100):
+            index.append(i, self.offsets[i], 0.001 * i)
+        with open(self.log_file, "rb") as file:
+            offset = find_time_offset(file, 2.05, index=index)
+        self.assertEqual(offset, self.offsets[2000])
+
+
+class TestSeekNestedMessages(unittest.TestCase):
+    """Messages whose last value is a dictionary, which itself ends with a
+    dictionary, so that nested dictionaries followed by the next messages
+    unpack like a sequence of messages."""
+
+    def setUp(self):
+        self.log_file = tempfile.mktemp(suffix=".mpack")
+        self.offsets = []
+        with open(self.log_file, "wb") as file:
+            for i in range(2000):
+                self.offsets.append(file.tell())
+                message = {"time": 0.001 * i, "obs": {"x": i, "y": {"z": i}}}
+                file.write(msgpack.packb(message))
+
+    def tearDown(self):
+        os.unlink(self.log_file)
+
+    def test_find_boundary(self):
+        with open(self.log_file, "rb") as file:
+            for offset in range(self.offsets[10], self.offsets[12] + 1):
+                boundary = find_boundary(file, offset)
+                expected = next(o for o in self.offsets if o >= offset)
+                self.assertEqual(boundary, expected)
+
+    def test_find_time_offset(self):
+        with open(self.log_file, "rb") as file:
+            for time in (0.5, 1.2345, 1.9):
+                offset = find_time_offset(file, time, window=256)
+                self.assertIn(offset, self.offsets)
+                file.seek(offset)
+                message = msgpack.Unpacker(file).unpack()
+                self.assertLess(message["time"], time)
@@ -6,11 +6,17 @@
 
 """Test the serialization function."""
 
+import dataclasses
 import unittest
 
 import numpy as np
 
-from mpacklog.serialize import serialize
+from mpacklog.serialize import (
+    ENCODERS,
+    REGISTERED_ENCODERS,
+    register_encoder,
+    serialize,
+)
 
 
 class FooSerializer:
@@ -24,6 +30,10 @@ class MockPinocchioSE3:
 
 
 class TestSerialize(unittest.TestCase):
+    def tearDown(self):
+        REGISTERED_ENCODERS.clear()
+        ENCODERS.clear()
+
     def test_serialize(self):
         foo = FooSerializer()
         x = np.array([1, 2, 3])
@@ -32,3 +42,29 @@ class TestSerialize(unittest.TestCase):
         self.assertEqual(serialize(MockPinocchioSE3(x)), list(x))
         self.assertEqual(serialize(foo), {"foo": "bar"})
         self.assertEqual(serialize(some_int), some_int)  # returned as-is
+
+    def test_encoder_cache(self):
+        x = np.array([1.0, 2.0])
+        serialize(x)
+        self.assertIn(np.ndarray, ENCODERS)
+        self.assertEqual(serialize(np.array([3.0])), [3.0])
+
+    def test_register_encoder(self):
+        @dataclasses.dataclass
+        class Point:
+            x: float
+            y: float
+
+        @dataclasses.dataclass
+        class Point3(Point):
+            z: float
+
+        register_encoder(Point, dataclasses.asdict)
+        self.assertEqual(serialize(Point(1.0, 2.0)), {"x": 1.0, "y": 2.0})
+        self.assertEqual(
+            serialize(Point3(1.0, 2.0, 3.0)), {"x": 1.0, "y": 2.0, "z": 3.0}
+        )
+
+        self.assertEqual(serialize(FooSerializer()), {"foo": "bar"})
+        register_encoder(FooSerializer, lambda foo: "foo")
+        self.assertEqual(serialize(FooSerializer()), "foo")
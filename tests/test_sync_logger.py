@@ -12,7 +12,7 @@ import unittest
 
 import msgpack
 
-from mpacklog import SyncLogger
+from mpacklog import SyncLogger, decode
 
 
 class TestSyncLogger(unittest.TestCase):
@@ -41,3 +41,87 @@ class TestSyncLogger(unittest.TestCase):
         with open(tmp_path, "rb") as tmp_file:
             message = msgpack.load(tmp_file)
             self.assertEqual(message, {"foo": 42, "something": "else"})
+
+    def test_context_manager(self):
+        tmp_path = tempfile.mktemp(suffix=".mpack")
+        with SyncLogger(tmp_path) as logger:
+            for i in range(10):
+                logger.put({"i": i})
+                logger.write(flush=False)
+        read_values = [message["i"] for message in decode(tmp_path)]
+        self.assertEqual(read_values, list(range(10)))
+
+    def test_flush(self):
+        tmp_path = tempfile.mktemp(suffix=".mpack")
+        logger = SyncLogger(tmp_path, buffer_size=1 << 16)
+        logger.put({"foo": 1}, write=False)
+        logger.write(flush=False)
+        self.assertEqual(os.path.getsize(tmp_path), 0)
+        logger.flush()
+        self.assertEqual(list(decode(tmp_path)), [{"foo": 1}])
+        logger.put({"foo": 2}, write=True)
+        self.assertEqual(list(decode(tmp_path)), [{"foo": 1}, {"foo": 2}])
+        logger.close()
+
+    def test_close_without_writing(self):
+        tmp_path = tempfile.mktemp(suffix=".mpack")
+        logger = SyncLogger(tmp_path)
+        logger.close()
+        self.assertFalse(os.path.exists(tmp_path))
+
+    def test_background_writer(self):
+        tmp_path = tempfile.mktemp(suffix=".mpack")
+        logger = SyncLogger(tmp_path, maxsize=16)
+        logger.start()
+        self.assertTrue(logger.running)
+        for i in range(1000):
+            logger.put({"i": i})
+        logger.write()
+        read_values = [message["i"] for message in decode(tmp_path)]
+        self.assertEqual(read_values, list(range(1000)))
+        logger.close()
+        self.assertFalse(logger.running)
+        self.assertEqual(logger.dropped_messages, 0)
+
+    def test_background_writer_error(self):
+        tmp_path = tempfile.mktemp(suffix=".mpack")
+        logger = SyncLogger(tmp_path, maxsize=4)
+        logger.start()
+        logger.put({"i": 0})
+        logger.put({"i": 1 << 70})  # too large for msgpack
+        for i in range(2, 10):
+            logger.put({"i": i})
+        with self.assertRaises(OverflowError):
+            logger.write()
+        logger.write()  # the exception is only raised once
+        read_values = [message["i"] for message in decode(tmp_path)]
+        self.assertEqual(read_values, [0] + list(range(2, 10)))
+        logger.put({"i": 1 << 70})
+        with self.assertRaises(OverflowError):
+            logger.close()
+        self.assertFalse(logger.running)
+
+    def test_drop_newest(self):
+        tmp_path = tempfile.mktemp(suffix=".mpack")
+        logger = SyncLogger(tmp_path, maxsize=3, overflow="drop_newest")
+        for i in range(5):
+            logger.put({"i": i})
+        self.assertEqual(logger.dropped_messages, 2)
+        logger.close()
+        read_values = [message["i"] for message in decode(tmp_path)]
+        self.assertEqual(read_values, [0, 1, 2])
+
+    def test_drop_oldest(self):
+        tmp_path = tempfile.mktemp(suffix=".mpack")
+        logger = SyncLogger(tmp_path, maxsize=3, overflow="drop_oldest")
+        for i in range(5):
+            logger.put({"i": i})
+        self.assertEqual(logger.dropped_messages, 2)
+        logger.close()
+        read_values = [message["i"] for message in decode(tmp_path)]
+        self.assertEqual(read_values, [2, 3, 4])
+
+    def test_unknown_overflow_policy(self):
+        tmp_path = tempfile.mktemp(suffix=".mpack")
+        with self.assertRaises(ValueError):
+            SyncLogger(tmp_path, overflow="explode")